@@ -199,7 +199,9 @@ def run_search(query: str, n_results: int = 5, debug: bool = False, media: bool
     collection = client.get_collection(name="skout_plays")
     from src.concepts import get_active_concepts
     active = get_active_concepts(active_concepts or [])
-    play_ids, breakdowns = semantic_search(collection, query=query, n_results=n_results, return_breakdowns=True, use_hyde=use_hyde, active_concepts=active, constraints=constraints)
+    from src.search.query_plan import get_query_plan
+    plan = get_query_plan(query)
+    play_ids, breakdowns = semantic_search(collection, query=query, n_results=n_results, return_breakdowns=True, use_hyde=use_hyde, active_concepts=active, constraints=constraints, plan=plan)
 
     meta_lookup: Dict[str, Dict[str, Any]] = {}
     try:
@@ -220,7 +222,7 @@ def run_search(query: str, n_results: int = 5, debug: bool = False, media: bool
         print("No results found.")
         return
 
-    query_tokens = _tokenize(query)
+    query_tokens = set(plan.tokens)
     results: List[Dict[str, Any]] = []
 
     for i, play_id in enumerate(play_ids):
@@ -14,7 +14,7 @@ if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
 
 from src.ingestion.db import connect_db, ensure_schema
-from src.processing.play_tagger import tag_play
+from src.processing.play_tagger import stored_tags
 
 
 def _parse_lineup(raw):
@@ -68,7 +68,7 @@ def main() -> None:
     query = """
     SELECT p.game_id, g.season_id, p.description, p.clock_seconds,
            p.player_id, p.assist_player_id, p.r_player_id, p.d_player_id,
-           p.duration, p.offensive_lineup
+           p.duration, p.offensive_lineup, p.tag_mask
     FROM plays p
     JOIN games g ON g.game_id = p.game_id
     """
@@ -98,11 +98,12 @@ def main() -> None:
         defender_id,
         duration,
         offensive_lineup,
+        mask,
     ) in rows:
         if not season_id:
             continue
 
-        tags = tag_play(desc or "", clock_seconds)
+        tags = stored_tags(mask, desc, clock_seconds)
 
         # Minutes (best-effort): use offensive lineup duration if available
         if duration is not None:
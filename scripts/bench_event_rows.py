@@ -0,0 +1,107 @@
+"""Benchmark event payload decode and plays row building (_event_row vs play_rows).
+
+    python scripts/bench_event_rows.py --payload data/cache/synergy/ab/<key>.json
+    python scripts/bench_event_rows.py --games 200          # synthetic full games
+
+--payload takes a recorded game-events response: a response-cache entry
+({"payload": ...}) or the raw API body. Without it a synthetic ~450-event game
+shaped like the Synergy Event schema is used.
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+# Ensure repo root on path
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from scripts.bench_tag_plays import FRAGMENTS
+from src.ingestion import json_codec
+from src.ingestion.pipeline import _event_row, _unwrap_list_payload, play_rows
+
+
+def synthetic_game(n_events: int = 450, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    people = [{"id": f"p{i}", "nameFirst": f"First{i}", "nameLast": f"Last{i}"} for i in range(20)]
+    teams = [{"id": "t1", "name": "Home U", "abbr": "HOM"}, {"id": "t2", "name": "Away St", "abbr": "AWY"}]
+    descriptions = [" ".join(rng.sample(FRAGMENTS, rng.randint(1, 4))) for _ in range(300)]
+    events = []
+    for i in range(n_events):
+        off = rng.randrange(2)
+        evt = {
+            "id": f"e{i}",
+            "description": rng.choice(descriptions),
+            "gameQuarter": 1 + i * 2 // n_events,
+            "clock": rng.randint(0, 1200),
+            "person": rng.choice(people),
+            "offense": teams[off],
+            "defense": teams[1 - off],
+            "shotX": rng.randint(0, 94),
+            "shotY": rng.randint(0, 50),
+            "pickAndRoll": rng.random() < 0.2,
+            "transition": rng.random() < 0.15,
+            "ato": rng.random() < 0.05,
+            "shortClock": rng.random() < 0.1,
+            "isHome": off == 0,
+            "duration": round(rng.uniform(2, 24), 1),
+            "utc": "2025-01-01T00:00:00Z",
+            "homeScore": i // 6,
+            "awayScore": i // 7,
+            "offensiveLineup": ",".join(p["id"] for p in rng.sample(people, 5)),
+        }
+        if rng.random() < 0.3:
+            evt["assist"] = rng.choice(people)
+        if rng.random() < 0.2:
+            evt["dPlayer"] = rng.choice(people)
+        events.append({"data": evt})
+    return {"data": events}
+
+
+def load_payload(path: str):
+    with open(path, "rb") as f:
+        doc = json.loads(f.read())
+    return doc["payload"] if isinstance(doc, dict) and "payload" in doc else doc
+
+
+def timed(fn, repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--payload", default=None, help="Recorded game-events response (cache entry or raw body)")
+    parser.add_argument("--games", type=int, default=200, help="Times to process the game")
+    args = parser.parse_args()
+
+    payload = load_payload(args.payload) if args.payload else synthetic_game()
+    raw = json.dumps(payload).encode("utf-8")
+    events = [e for e in _unwrap_list_payload(payload) if isinstance(e, dict)]
+    print(f"{len(events)} events/game, {len(raw) / 1024:.0f} KiB payload, x{args.games} games")
+
+    decoders = [("json.loads", json.loads)]
+    if json_codec.orjson is not None:
+        decoders.append(("orjson.loads", json_codec.orjson.loads))
+    for name, fn in decoders:
+        t = timed(lambda fn=fn: fn(raw), args.games)
+        print(f"decode  {name:<14} {t:7.3f}s  {args.games / t:8.1f} games/s")
+
+    t_row = timed(lambda: [_event_row("g", e) for e in events], args.games)
+    print(f"rows    _event_row     {t_row:7.3f}s  {args.games / t_row:8.1f} games/s")
+    t_col = timed(lambda: play_rows("g", events), args.games)
+    print(f"rows    play_rows      {t_col:7.3f}s  {args.games / t_col:8.1f} games/s  ({t_row / t_col:.1f}x)")
+
+    if play_rows("g", events) != [_event_row("g", e) for e in events]:
+        raise SystemExit("parity mismatch between play_rows and _event_row")
+    print("parity ok")
+
+
+if __name__ == "__main__":
+    main()
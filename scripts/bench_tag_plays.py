@@ -0,0 +1,64 @@
+"""Benchmark tag_play (row at a time) against tag_plays (batched) on synthetic plays.
+
+    python scripts/bench_tag_plays.py --n 1000000
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Ensure repo root on path
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from src.processing.play_tagger import mask_tags, tag_play, tag_plays  # noqa: E402
+
+# Synergy-style description fragments; descriptions are 1-4 of these.
+FRAGMENTS = [
+    "Pick and Roll Ball Handler", "P&R Roll Man", "Isolation", "Post-Up", "Spot Up",
+    "Drive to basket", "Cut", "Handoff", "Off Screen", "Transition", "Putback",
+    "Jump Shot", "Pull-Up Jumper", "3pt", "Dunk", "Layup", "Make 2 Pts", "Miss 2 Pts",
+    "Make 3 Pts", "Miss 3 Pts", "Free Throw", "Turnover", "Steal", "Offensive Rebound",
+    "Defensive Rebound", "Foul", "Charge", "Block", "Deflection", "Loose Ball",
+    "Assisted", "Non Possession", "(PnR)", "(Trans)",
+]
+
+
+def synthetic_plays(n: int, seed: int = 0) -> tuple[list[str], list[int]]:
+    rng = random.Random(seed)
+    pool = [" ".join(rng.sample(FRAGMENTS, rng.randint(1, 4))) for _ in range(20000)]
+    descriptions = [rng.choice(pool) for _ in range(n)]
+    clocks = [rng.randint(0, 1200) for _ in range(n)]
+    return descriptions, clocks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--n", type=int, default=1_000_000)
+    parser.add_argument("--check", type=int, default=10_000, help="Rows to spot-check for parity")
+    args = parser.parse_args()
+
+    descriptions, clocks = synthetic_plays(args.n)
+    print(f"{args.n:,} descriptions ({len(set(descriptions)):,} distinct)")
+
+    t0 = time.perf_counter()
+    slow = [tag_play(d, c) for d, c in zip(descriptions, clocks, strict=True)]
+    t_row = time.perf_counter() - t0
+    print(f"tag_play  (per row): {t_row:7.2f}s  {args.n / t_row:12,.0f} rows/s")
+
+    t0 = time.perf_counter()
+    masks = tag_plays(descriptions, clocks)
+    t_batch = time.perf_counter() - t0
+    print(f"tag_plays (batched): {t_batch:7.2f}s  {args.n / t_batch:12,.0f} rows/s  ({t_row / t_batch:.1f}x)")
+
+    for i in random.Random(1).sample(range(args.n), min(args.check, args.n)):
+        if mask_tags(int(masks[i])) != frozenset(slow[i]):
+            raise SystemExit(f"parity mismatch at row {i}: {descriptions[i]!r} clock={clocks[i]}")
+    print("parity ok")
+
+
+if __name__ == "__main__":
+    main()
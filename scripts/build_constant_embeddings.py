@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""Encode every constant search text once and write constant_embeddings.{npy,json}."""
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+
+def main():
+    from src.search.constant_embeddings import BUNDLE_NPY, build_bundle, constant_texts
+
+    groups = constant_texts()
+    print("Constant texts: " + ", ".join(f"{k}={len(v)}" for k, v in groups.items()))
+    t0 = time.perf_counter()
+    n = build_bundle()
+    print(f"✅ Wrote {n} embeddings to {BUNDLE_NPY} ({time.perf_counter() - t0:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
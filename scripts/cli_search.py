@@ -38,18 +38,14 @@ def main():
         print("Suggestions:", ", ".join(suggest_rich(args.query, limit=25)))
         return
 
-    if args.explain:
-        from src.search.coach_dictionary import infer_intents_verbose
+    from src.search.query_plan import get_query_plan
 
-        intents = infer_intents_verbose(args.query)
-        print("Matched:", ", ".join([p for _, p in intents.values()]))
+    plan = get_query_plan(args.query)
+    if args.explain:
+        print("Matched:", ", ".join(plan.matched_phrases))
 
     # Expand query with matched phrases
-    from src.search.coach_dictionary import infer_intents_verbose
-
-    intents = infer_intents_verbose(args.query)
-    matched = [p for _, p in intents.values()]
-    expanded_query = build_expanded_query(args.query, matched)
+    expanded_query = build_expanded_query(args.query, plan.matched_phrases)
 
     client = chromadb.PersistentClient(path=str(VECTOR_DB))
     collection = client.get_collection(name="skout_plays")
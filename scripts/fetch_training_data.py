@@ -51,6 +51,7 @@ def main():
         records = tqdm(records, desc="Harvesting plays")
 
     os.makedirs(os.path.dirname(OUTPUT_PATH), exist_ok=True)
+    written = 0
     with open(OUTPUT_PATH, "w", encoding="utf-8", newline="") as f:
         writer = csv.writer(f)
         writer.writerow(["player_name", "true_position", "height_in", "weight_lb", "text"])
@@ -80,8 +81,10 @@ def main():
 
             text = meta.get("original_desc") or doc or ""
             writer.writerow([player_name, position, height, weight, text])
+            written += 1
 
     conn.close()
+    return written
 
 
 if __name__ == "__main__":
@@ -3,23 +3,27 @@
 
 Single-path, best-practice flow:
 1) Discover API access (seasons -> teams -> games)
-2) Compare against local DB (if exists)
-3) Ingest ONLY missing games / events / players
+2) Compare against local DB (temp tables + SQL anti-joins)
+3) Ingest ONLY missing games / events / players (concurrent fetch)
 4) Backfill names, rebuild traits, regenerate embeddings
 
 Rate limiting is handled by SynergyClient._get (retry + backoff on 429).
+Responses are cached under data/cache/synergy; rerun with SYNERGY_CACHE=replay
+to work entirely from the cache.
 """
 from __future__ import annotations
 
 import os
 import re
 import sys
+import time
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT))
 
-from src.ingestion.db import ensure_schema
+from src.ingestion import ledger
+from src.ingestion.db import ensure_schema, load_temp_ids
 import sqlite3
 from src.ingestion.pipeline import (
     _unwrap_list_payload,
@@ -29,6 +33,7 @@ from src.ingestion.pipeline import (
     upsert_plays,
 )
 from src.ingestion.synergy_client import SynergyClient
+from src.ingestion.writer import BatchWriter
 
 
 def _season_ids(seasons: list[dict]) -> list[str]:
@@ -63,6 +68,7 @@ def main() -> int:
     conn = sqlite3.connect(db_path)
     ensure_schema(conn)
     cur = conn.cursor()
+    writer = BatchWriter(conn)
 
     total_new_games = 0
     total_new_plays = 0
@@ -105,6 +111,19 @@ def main() -> int:
         "wake": "wakeforest",
     }
 
+    # Team names in games are free text: normalize the distinct names once in
+    # Python, then match them in SQL through a temp table.
+    acc_names = set()
+    for (name,) in cur.execute("SELECT DISTINCT home_team FROM games UNION SELECT DISTINCT away_team FROM games"):
+        n = _norm(name)
+        if acc_aliases.get(n, n) in acc_norm:
+            acc_names.add(name)
+
+    def fetch_events(gid):
+        t0 = time.perf_counter()
+        payload = client.get_game_events("ncaamb", gid, final=True)
+        return payload, time.perf_counter() - t0, client.last_error
+
     for season_id in season_ids:
         teams_payload = client.get_teams("ncaamb", season_id)
         teams = [t for t in _unwrap_list_payload(teams_payload) if isinstance(t, dict)]
@@ -114,75 +133,105 @@ def main() -> int:
             print(f"⚠️  No teams accessible for season {season_id}")
             continue
 
-        # Existing games for this season
-        cur.execute("SELECT game_id FROM games WHERE season_id = ?", (season_id,))
-        existing_game_ids = {r[0] for r in cur.fetchall()}
-
-        print(f"✅ Season {season_id} | teams: {len(team_ids)} | existing games: {len(existing_game_ids)}")
-
-        # Fetch all accessible games (by team), keep only missing ones
-        new_games: dict[str, dict] = {}
+        # Fetch all accessible games (by team); the DB comparison happens in SQL
+        api_games: dict[str, dict] = {}
         for tid in team_ids:
             for g in iter_games(client, "ncaamb", season_id, tid):
-                gid = g.get("id")
-                if not gid or gid in existing_game_ids or gid in new_games:
-                    continue
-                new_games[gid] = g
+                if g.get("id"):
+                    api_games.setdefault(str(g["id"]), g)
+
+        load_temp_ids(conn, "_api_games", api_games)
+        cur.execute(
+            """
+            SELECT t.id FROM _api_games t
+            WHERE NOT EXISTS (SELECT 1 FROM games g WHERE g.game_id = t.id)
+            """
+        )
+        missing_games = [r[0] for r in cur.fetchall()]
+        print(f"✅ Season {season_id} | teams: {len(team_ids)} | api games: {len(api_games)} | missing: {len(missing_games)}")
 
-        if new_games:
-            inserted = upsert_games(conn, season_id, list(new_games.values()))
+        if missing_games:
+            inserted = upsert_games(conn, season_id, (api_games[gid] for gid in missing_games), writer=writer)
+            writer.flush()
             total_new_games += inserted
+            for gid in missing_games:
+                g = api_games[gid]
+                for side in ("homeTeam", "awayTeam"):
+                    name = (g.get(side) or {}).get("name", "Unknown")
+                    n = _norm(name)
+                    if acc_aliases.get(n, n) in acc_norm:
+                        acc_names.add(name)
         else:
             print(f"ℹ️  No new games for season {season_id}")
 
-        # Players: fetch only if team missing in DB
-        for tid in team_ids:
-            cur.execute("SELECT 1 FROM players WHERE team_id = ? LIMIT 1", (tid,))
-            if cur.fetchone():
-                continue
-            payload = client.get_team_players("ncaamb", tid)
+        # Players: fetch only teams with no players in DB
+        load_temp_ids(conn, "_api_teams", team_ids)
+        cur.execute(
+            """
+            SELECT t.id FROM _api_teams t
+            WHERE NOT EXISTS (SELECT 1 FROM players p WHERE p.team_id = t.id)
+            """
+        )
+        missing_teams = [r[0] for r in cur.fetchall()]
+        print(f"   Teams without players: {len(missing_teams)}")
+        for tid, payload in client.map(lambda t: client.get_team_players("ncaamb", t), missing_teams):
             players = [p for p in _unwrap_list_payload(payload) if isinstance(p, dict)]
             if players:
-                upsert_players(conn, tid, players)
-
-        # Events: focus on ACC games with zero or low plays
+                upsert_players(conn, tid, players, writer=writer)
+                writer.end_unit()
+        writer.flush()
+
+        # Events: ACC games with zero or low plays. The ledger is deliberately not
+        # consulted: games fetched under trial access (or adopted because they had
+        # a few plays) are marked ok there, and refilling them is the point.
+        # Per-game counts use idx_plays_game_id, so cost tracks the season.
+        load_temp_ids(conn, "_acc_names", acc_names)
         cur.execute(
             """
-            SELECT g.game_id, g.home_team, g.away_team, COUNT(p.play_id) AS play_count
+            SELECT g.game_id
             FROM games g
-            LEFT JOIN plays p ON p.game_id = g.game_id
             WHERE g.season_id = ?
-            GROUP BY g.game_id
-            HAVING COUNT(p.play_id) = 0 OR COUNT(p.play_id) < 50
+              AND (g.home_team IN (SELECT id FROM _acc_names) OR g.away_team IN (SELECT id FROM _acc_names))
+              AND (SELECT COUNT(*) FROM plays p WHERE p.game_id = g.game_id) < 50
             """,
             (season_id,),
         )
-        candidates = cur.fetchall()
-        print(f"   Low/zero-play games found: {len(candidates)}")
-
-        game_ids_to_fill = []
-        for gid, home, away, plays in candidates:
-            h = _norm(home)
-            a = _norm(away)
-            h = acc_aliases.get(h, h)
-            a = acc_aliases.get(a, a)
-            if h in acc_norm or a in acc_norm:
-                game_ids_to_fill.append(gid)
-
-        print(f"   ACC games needing events: {len(game_ids_to_fill)} (from {len(candidates)} low/zero-play games)")
-        if not game_ids_to_fill:
-            print("   ⚠️ No ACC games matched for event refill. Check team name normalization.")
+        game_ids_to_fill = [r[0] for r in cur.fetchall()]
 
-        if game_ids_to_fill:
-            for idx, gid in enumerate(game_ids_to_fill):
-                if idx % 10 == 0:
-                    print(f"   events {idx}/{len(game_ids_to_fill)}")
-                payload = client.get_game_events("ncaamb", gid)
-                if not payload:
-                    continue
-                events = [e for e in _unwrap_list_payload(payload) if isinstance(e, dict)]
-                total_new_plays += upsert_plays(conn, gid, events)
+        print(f"   ACC games needing events: {len(game_ids_to_fill)}")
+        if not game_ids_to_fill and not acc_names:
+            print("   ⚠️ No ACC games matched for event refill. Check team name normalization.")
 
+        # Missing games stream straight into the worker pool; writes stay on this thread.
+        for idx, (gid, (payload, elapsed, error)) in enumerate(client.map(fetch_events, game_ids_to_fill)):
+            if idx % 10 == 0:
+                print(f"   events {idx}/{len(game_ids_to_fill)}")
+            if not payload:
+                status = ledger.STATUS_ERROR if payload is None else ledger.STATUS_EMPTY
+                writer.execute(
+                    ledger.RECORD_SQL,
+                    ledger.record_row(ledger.EVENTS_ENDPOINT, gid, status, duration_s=elapsed, error=error),
+                )
+                writer.end_unit()
+                continue
+            events = [e for e in _unwrap_list_payload(payload) if isinstance(e, dict)]
+            n = upsert_plays(conn, gid, events, writer=writer)
+            total_new_plays += n
+            writer.execute(
+                ledger.RECORD_SQL,
+                ledger.record_row(
+                    ledger.EVENTS_ENDPOINT,
+                    gid,
+                    ledger.STATUS_OK if n else ledger.STATUS_EMPTY,
+                    payload=payload,
+                    row_count=n,
+                    duration_s=elapsed,
+                ),
+            )
+            writer.end_unit()
+        writer.flush()
+
+    writer.flush()
     conn.close()
 
     print(f"✅ New games: {total_new_games} | New plays: {total_new_plays}")
@@ -25,6 +25,14 @@ except ImportError:
     def ensure_schema(conn):
         pass
 
+try:
+    from src.http_session import get_session
+except ImportError:
+    _SESSION = requests.Session()
+
+    def get_session():
+        return _SESSION
+
 # --- CONFIG ---
 SERPER_API_KEY = os.getenv("SERPER_API_KEY") or "bd4c038827725838d7768562725539512395379a"  # Replace with your key if env missing
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
@@ -45,7 +53,7 @@ def _serper_search(query: str, type: str = "search", num: int = 5) -> list:
     try:
         payload = json.dumps({"q": query, "num": num})
         headers = {"X-API-KEY": SERPER_API_KEY, "Content-Type": "application/json"}
-        response = requests.post(endpoint, headers=headers, data=payload, timeout=10)
+        response = get_session().post(endpoint, headers=headers, data=payload, timeout=10)
         response.raise_for_status()
         data = response.json()
         if type == "news":
@@ -11,7 +11,8 @@ import sys
 if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
 
-from src.processing.play_tagger import tag_play
+from src.ingestion.db import ensure_schema
+from src.processing.play_tagger import stored_tags
 
 DOG_TAGS = ["oreb", "loose_ball", "charge_taken", "deflection", "steal", "block"]
 DEFAULT_WEIGHTS = {
@@ -60,10 +61,11 @@ def main():
         raise FileNotFoundError(f"DB not found: {args.db}")
 
     conn = sqlite3.connect(args.db)
+    ensure_schema(conn)
     cur = conn.cursor()
     cur.execute(
         """
-        SELECT description
+        SELECT description, tag_mask
         FROM plays
         WHERE player_id IS NOT NULL
         """
@@ -73,8 +75,8 @@ def main():
     total_events = 0
     tag_counts = {k: 0 for k in DOG_TAGS}
 
-    for (desc,) in rows:
-        tags = set(tag_play(desc))
+    for desc, mask in rows:
+        tags = stored_tags(mask, desc)
         if "non_possession" in tags:
             continue
         total_events += 1
@@ -41,7 +41,14 @@ def main() -> None:
         default="data/translatability_predictions.csv",
         help="Path to save predictions when --predict-latest is set",
     )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Serve Synergy season/team lookups from the response cache only (SYNERGY_CACHE=replay)",
+    )
     args = parser.parse_args()
+    if args.offline:
+        os.environ["SYNERGY_CACHE"] = "replay"
 
     df = build_training_frame(args.db)
     if df.empty:
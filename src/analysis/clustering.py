@@ -120,12 +120,13 @@ def name_clusters(cluster_map: dict) -> dict:
 
         if api_key:
             try:
-                import requests
+                from src.http_session import get_session
+
                 prompt = (
                     "Here are 5 players in a cluster. Give this playing style a creative 2-word name like "
                     "'Rim Runner' or 'Heliocentric Guard'.\n\nPlayers: " + ", ".join(players)
                 )
-                resp = requests.post(
+                resp = get_session().post(
                     "https://api.openai.com/v1/chat/completions",
                     headers={"Authorization": f"Bearer {api_key}"},
                     json={
@@ -2,7 +2,7 @@ import json
 import os
 from typing import List, Dict, Any, Optional
 
-import requests
+from src.http_session import get_session
 
 
 POSITION_AVERAGES = {
@@ -42,6 +42,14 @@ def calculate_relative_size(height_in: Optional[float], weight_lb: Optional[floa
 
     pos_key = _norm_position(position)
     avg_h, avg_w = POSITION_AVERAGES.get(pos_key, (76, 200))
+    try:
+        # Prefer empirical medians from the ingest-built percentile tables.
+        from src.percentiles import position_median
+
+        avg_h = position_median(pos_key, "height_in") or avg_h
+        avg_w = position_median(pos_key, "weight_lb") or avg_w
+    except Exception:
+        pass
 
     # positional tag
     if pos_key in {"PG", "SG", "G"}:
@@ -87,7 +95,7 @@ def analyze_physique(image_url: Optional[str]) -> Optional[Dict[str, Any]]:
             "[Lanky, Muscular, Heavy, Stocky, Athletic]. Also, estimate if they look 'Conditioned' or 'Soft'. "
             "Return JSON with keys: build, conditioning."
         )
-        resp = requests.post(
+        resp = get_session().post(
             "https://api.openai.com/v1/chat/completions",
             headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
             json={
@@ -143,6 +143,20 @@ def _load_position_weights() -> tuple[float, float]:
         return 1.0, 1.0
 
 
+@st.cache_resource(show_spinner=False)
+def _ensure_constant_embeddings() -> bool:
+    # A fresh checkout has no constant_embeddings bundle: build it once per server.
+    try:
+        from src.search.constant_embeddings import ensure_bundle
+
+        return ensure_bundle()
+    except Exception:
+        return False
+
+
+_ensure_constant_embeddings()
+
+
 
 # --- 4b. GLASS BACKGROUND VIDEO (Cloud + Snowflake) ---
 @st.cache_data(show_spinner=False)
@@ -277,110 +291,9 @@ def _position_tags(pos: str) -> set[str]:
     return tags
 
 
-def _infer_size_intents(q: str) -> dict:
-    """Extract size/physical development intents from the query."""
-    ql = (q or "").lower()
-
-    # explicit height tokens like 6'8, 6-8, 6 8, 7 footer
-    height_min = None
-    height_max = None
-    m = re.search(r"(\d)\s*['-]?\s*(\d{1,2})\s*(?:\"|in)?", ql)
-    if m:
-        ft = int(m.group(1))
-        inch = int(m.group(2))
-        h = ft * 12 + inch
-        height_min = h - 1
-        height_max = h + 2
-
-    if any(k in ql for k in ["tall", "long", "length", "rangy", "wingspan", "big wingspan"]):
-        height_min = max(height_min or 0, 77)  # ~6'5+
-    if any(k in ql for k in ["big", "huge", "strong", "power", "physical", "burly"]):
-        # weight intent, not absolute requirement
-        pass
-    if any(k in ql for k in ["skinny", "lean", "lanky", "thin"]):
-        pass
-
-    growth = any(k in ql for k in ["room to grow", "upside", "project", "raw", "high ceiling", "frame to add", "fill out"])
-
-    # position-relative cues
-    wants_big = any(k in ql for k in ["big man", "rim protector", "post", "paint", "center"])
-    wants_guard = any(k in ql for k in ["point guard", "pg", "guard", "ball handler"])
-    wants_forward = any(k in ql for k in ["forward", "sf", "pf", "wing", "3-and-d"])
-
-    # soft thresholds (applied only when query implies size)
-    if wants_big:
-        height_min = max(height_min or 0, 79)  # 6'7+
-    if wants_guard and any(k in ql for k in ["tall", "big", "long"]):
-        height_min = max(height_min or 0, 75)  # 6'3+
-    if wants_forward:
-        height_min = max(height_min or 0, 76)  # 6'4+
-
-    return {
-        "height_min": height_min,
-        "height_max": height_max,
-        "growth": growth,
-        "skinny": any(k in ql for k in ["skinny", "lean", "lanky", "thin"]),
-        "strong": any(k in ql for k in ["strong", "physical", "powerful", "burly", "thick"]),
-    }
-
-
-def _infer_role_hints(q: str) -> set[str]:
-    """Extract role hints (guard/wing/big) with robust synonym coverage."""
-    ql = (q or "").lower()
-    hints: set[str] = set()
-
-    wing_terms = [
-        "forward", "sf", "small forward", "pf", "power forward", "wing", "3-and-d", "three and d", "combo forward"
-    ]
-    guard_terms = [
-        "guard", "pg", "point guard", "sg", "shooting guard", "combo guard", "lead guard"
-    ]
-    big_terms = [
-        "center", "big man", "rim protector", "post", "paint", "big", "five", "4/5", "4-5"
-    ]
-    if any(k in ql for k in wing_terms):
-        hints.add("wing")
-    if any(k in ql for k in guard_terms):
-        hints.add("guard")
-    if any(k in ql for k in big_terms):
-        hints.add("big")
-
-    # common abbreviations like 'c' as a token
-    toks = re.findall(r"[a-z0-9']+", ql)
-    if "c" in toks:
-        hints.add("big")
-    if "f" in toks and "g" not in toks:
-        hints.add("wing")
-    if "g" in toks and "f" not in toks:
-        hints.add("guard")
-
-    return hints
-
-
 from collections import OrderedDict
 
 
-def _expand_query_synonyms(q: str) -> list[str]:
-    """Advanced synonym expansion to improve recall when semantic search under-fires."""
-    ql = (q or "").lower()
-    synonyms: list[str] = []
-
-    mapping = {
-        "shoot 3": ["three point", "3pt", "shot3", "spacing", "stretch"],
-        "can shoot": ["three point", "catch and shoot", "spot up"],
-        "rim protector": ["block", "paint", "anchor", "drop coverage"],
-        "room to grow": ["upside", "project", "frame", "fill out"],
-        "big": ["size", "physical", "strong"],
-        "tall": ["length", "long", "rangy"],
-        "clutch": ["late game", "pressure", "close game"],
-        "playmaker": ["passer", "creator", "ball handler"],
-    }
-    for k, vs in mapping.items():
-        if k in ql:
-            synonyms.extend(vs)
-    return synonyms
-
-
 def _search_cache_key(query: str, intent_tags: list[str], required_tags: list[str], n_results: int) -> tuple:
     return (
         (query or "").strip().lower(),
@@ -635,9 +548,10 @@ def _get_search_collection():
             raise
 
 @st.cache_data(show_spinner=False, max_entries=50000)
-def _tag_play_cached(description: str) -> tuple[str, ...]:
-    from src.processing.play_tagger import tag_play
-    return tuple(tag_play(description or ""))
+def _tag_play_cached(description: str, tag_mask: int | None = None) -> tuple[str, ...]:
+    # Stored plays.tag_mask when present; only untagged rows fall back to the text tagger.
+    from src.processing.play_tagger import stored_tags
+    return tuple(sorted(stored_tags(tag_mask, description)))
 
 def _required_tag_threshold(required_tags: list[str]) -> int:
     n = len(set([t for t in required_tags if t]))
@@ -831,7 +745,7 @@ def _get_player_profile(player_id: str):
             profile["stats"] = {}
 
         # plays
-        cur.execute("SELECT play_id, description, game_id, clock_display FROM plays WHERE player_id = ? LIMIT 25", (pid,))
+        cur.execute("SELECT play_id, description, game_id, clock_display, tag_mask FROM plays WHERE player_id = ? LIMIT 25", (pid,))
         plays = cur.fetchall()
         profile["plays"] = plays
         if plays:
@@ -1354,14 +1268,21 @@ def _render_profile_overlay(player_id: str):
             cols[1].metric("BLK", _val(stats.get("blk")))
             cols[2].metric("MIN", _val(stats.get("minutes")))
             cols[3].metric("TOV", _val(stats.get("turnover")))
+            def _rank(metric):
+                try:
+                    from src.percentiles import empirical_percentile
+                    p = empirical_percentile(stats.get(metric), pos_for_pct, metric)
+                except Exception:
+                    p = None
+                return f"{p}th %ile for {pos_for_pct}" if p is not None else None
             cols = st.columns(3)
-            cols[0].metric("FG%", _pct(stats.get("fg_percent")))
-            cols[1].metric("3P%", _pct(stats.get("shot3_percent")))
-            cols[2].metric("FT%", _pct(stats.get("ft_percent")))
+            cols[0].metric("FG%", _pct(stats.get("fg_percent")), help=_rank("fg_percent"))
+            cols[1].metric("3P%", _pct(stats.get("shot3_percent")), help=_rank("shot3_percent"))
+            cols[2].metric("FT%", _pct(stats.get("ft_percent")), help=_rank("ft_percent"))
             cols = st.columns(3)
-            cols[0].metric("PPG", _val(stats.get("ppg")))
-            cols[1].metric("RPG", _val(stats.get("rpg")))
-            cols[2].metric("APG", _val(stats.get("apg")))
+            cols[0].metric("PPG", _val(stats.get("ppg")), help=_rank("ppg"))
+            cols[1].metric("RPG", _val(stats.get("rpg")), help=_rank("rpg"))
+            cols[2].metric("APG", _val(stats.get("apg")), help=_rank("apg"))
 
         from src.team import get_team, get_team_averages, calculate_impact
         team = get_team()
@@ -1410,8 +1331,8 @@ def _render_profile_overlay(player_id: str):
         from src.processing.play_tagger import tag_play
         plays = profile.get("plays", [])
         tag_counts = {}
-        for _, desc, _, _ in plays:
-            for t in _tag_play_cached(desc):
+        for _, desc, _, _, mask in plays:
+            for t in _tag_play_cached(desc, mask):
                 tag_counts[t] = tag_counts.get(t, 0) + 1
         if tag_counts:
             st.markdown("### Tags Applied")
@@ -1455,13 +1376,13 @@ def _render_profile_overlay(player_id: str):
         last_tags = set(st.session_state.get("last_query_tags", []) or [])
         filtered = []
         if plays:
-            for play_id, desc, game_id, clock in plays:
-                tags = set(_tag_play_cached(desc))
+            for play_id, desc, game_id, clock, mask in plays:
+                tags = set(_tag_play_cached(desc, mask))
                 if last_tags and not tags.intersection(last_tags):
                     continue
                 filtered.append((play_id, desc, game_id, clock, tags))
 
-        clips = filtered if filtered else [(p[0], p[1], p[2], p[3], set(_tag_play_cached(p[1]))) for p in plays]
+        clips = filtered if filtered else [(p[0], p[1], p[2], p[3], set(_tag_play_cached(p[1], p[4]))) for p in plays]
         tab_film, tab_social = st.tabs(["Film Room", "Social Media Scout"])
 
         with tab_film:
@@ -2348,36 +2269,22 @@ elif st.session_state.app_mode == "Search":
             required_tags = []
             finishing_intent = False
 
+            search_alpha = float(st.session_state.get("search_alpha", 1.2))
+            search_beta = float(st.session_state.get("search_beta", 3.0))
+            from src.search.query_plan import get_query_plan
+            plan = get_query_plan(query, search_alpha, search_beta)
             try:
-                from src.search.coach_dictionary import infer_intents_verbose, INTENTS
-                q_lower = (query or "").lower()
-                if " or " in q_lower:
-                    logic = "or"
-                    parts = [p.strip() for p in q_lower.split(" or ") if p.strip()]
-                elif " and " in q_lower or " but " in q_lower:
-                    logic = "and"
-                    parts = [p.strip() for p in q_lower.replace(" but ", " and ").split(" and ") if p.strip()]
-                else:
-                    logic = "single"
-                    parts = [q_lower]
-
-                numeric_filters = []
-                pattern = re.compile(r"\b(over|under|above|below|at least|atleast|at most|atmost|more than|less than)\s+(\d+(?:\.\d+)?)%?\s*(3pt|3pt%|3pt\s*%|three|three point|three-point|ft|free throw|free-throw|fg|field goal|field-goal|shot)\b")
-                for m in pattern.finditer(q_lower):
-                    numeric_filters.append((m.group(1), float(m.group(2)), m.group(3)))
-
-                intents = {}
-                for part in parts:
-                    intents.update(infer_intents_verbose(part))
-            except:
-                intents = {}
-                q_lower = (query or "").lower()
-                numeric_filters = []
-                logic = "single"
+                from src.search.coach_dictionary import INTENTS
+            except Exception:
+                INTENTS = {}
+            q_lower = plan.lowered
+            logic = plan.logic
+            numeric_filters = list(plan.numeric_filters)
+            intents = plan.intents
             
             exclude_tags = set()
-            role_hints = _infer_role_hints(query)
-            size_intents = _infer_size_intents(query)
+            role_hints = set(plan.role_hints)
+            size_intents = dict(plan.size_intents)
             matched_phrases = []
             apply_exclude = any(tok in q_lower for tok in [" no ", "avoid", "without", "dont", "don't", "not "])
             leadership_intent = "leadership" in intents
@@ -2451,16 +2358,14 @@ elif st.session_state.app_mode == "Search":
                 vector_search_ready = False
                 st.info(f"Semantic index unavailable, using keyword fallback search. ({e})")
 
-            from src.search.semantic import build_expanded_query, semantic_search, expand_query_terms
-            expanded_terms = (expand_query_terms(query) or []) + (_expand_query_synonyms(query) or [])
+            from src.search.semantic import build_expanded_query, semantic_search
+            expanded_terms = list(plan.synonyms)
             expanded_query = build_expanded_query(query, (matched_phrases or []) + (expanded_terms or []))
 
             st.markdown("<script>document.body.classList.add('searching');</script>", unsafe_allow_html=True)
 
             cache_key = _search_cache_key(query, intent_tags, required_tags, n_results)
             cached_play_ids = _cache_get(cache_key)
-            search_alpha = float(st.session_state.get("search_alpha", 1.2))
-            search_beta = float(st.session_state.get("search_beta", 3.0))
             use_hyde = bool(st.session_state.get("use_hyde", False))
             emphasis = st.session_state.get("emphasis_traits") or []
             breakdowns = {}
@@ -2482,6 +2387,7 @@ elif st.session_state.app_mode == "Search":
                             use_hyde=use_hyde,
                             active_concepts=active_concepts,
                             constraints=st.session_state.get("dna_constraints") or None,
+                            plan=plan,
                         )
                     except:
                         play_ids = []
@@ -2503,6 +2409,7 @@ elif st.session_state.app_mode == "Search":
                                 use_hyde=use_hyde,
                                 active_concepts=active_concepts,
                                 constraints=st.session_state.get("dna_constraints") or None,
+                                plan=plan,
                             )
                         except:
                             play_ids = []
@@ -2614,7 +2521,7 @@ elif st.session_state.app_mode == "Search":
                 placeholders = ",".join(["?"] * len(play_ids))
                 cur.execute(
                     f"""
-                    SELECT play_id, description, game_id, clock_display, player_id, player_name
+                    SELECT play_id, description, game_id, clock_display, player_id, player_name, tag_mask
                     FROM plays
                     WHERE play_id IN ({placeholders})
                     """,
@@ -2849,7 +2756,7 @@ elif st.session_state.app_mode == "Search":
 
                 rows = []
                 breakdown_lookup = st.session_state.get("search_breakdowns", {}) or {}
-                for pid, desc, gid, clock, player_id, player_name in play_rows:
+                for pid, desc, gid, clock, player_id, player_name, tag_mask in play_rows:
                     pid_norm = _normalize_player_id(player_id)
                     mapped_pid = player_id_map.get(pid_norm) or pid_norm
                     meta = player_meta.get(mapped_pid) if mapped_pid else None
@@ -2879,7 +2786,7 @@ elif st.session_state.app_mode == "Search":
 
                     debug_counts['after_trait_sliders'] += 1
 
-                    play_tags = list(_tag_play_cached(desc))
+                    play_tags = list(_tag_play_cached(desc, tag_mask))
                     if "non_possession" in play_tags: continue
                     if apply_exclude and exclude_tags and set(play_tags).intersection(exclude_tags): continue
                     if required_tags:
@@ -2,10 +2,7 @@ import streamlit as st
 import os
 import sys
 import subprocess
-import time
-import requests
 from dotenv import load_dotenv
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_result
 
 
 def get_secret(secret_name: str):
@@ -23,40 +20,7 @@ def get_secret(secret_name: str):
         except Exception:
             return None
 
-# --- 1. PROACTIVE RATE LIMITING (Monkey Patch) ---
-# We overwrite requests.get globally so that src.ingestion.pipeline 
-# automatically uses this robust version without needing code changes there.
-
-# Save the original function so we can still call it
-if not hasattr(requests, "_original_get"):
-    requests._original_get = requests.get
-
-def is_rate_limit_error(response):
-    """Return True if we hit a 429 (Too Many Requests) or 500+ error."""
-    if response.status_code == 429:
-        print("⚠️ Rate limit hit (429). Retrying...")
-        return True
-    return response.status_code >= 500
-
-@retry(
-    retry=retry_if_result(is_rate_limit_error),
-    wait=wait_exponential(multiplier=1.5, min=2, max=60), # Wait 2s, 3s, 4.5s...
-    stop=stop_after_attempt(10)
-)
-def robust_get(*args, **kwargs):
-    """
-    A wrapper around requests.get that:
-    1. Sleeps 1.1s BEFORE the request (Proactive limiting)
-    2. Retries automatically if it hits a 429 (Reactive limiting)
-    """
-    time.sleep(1.1)  # Throttle speed: ~1 request per 1.1 seconds
-    return requests._original_get(*args, **kwargs)
-
-# Apply the patch
-requests.get = robust_get
-
-
-# --- 2. STANDARD SETUP ---
+# --- STANDARD SETUP ---
 
 # Add project root
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -115,15 +79,21 @@ st.divider()
 st.markdown("<div style=\"font-size:20px; font-weight:800; margin-top:14px;\">2. Data Access (Discovery)</div>", unsafe_allow_html=True)
 st.caption("Scan your Synergy key to see exactly what data you can access.")
 
-# Import modules AFTER patching requests
 from src.ingestion.capabilities import discover_capabilities  # noqa: E402
 from src.ingestion.pipeline import PipelinePlan, run_pipeline  # noqa: E402
+from src.ingestion.rate_limiter import POLICIES  # noqa: E402
+from src.ingestion.synergy_client import SynergyClient  # noqa: E402
+
+# Admin runs pace themselves through the client's rate policy; nothing else in
+# this process is throttled.
+ADMIN_RATE_POLICY = "adaptive"
 
 api_key_for_scan = cloud_key or local_key
 
 @st.cache_data(ttl=60 * 15, show_spinner=False)
 def _cached_capabilities(api_key: str):
-    return discover_capabilities(api_key=api_key, league_code="ncaamb")
+    client = SynergyClient(api_key=api_key, policy=ADMIN_RATE_POLICY)
+    return discover_capabilities(api_key=api_key, league_code="ncaamb", client=client)
 
 scan_col1, scan_col2 = st.columns([1, 3])
 with scan_col1:
@@ -202,6 +172,12 @@ if report:
         else:
             st.markdown("<div style=\"font-size:20px; font-weight:800; margin-top:14px;\">3. Run Pipeline</div>", unsafe_allow_html=True)
             ingest_events = st.toggle("Ingest Play-by-Play Events", value=True)
+            rate_policy = st.selectbox(
+                "Request pace",
+                list(POLICIES),
+                index=list(POLICIES).index(ADMIN_RATE_POLICY),
+                help="conservative: 1 worker, <= 0.5 req/s. adaptive: ramps until the API pushes back. burst: short pulls only.",
+            )
 
             st.markdown("### 🚀 Jump to Search")
             if st.button("Open Search Interface"):
@@ -245,6 +221,7 @@ if report:
                         season_id=chosen_season_id,
                         team_ids=selected_team_ids,
                         ingest_events=ingest_events,
+                        rate_policy=rate_policy,
                     )
 
                     try:
@@ -62,6 +62,9 @@ def generate_scouting_report(player_obj: Dict[str, Any]) -> str:
     archetypes = assign_archetypes({"ppg": ppg, "rpg": rpg, "apg": apg, "weight_lb": w_lb}, "", pos)
     archetype_str = ", ".join(archetypes) if archetypes else "balanced"
 
+    prod_pcts = {k: calculate_percentile(v, pos, metric=k) for k, v in (("ppg", ppg), ("rpg", rpg), ("apg", apg)) if v}
+    prod_pct_str = ", ".join(f"{k.upper()} {v}th" for k, v in prod_pcts.items() if v)
+
     sims = find_similar_players(name, top_k=2)
     sim_names = [s.get("player_name") for s in sims if s.get("player_name")]
     sim_str = ", ".join(sim_names) if sim_names else "N/A"
@@ -88,7 +91,8 @@ def generate_scouting_report(player_obj: Dict[str, Any]) -> str:
         f"Archetypes: {archetype_str}\n"
         f"Physical percentiles: Height {h_pct}th, Weight {w_pct}th\n"
         f"Production: {ppg} PPG, {rpg} RPG, {apg} APG\n"
-        f"Similar players: {sim_str}\n"
+        + (f"Production percentiles (vs position): {prod_pct_str}\n" if prod_pct_str else "")
+        + f"Similar players: {sim_str}\n"
         "Write the report in Markdown."
     )
 
@@ -0,0 +1,65 @@
+"""Shared pooled HTTP session for every outbound client.
+
+One `requests.Session` per process, so Synergy, Serper and OpenAI calls reuse
+keep-alive connections instead of paying TCP + TLS setup per request. urllib3
+keeps one connection pool per host; `HTTP_POOL_MAXSIZE` bounds each of them and
+`HTTP_POOL_HOSTS` bounds how many host pools are cached.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_POOL_HOSTS = 10
+DEFAULT_POOL_MAXSIZE = 16
+
+_lock = threading.Lock()
+_session: requests.Session | None = None
+_session_pid: int | None = None
+
+
+def build_session(pool_hosts: int | None = None, pool_maxsize: int | None = None) -> requests.Session:
+    """New session with keep-alive, gzip and bounded per-host pools."""
+    pool_hosts = pool_hosts or int(os.getenv("HTTP_POOL_HOSTS", DEFAULT_POOL_HOSTS))
+    pool_maxsize = pool_maxsize or int(os.getenv("HTTP_POOL_MAXSIZE", DEFAULT_POOL_MAXSIZE))
+
+    session = requests.Session()
+    # pool_block=True: a busy host makes callers wait for a free connection
+    # rather than opening (and then discarding) extra sockets.
+    adapter = HTTPAdapter(pool_connections=pool_hosts, pool_maxsize=pool_maxsize, pool_block=True)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(
+        {
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+        }
+    )
+    return session
+
+
+def get_session() -> requests.Session:
+    """Process-wide shared session (rebuilt after fork; sockets can't be shared)."""
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session is not None and _session_pid == pid:
+        return _session
+    with _lock:
+        if _session is None or _session_pid != pid:
+            _session = build_session()
+            _session_pid = pid
+        return _session
+
+
+def reset_session() -> None:
+    """Close and drop the shared session (tests, config changes)."""
+    global _session, _session_pid
+    with _lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+        _session_pid = None
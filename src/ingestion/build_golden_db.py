@@ -1,14 +1,11 @@
 import os
 import sys
-import time
-import requests
 import logging
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_result
 
 # --- CONFIGURATION ---
 CONFERENCE_FILTER = "Big 12"  # Exact string match for the conference you want
 YEARS_TO_INGEST = [2024, 2025]  # The seasons you want (e.g., 2024-25, 2025-26)
-SAFETY_DELAY_SECONDS = 2.0    # 2.0s = very safe. Do not lower this below 1.5s.
+RATE_POLICY = "conservative"  # one worker, <= 1 request / 2s; see rate_limiter.POLICIES
 
 # Logging Setup
 logging.basicConfig(
@@ -29,48 +26,61 @@ sys.path.append(CURRENT_DIR)
 try:
     from src.ingestion.pipeline import PipelinePlan, run_pipeline
     from src.ingestion.capabilities import discover_capabilities
+    from src.ingestion.rate_limiter import get_policy
+    from src.ingestion.synergy_client import SynergyClient
 except ImportError:
     logging.error("Could not find 'src.ingestion'. Make sure you run this from the repo root.")
     sys.exit(1)
 
-# --- THE SAFETY PATCH ---
-# This overrides the standard requests.get to enforce a hard sleep.
-# This guarantees that NO part of your codebase can speed through the API limits.
 
-if not hasattr(requests, "_original_get"):
-    requests._original_get = requests.get
+def select_targets(report):
+    """Season ids matching YEARS_TO_INGEST and the unique CONFERENCE_FILTER team ids in them."""
+    target_season_ids = []
+    target_team_ids = []
+    for season in report.seasons:
+        # Match "2024" or "2025" in the season year or name
+        if season.year in YEARS_TO_INGEST or any(str(y) in season.name for y in YEARS_TO_INGEST):
+            target_season_ids.append(season.id)
+            logging.info(f"✅ Found Target Season: {season.name} ({season.id})")
+            
+            # Find teams in this season belonging to the conference
+            teams_in_season = report.teams_by_season.get(season.id, [])
+            for team in teams_in_season:
+                # Check Conference (Case insensitive)
+                conf = (team.conference or "").lower()
+                if CONFERENCE_FILTER.lower() in conf:
+                    target_team_ids.append(team.id)
+    
+    # Deduplicate teams
+    return target_season_ids, list(set(target_team_ids))
 
-def is_rate_limit_error(response):
-    if response.status_code == 429:
-        logging.warning("⚠️ 429 Rate Limit Hit. The safety delay will handle this, but backing off now.")
-        return True
-    return response.status_code >= 500
 
-@retry(
-    retry=retry_if_result(is_rate_limit_error),
-    wait=wait_exponential(multiplier=2, min=4, max=60), # Aggressive backoff if we do hit a limit
-    stop=stop_after_attempt(10)
-)
-def safe_get(*args, **kwargs):
-    # 1. THE HARD PAUSE
-    time.sleep(SAFETY_DELAY_SECONDS)
-    
-    # 2. Log the URL for audit trails (sanitized of keys if necessary)
-    url = args[0] if len(args) > 0 else kwargs.get("url", "unknown_url")
-    logging.info(f"⬇️ Fetching: {url} (Wait: {SAFETY_DELAY_SECONDS}s)")
-    
-    return requests._original_get(*args, **kwargs)
+def dry_run():
+    """Print the request / wall-time plan for this build from cached data only (no key, no calls)."""
+    import json
 
-# Apply the patch
-requests.get = safe_get
-logging.info(f"🛡️ Safety Patch Applied: {SAFETY_DELAY_SECONDS}s delay enforced on all requests.")
+    from src.ingestion.planner import PlanningClient, plan_runs
+
+    # stdout carries only the JSON plan
+    logging.getLogger().setLevel(logging.WARNING)
+    report = discover_capabilities(api_key=None, league_code="ncaamb", client=PlanningClient())
+    season_ids, team_ids = select_targets(report)
+    if not season_ids:
+        logging.error("No target seasons in the cached capability data; run discovery once first.")
+        return
+    plans = [
+        PipelinePlan(league_code="ncaamb", season_id=sid, team_ids=team_ids, ingest_events=True, rate_policy=RATE_POLICY)
+        for sid in season_ids
+    ]
+    print(json.dumps(plan_runs(plans), indent=2))
 
 
 def main():
     print("\n🏀 PortalRecruit | Golden Database Builder")
     print("===========================================")
     print("This script performs a 'Low & Slow' ingestion to build a static dataset.")
-    print("Policy: Sequential requests, 2s delay, filtered scope.\n")
+    policy = get_policy(RATE_POLICY)
+    print(f"Policy: {policy.name} ({policy.max_workers} worker(s), <= {policy.max_rate:g} req/s), filtered scope.\n")
 
     # 1. Secure Input
     api_key = input("Enter Full Access Synergy API Key: ").strip()
@@ -80,33 +90,17 @@ def main():
 
     # 2. Discovery Phase
     print(f"\n🔍 Scanning for {CONFERENCE_FILTER} teams in {YEARS_TO_INGEST}...")
-    report = discover_capabilities(api_key=api_key, league_code="ncaamb")
-    
-    target_season_ids = []
-    target_team_ids = []
+    report = discover_capabilities(
+        api_key=api_key, league_code="ncaamb", client=SynergyClient(api_key=api_key, policy=RATE_POLICY)
+    )
 
     # 3. Filtering Logic
     if not report.seasons:
         logging.error("No seasons found. Check API Key permissions.")
         return
 
-    for season in report.seasons:
-        # Match "2024" or "2025" in the season year or name
-        if season.year in YEARS_TO_INGEST or any(str(y) in season.name for y in YEARS_TO_INGEST):
-            target_season_ids.append(season.id)
-            logging.info(f"✅ Found Target Season: {season.name} ({season.id})")
-            
-            # Find teams in this season belonging to the conference
-            teams_in_season = report.teams_by_season.get(season.id, [])
-            for team in teams_in_season:
-                # Check Conference (Case insensitive)
-                conf = (team.conference or "").lower()
-                if CONFERENCE_FILTER.lower() in conf:
-                    target_team_ids.append(team.id)
-    
-    # Deduplicate teams
-    target_team_ids = list(set(target_team_ids))
-    
+    target_season_ids, target_team_ids = select_targets(report)
+
     if not target_team_ids:
         logging.error(f"❌ No teams found for conference '{CONFERENCE_FILTER}'. Check spelling.")
         # Fallback: Ask user if they want to proceed with ALL teams (Dangerous, so we warn)
@@ -118,7 +112,7 @@ def main():
 
     # 4. Execution Loop
     # We run a separate pipeline for each season to keep checkpoints clean
-    print(f"\n🚀 Starting Ingestion. Estimated time: {len(target_team_ids) * 30 * 2.0 / 60:.1f} minutes per season (approx).")
+    print(f"\n🚀 Starting Ingestion. Estimated time: {len(target_team_ids) * 30 / policy.max_rate / 60:.1f} minutes per season (approx).")
     print("DO NOT CLOSE THIS TERMINAL.\n")
 
     for season_id in target_season_ids:
@@ -129,6 +123,7 @@ def main():
             season_id=season_id,
             team_ids=target_team_ids,
             ingest_events=True, # We need play-by-play for semantic search
+            rate_policy=RATE_POLICY,
         )
 
         try:
@@ -143,4 +138,7 @@ def main():
     print("You can now commit the 'chroma_db' (or equivalent) folder to Git.")
 
 if __name__ == "__main__":
-    main()
+    if "--dry-run" in sys.argv:
+        dry_run()
+    else:
+        main()
@@ -102,15 +102,19 @@ def discover_capabilities(
     max_seasons: int = 6,
     probe_teams: bool = True,
     probe_games: bool = True,
+    client: SynergyClient | None = None,
 ) -> CapabilityReport:
     """Discover what the provided API key can access.
 
     This is intentionally conservative:
     - Minimal calls (seasons + a couple probes)
     - Never raises; returns warnings + booleans
+
+    `client` overrides the default SynergyClient(api_key) (e.g. a cache-only
+    client for dry runs).
     """
 
-    client = SynergyClient(api_key=api_key)
+    client = client or SynergyClient(api_key=api_key)
     warnings: list[str] = []
 
     seasons_payload = client.get_seasons(league_code=league_code)
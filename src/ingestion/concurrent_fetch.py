@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any
+
+
+def fetch_concurrently(
+    fn: Callable[[Any], Any],
+    items: Iterable[Any],
+    max_workers: int = 4,
+    max_in_flight: int | None = None,
+) -> Iterator[tuple[Any, Any]]:
+    """Run fn(item) on a thread pool, yielding (item, result) as they finish.
+
+    Meant for I/O-bound API calls that share a rate limiter: the pool only hides
+    latency, the limiter decides the request rate. Results are yielded to the
+    calling thread, so callers can keep single-threaded DB writes. At most
+    `max_in_flight` calls (default 2 * workers) are outstanding, so huge item
+    lists are not materialized as futures. Exceptions from fn propagate.
+    """
+    if max_workers <= 1:
+        for item in items:
+            yield item, fn(item)
+        return
+
+    limit = max_in_flight or (2 * max_workers)
+    it = iter(items)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pending: dict = {}
+        for item in it:
+            pending[pool.submit(fn, item)] = item
+            if len(pending) >= limit:
+                break
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                item = pending.pop(fut)
+                yield item, fut.result()
+            for item in it:
+                pending[pool.submit(fn, item)] = item
+                if len(pending) >= limit:
+                    break
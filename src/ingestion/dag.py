@@ -0,0 +1,391 @@
+"""Dependency-aware stage runner for the ingest -> derive -> model pipeline.
+
+Each Stage declares the resources it reads and writes:
+
+    table:<name>   a SQLite table in the project database (db_path())
+    file:<path>    a file or directory (relative to the project root)
+
+A stage depends on every stage that writes one of its inputs. Stages whose
+dependencies are done run in parallel (clustering and the training-set export,
+say). A stage is skipped when the fingerprint of its inputs matches the one
+recorded at its last successful run; every run/skip/failure is stored in
+stage_runs with its duration and row count.
+
+Table fingerprints are (version, COUNT(*), MAX(rowid)). The version is bumped
+whenever a stage that writes the table reports changed rows, so in-place
+updates made through the DAG are seen as well. File fingerprints are the
+mtime/size of the file, or of every file under a directory.
+
+    python -m src.ingestion.dag --season <season_id> [--teams a,b] [--force]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Any
+
+from src.ingestion.db import connect_db, ensure_schema, project_root
+
+STATUS_RAN = "ran"
+STATUS_SKIPPED = "skipped"
+STATUS_FAILED = "failed"
+STATUS_BLOCKED = "blocked"  # an upstream stage failed
+
+
+@dataclass(frozen=True)
+class Stage:
+    """fn(ctx) runs the stage; ctx maps finished upstream stage names to their results.
+
+    fn may return an int (rows written), a dict with a "rows" key, or None.
+    always=True stages run on every invocation (e.g. fetching from the API).
+    """
+
+    name: str
+    fn: Callable[[dict[str, Any]], Any]
+    inputs: tuple[str, ...] = ()
+    outputs: tuple[str, ...] = ()
+    always: bool = False
+
+
+def ensure_dag_tables(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS stage_runs (
+            stage TEXT PRIMARY KEY,
+            status TEXT,
+            input_fingerprint TEXT,
+            duration_ms REAL,
+            row_count INTEGER,
+            last_error TEXT,
+            updated_at TEXT
+        )
+        """
+    )
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS dataset_versions (resource TEXT PRIMARY KEY, version INTEGER NOT NULL DEFAULT 0)"
+    )
+    conn.commit()
+
+
+def _resource_state(conn: sqlite3.Connection, resource: str) -> list:
+    kind, _, name = resource.partition(":")
+    if kind == "table":
+        version = conn.execute("SELECT version FROM dataset_versions WHERE resource = ?", (resource,)).fetchone()
+        try:
+            count, max_rowid = conn.execute(f"SELECT COUNT(*), MAX(rowid) FROM {name}").fetchone()
+        except sqlite3.OperationalError:
+            count, max_rowid = None, None
+        return [version[0] if version else 0, count, max_rowid]
+    if kind == "file":
+        path = os.path.join(project_root(), name)
+        if os.path.isdir(path):
+            state = []
+            for root, _, files in os.walk(path):
+                for f in sorted(files):
+                    st = os.stat(os.path.join(root, f))
+                    state.append([os.path.relpath(os.path.join(root, f), path), st.st_mtime_ns, st.st_size])
+            return sorted(state)
+        if os.path.exists(path):
+            st = os.stat(path)
+            return [st.st_mtime_ns, st.st_size]
+        return [None]
+    raise ValueError(f"Unknown resource kind: {resource!r}")
+
+
+def fingerprint(conn: sqlite3.Connection, resources: Iterable[str]) -> str:
+    state = {r: _resource_state(conn, r) for r in sorted(resources)}
+    return hashlib.sha256(json.dumps(state, sort_keys=True).encode()).hexdigest()
+
+
+def _rows(result: Any) -> int | None:
+    if isinstance(result, bool):
+        return None
+    if isinstance(result, int):
+        return result
+    if isinstance(result, dict) and isinstance(result.get("rows"), int):
+        return result["rows"]
+    return None
+
+
+def _dependencies(stages: list[Stage]) -> dict[str, set[str]]:
+    names = [s.name for s in stages]
+    if len(set(names)) != len(names):
+        raise ValueError("Stage names must be unique")
+    writers: dict[str, list[str]] = {}
+    for s in stages:
+        for out in s.outputs:
+            writers.setdefault(out, []).append(s.name)
+    # Stages are listed in a valid order, so only earlier writers count: a stage
+    # that rewrites a table it also reads does not depend on itself or later ones.
+    order = {s.name: i for i, s in enumerate(stages)}
+    deps = {}
+    for s in stages:
+        deps[s.name] = {w for r in s.inputs for w in writers.get(r, []) if order[w] < order[s.name]}
+    return deps
+
+
+def run_dag(
+    stages: list[Stage],
+    only: Iterable[str] | None = None,
+    force: bool = False,
+    max_workers: int = 2,
+    db_connect: Callable[[], sqlite3.Connection] = connect_db,
+    log: Callable[[str], None] | None = print,
+) -> dict[str, dict]:
+    """Run `stages` (listed in dependency order). Returns per-stage metrics.
+
+    only   run just these stages (their dependencies are assumed up to date)
+    force  ignore fingerprints and run every selected stage
+    """
+    selected = [s for s in stages if only is None or s.name in set(only)]
+    deps = _dependencies(selected)
+    by_name = {s.name: s for s in selected}
+
+    def open_conn() -> sqlite3.Connection:
+        c = db_connect()
+        c.execute("PRAGMA busy_timeout = 30000")
+        return c
+
+    conn = open_conn()
+    ensure_schema(conn)
+    ensure_dag_tables(conn)
+    conn.close()
+    # Bookkeeping (fingerprints, stage_runs) is serialized; the stages themselves are not.
+    lock = threading.Lock()
+
+    metrics: dict[str, dict] = {}
+    ctx: dict[str, Any] = {}
+
+    def record(stage: Stage, status: str, fp: str | None, duration: float, rows: int | None, error: str | None):
+        metrics[stage.name] = {"status": status, "duration_s": round(duration, 3), "rows": rows, "error": error}
+        if log:
+            detail = f" rows={rows}" if rows is not None else ""
+            detail += f" error={error}" if error else ""
+            log(f"[dag] {stage.name}: {status} in {duration:.2f}s{detail}")
+        with lock:
+            c = open_conn()
+            try:
+                if status == STATUS_RAN:
+                    c.execute(
+                        """
+                        INSERT INTO stage_runs (stage, status, input_fingerprint, duration_ms, row_count, last_error, updated_at)
+                        VALUES (?, ?, ?, ?, ?, NULL, ?)
+                        ON CONFLICT(stage) DO UPDATE SET status = excluded.status,
+                            input_fingerprint = excluded.input_fingerprint, duration_ms = excluded.duration_ms,
+                            row_count = excluded.row_count, last_error = NULL, updated_at = excluded.updated_at
+                        """,
+                        (stage.name, status, fp, duration * 1000, rows, _now()),
+                    )
+                    if rows != 0:
+                        c.executemany(
+                            """
+                            INSERT INTO dataset_versions (resource, version) VALUES (?, 1)
+                            ON CONFLICT(resource) DO UPDATE SET version = version + 1
+                            """,
+                            [(r,) for r in stage.outputs if r.startswith("table:")],
+                        )
+                elif status == STATUS_FAILED:
+                    # Keep the last good fingerprint out: a failed stage must rerun.
+                    c.execute(
+                        """
+                        INSERT INTO stage_runs (stage, status, input_fingerprint, duration_ms, last_error, updated_at)
+                        VALUES (?, ?, NULL, ?, ?, ?)
+                        ON CONFLICT(stage) DO UPDATE SET status = excluded.status, input_fingerprint = NULL,
+                            duration_ms = excluded.duration_ms, last_error = excluded.last_error,
+                            updated_at = excluded.updated_at
+                        """,
+                        (stage.name, status, duration * 1000, error, _now()),
+                    )
+                c.commit()
+            finally:
+                c.close()
+
+    def execute(stage: Stage) -> tuple[str, Any]:
+        t0 = time.perf_counter()
+        with lock:
+            c = open_conn()
+            try:
+                fp = fingerprint(c, stage.inputs)
+                last = c.execute(
+                    "SELECT input_fingerprint FROM stage_runs WHERE stage = ? AND status = ?",
+                    (stage.name, STATUS_RAN),
+                ).fetchone()
+                missing = any(_resource_state(c, r) == [None] for r in stage.outputs if r.startswith("file:"))
+            finally:
+                c.close()
+        if not (force or stage.always or missing) and last and last[0] == fp:
+            record(stage, STATUS_SKIPPED, fp, time.perf_counter() - t0, None, None)
+            return STATUS_SKIPPED, None
+        try:
+            result = stage.fn(dict(ctx))
+        except Exception as exc:  # noqa: BLE001 - a stage failure must not kill independent stages
+            record(stage, STATUS_FAILED, None, time.perf_counter() - t0, None, f"{type(exc).__name__}: {exc}")
+            return STATUS_FAILED, None
+        record(stage, STATUS_RAN, fp, time.perf_counter() - t0, _rows(result), None)
+        return STATUS_RAN, result
+
+    pending = list(selected)
+    running: dict = {}
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        while pending or running:
+            for stage in list(pending):
+                states = [metrics.get(d, {}).get("status") for d in deps[stage.name]]
+                if any(s in (STATUS_FAILED, STATUS_BLOCKED) for s in states):
+                    pending.remove(stage)
+                    record(stage, STATUS_BLOCKED, None, 0.0, None, "upstream stage failed")
+                elif all(s in (STATUS_RAN, STATUS_SKIPPED) for s in states):
+                    pending.remove(stage)
+                    running[pool.submit(execute, stage)] = stage
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                stage = running.pop(fut)
+                status, result = fut.result()
+                if status == STATUS_RAN:
+                    ctx[stage.name] = result
+    return {name: metrics[name] for name in by_name if name in metrics}
+
+
+def _now() -> str:
+    return datetime.now(UTC).isoformat()
+
+
+def default_stages(plan=None, api_key: str | None = None) -> list[Stage]:
+    """The project pipeline. Without a plan the API ingest stage is left out.
+
+    Like the scripts it wraps, this expects to run from the project root.
+    """
+    stages = []
+    if plan is not None:
+        from dataclasses import replace
+
+        from src.ingestion.pipeline import run_pipeline
+
+        def ingest(ctx):
+            out = run_pipeline(replace(plan, derive_traits=False), api_key=api_key)
+            # Re-fetching unchanged data modifies no rows, so downstream stages stay fresh.
+            return dict(out, rows=out["changes"])
+
+        stages.append(
+            Stage("ingest", ingest, outputs=("table:games", "table:players", "table:plays"), always=True)
+        )
+
+    def tags(ctx):
+        from src.processing.apply_tags import apply_tags
+
+        return apply_tags()
+
+    def traits(ctx):
+        from src.processing.trait_engine import run_trait_engine
+
+        # After an ingest, fold every not-yet-folded game (the run's and any left
+        # behind earlier); without one, or after a refetch, rebuild.
+        ingest = ctx.get("ingest")
+        full = ingest is None or ingest.get("traits_full", True)
+        out = run_trait_engine(incremental=not full)
+        return dict(out, rows=out["players"])
+
+    def embeddings(ctx):
+        from src.processing.generate_embeddings import generate_embeddings
+
+        return generate_embeddings()
+
+    def clusters(ctx):
+        from src.analysis.clustering import discover_archetypes
+
+        return len(discover_archetypes(n_clusters=8))
+
+    def training_set(ctx):
+        from scripts.fetch_training_data import main as export_training_set
+
+        return export_training_set()
+
+    def translatability(ctx):
+        from src.ml.translatability import build_training_frame, save_artifacts, train_model
+
+        df = build_training_frame()
+        if df.empty:
+            raise RuntimeError("Training frame is empty. Ensure multiple seasons are ingested.")
+        result = train_model(df)
+        root = project_root()
+        save_artifacts(
+            result,
+            os.path.join(root, "models", "translatability_xgb.json"),
+            os.path.join(root, "models", "translatability_meta.json"),
+        )
+        return result.train_rows
+
+    stages += [
+        Stage("tags", tags, inputs=("table:plays",), outputs=("table:play_tags",)),
+        # Reads play_tags so it runs after tags: both write plays (tag_mask), and
+        # running them side by side would contend for the SQLite write lock.
+        Stage(
+            "traits",
+            traits,
+            inputs=("table:plays", "table:players", "table:play_tags"),
+            outputs=("table:player_traits",),
+        ),
+        Stage(
+            "embeddings", embeddings, inputs=("table:plays", "table:play_tags"), outputs=("file:data/vector_db",)
+        ),
+        Stage("clusters", clusters, inputs=("file:data/vector_db",), outputs=("file:data/cluster_map.json",)),
+        Stage(
+            "training_set",
+            training_set,
+            inputs=("file:data/vector_db", "table:players"),
+            outputs=("file:data/full_training_set.csv",),
+        ),
+        Stage(
+            "translatability",
+            translatability,
+            inputs=("table:player_season_stats", "table:players", "table:player_traits"),
+            outputs=("file:models/translatability_xgb.json",),
+        ),
+    ]
+    return stages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the pipeline stages that are out of date.")
+    parser.add_argument("--league", default="ncaamb")
+    parser.add_argument("--season", default=None, help="Season to ingest first (omit to only rebuild derived data)")
+    parser.add_argument("--teams", default="", help="Comma-separated team ids (default: all accessible)")
+    parser.add_argument("--stages", default="", help="Comma-separated subset of stages to run")
+    parser.add_argument("--force", action="store_true", help="Run stages even if their inputs are unchanged")
+    parser.add_argument("--workers", type=int, default=2, help="Independent stages to run at once")
+    parser.add_argument("--json", action="store_true", help="Print the per-stage metrics as JSON")
+    args = parser.parse_args()
+
+    plan = None
+    if args.season:
+        from src.ingestion.pipeline import PipelinePlan
+
+        teams = [t for t in args.teams.split(",") if t]
+        plan = PipelinePlan(league_code=args.league, season_id=args.season, team_ids=teams)
+
+    only = [s for s in args.stages.split(",") if s] or None
+    metrics = run_dag(
+        default_stages(plan, api_key=os.getenv("SYNERGY_API_KEY")),
+        only=only,
+        force=args.force,
+        max_workers=args.workers,
+    )
+    if args.json:
+        print(json.dumps(metrics, indent=2))
+    if any(m["status"] in (STATUS_FAILED, STATUS_BLOCKED) for m in metrics.values()):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import os
 import sqlite3
+from collections.abc import Iterable, Sequence
 
 
 def project_root() -> str:
@@ -9,7 +10,8 @@ def project_root() -> str:
 
 
 def db_path() -> str:
-    return os.path.join(project_root(), "data", "skout.db")
+    # SKOUT_DB_PATH keeps stand-in / benchmark runs away from the real database.
+    return os.getenv("SKOUT_DB_PATH") or os.path.join(project_root(), "data", "skout.db")
 
 
 def connect_db() -> sqlite3.Connection:
@@ -18,6 +20,60 @@ def connect_db() -> sqlite3.Connection:
     return sqlite3.connect(path)
 
 
+def upsert_sql(
+    table: str,
+    columns: Sequence[str],
+    key: Sequence[str],
+    update: Sequence[str] | None = None,
+    keep_existing: Sequence[str] = (),
+    ignore_changes: Sequence[str] = (),
+) -> str:
+    """INSERT ... ON CONFLICT(key) DO UPDATE SET ... WHERE <something changed>.
+
+    Unlike INSERT OR REPLACE the row is updated in place, so rowids, indexes and
+    columns outside `columns` (tags, high_school, video_path, ...) are untouched,
+    and rows whose values are unchanged are not written at all.
+
+    update:         columns to overwrite on conflict (default: all non-key columns)
+    keep_existing:  of those, columns where a NULL incoming value keeps the stored one
+    ignore_changes: of those, columns that are written but don't count as a change
+                    (e.g. updated_at)
+    """
+    if update is None:
+        update = [c for c in columns if c not in key]
+
+    def new_value(col: str) -> str:
+        if col in keep_existing:
+            return f"COALESCE(excluded.{col}, {table}.{col})"
+        return f"excluded.{col}"
+
+    sets = ",\n        ".join(f"{c} = {new_value(c)}" for c in update)
+    changed = "\n        OR ".join(
+        f"{table}.{c} IS NOT {new_value(c)}" for c in update if c not in ignore_changes
+    )
+    return f"""
+    INSERT INTO {table} ({", ".join(columns)})
+    VALUES ({", ".join("?" for _ in columns)})
+    ON CONFLICT({", ".join(key)}) DO UPDATE SET
+        {sets}
+    WHERE {changed}
+    """
+
+
+def load_temp_ids(conn: sqlite3.Connection, table: str, ids: Iterable) -> int:
+    """(Re)fill TEMP table `table`(id TEXT PRIMARY KEY) with `ids` for set-based joins.
+
+    Duplicates and empty ids are dropped; returns the number of distinct ids loaded.
+    """
+    conn.execute(f"CREATE TEMP TABLE IF NOT EXISTS {table} (id TEXT PRIMARY KEY)")
+    conn.execute(f"DELETE FROM {table}")
+    conn.executemany(
+        f"INSERT OR IGNORE INTO {table} (id) VALUES (?)",
+        ((str(i),) for i in ids if i is not None and str(i)),
+    )
+    return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
 def ensure_schema(conn: sqlite3.Connection) -> None:
     cur = conn.cursor()
 
@@ -80,6 +136,7 @@ def ensure_schema(conn: sqlite3.Connection) -> None:
         ("offense_team", "TEXT"),
         ("defense_team", "TEXT"),
         ("offensive_lineup", "TEXT"),
+        ("tag_mask", "INTEGER"),
     ]
     for col, ctype in play_columns:
         try:
@@ -151,7 +208,6 @@ def ensure_schema(conn: sqlite3.Connection) -> None:
             rim_contest_rate REAL,
             defensive_rebound_rate REAL,
             clutch_index REAL,
-            clutch_make_rate REAL,
             clutch_assist_rate REAL,
             clutch_deflection_rate REAL,
             clutch_turnover_rate REAL,
@@ -206,6 +262,41 @@ def ensure_schema(conn: sqlite3.Connection) -> None:
         """
     )
 
+    # Raw per-play-type rows behind player_season_stats; the season rows are
+    # re-aggregated from here, so an interrupted refresh resumes per (team, play type).
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS player_playtype_stats (
+            player_id TEXT NOT NULL,
+            season_id TEXT NOT NULL,
+            team_id TEXT NOT NULL,
+            play_type TEXT NOT NULL,
+            gp INTEGER,
+            possessions INTEGER,
+            points INTEGER,
+            fg_made INTEGER,
+            fg_miss INTEGER,
+            fg_attempt INTEGER,
+            fg_percent_effective REAL,
+            shot2_made INTEGER,
+            shot2_miss INTEGER,
+            shot2_attempt INTEGER,
+            shot3_made INTEGER,
+            shot3_miss INTEGER,
+            shot3_attempt INTEGER,
+            ft_made INTEGER,
+            ft_miss INTEGER,
+            ft_attempt INTEGER,
+            plus_one INTEGER,
+            shot_foul INTEGER,
+            score INTEGER,
+            turnover INTEGER,
+            updated_at TEXT,
+            PRIMARY KEY (season_id, team_id, play_type, player_id)
+        )
+        """
+    )
+
     # Safe migrations for boxscore columns
     stat_columns = [
         ("minutes", "REAL"),
@@ -297,4 +388,86 @@ def ensure_schema(conn: sqlite3.Connection) -> None:
         """
     )
 
+    ensure_tag_tables(conn)
+
+    # Ingest ledger: last fetch per (endpoint, entity) so pipelines can resume
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS ingest_ledger (
+            endpoint TEXT NOT NULL,
+            entity_id TEXT NOT NULL,
+            status TEXT,
+            attempts INTEGER DEFAULT 0,
+            payload_hash TEXT,
+            row_count INTEGER,
+            duration_ms REAL,
+            last_error TEXT,
+            updated_at TEXT,
+            PRIMARY KEY (endpoint, entity_id)
+        )
+        """
+    )
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_ingest_ledger_status ON ingest_ledger(endpoint, status)")
+
+    # Lookups by parent id (per-game plays, per-team players, per-season games):
+    # keeps incremental diffs proportional to the season, not the whole DB.
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_plays_game_id ON plays(game_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_players_team_id ON players(team_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_games_season_id ON games(season_id)")
+
     conn.commit()
+
+
+def ensure_tag_tables(conn: sqlite3.Connection) -> None:
+    """Integer tag dictionary + play_tags(tag_id, play_id), kept in sync with plays.tag_mask.
+
+    plays.tag_mask (bit i = play_tagger.TAGS[i]) is written at ingest; triggers
+    expand it into play_tags so "all steals by player X" is an index lookup:
+
+        SELECT p.* FROM play_tags t JOIN plays p USING (play_id)
+        WHERE t.tag_id = ? AND p.player_id = ?
+    """
+    from src.processing.play_tagger import TAGS
+
+    cur = conn.cursor()
+    cur.execute("CREATE TABLE IF NOT EXISTS tag_dictionary (tag_id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL)")
+    cur.executemany("INSERT OR IGNORE INTO tag_dictionary (tag_id, name) VALUES (?, ?)", list(enumerate(TAGS)))
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS play_tags (
+            tag_id INTEGER NOT NULL,
+            play_id TEXT NOT NULL,
+            PRIMARY KEY (tag_id, play_id)
+        ) WITHOUT ROWID
+        """
+    )
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_play_tags_play ON play_tags(play_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_plays_player_id ON plays(player_id)")
+
+    expand = """
+        INSERT OR IGNORE INTO play_tags (tag_id, play_id)
+        SELECT tag_id, new.play_id FROM tag_dictionary WHERE (new.tag_mask >> tag_id) & 1;
+    """
+    cur.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_plays_tags_insert AFTER INSERT ON plays
+        WHEN new.tag_mask IS NOT NULL
+        BEGIN {expand} END
+        """
+    )
+    cur.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_plays_tags_update AFTER UPDATE OF tag_mask ON plays
+        WHEN old.tag_mask IS NOT new.tag_mask
+        BEGIN
+            DELETE FROM play_tags WHERE play_id = old.play_id;
+            {expand}
+        END
+        """
+    )
+    cur.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_plays_tags_delete AFTER DELETE ON plays
+        BEGIN DELETE FROM play_tags WHERE play_id = old.play_id; END
+        """
+    )
@@ -1,7 +1,8 @@
 import argparse
 import os
-import sys
 import sqlite3
+import sys
+
 from dotenv import load_dotenv
 
 # 1. Load Environment Variables
@@ -11,7 +12,9 @@ load_dotenv(ENV_PATH)
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
 
+from src.ingestion.pipeline import UPSERT_GAMES_SQL  # noqa: E402
 from src.ingestion.synergy_client import SynergyClient  # noqa: E402
+from src.ingestion.writer import BatchWriter  # noqa: E402
 
 # Defaults (only used if no discovery data is available)
 DEFAULT_SEASON_ID = "6085b5d0e6c2413bc4ba9122"  # legacy guess: 2021-2022
@@ -127,19 +130,12 @@ def fetch_season_games(season_id: str, league_code: str = "ncaamb"):
 
 def save_schedule(games):
     conn = setup_db()
-    cursor = conn.cursor()
-    
-    count = 0
-    for game in games:
-        # Use INSERT OR REPLACE to update stats if we re-run it
-        cursor.execute('''
-            INSERT OR REPLACE INTO games 
-            (game_id, season_id, date, home_team, away_team, home_score, away_score, status, video_path)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, COALESCE((SELECT video_path FROM games WHERE game_id = ?), ?))
-        ''', game[:8] + (game[0], None)) # This complex logic preserves existing video_path links if they exist
-        count += 1
-        
-    conn.commit()
+    writer = BatchWriter(conn)
+
+    # Upsert updates stats on re-run; existing video_path links are never touched
+    count = writer.add(UPSERT_GAMES_SQL, (game[:8] for game in games))
+
+    writer.flush()
     conn.close()
     print(f"💾 Successfully cached {count} games into skout.db")
 
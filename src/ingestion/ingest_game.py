@@ -8,6 +8,7 @@ from tqdm import tqdm
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 
+from src.ingestion.pagination import iter_pages
 from src.ingestion.synergy_client import SynergyClient
 
 class GameIngester:
@@ -67,34 +68,16 @@ class GameIngester:
     def fetch_all_teams(self, season_id):
         """Paginate through all teams to ensure we get everything."""
         all_teams = []
-        skip = 0
         take = 500 # Maximize page size
         
         print(f"\n📥 Fetching ALL Teams for Season ID: {season_id}...")
-        
-        while True:
-            # We need to modify client.get_teams to accept 'skip' if it doesn't already
-            # For now, we manually assume the client handles the request, but we might need to patch client
-            # if get_teams doesn't expose 'skip'. 
-            # Looking at your client code, get_teams accepts params.
-            
-            # Manually constructing params here to override client defaults if needed
-            params = {"seasonId": season_id, "take": take, "skip": skip}
-            response = self.client._get("/ncaamb/teams", params=params)
-            
-            if not response:
-                break
-                
-            # Extract data
-            team_wrappers = []
-            if isinstance(response, dict):
-                team_wrappers = response.get('data', [])
-            elif isinstance(response, list):
-                team_wrappers = response
-            
-            if not team_wrappers:
-                break
-                
+
+        # Manually constructing params here to override client defaults if needed
+        def fetch(skip, take):
+            return self.client._get("/ncaamb/teams", params={"seasonId": season_id, "take": take, "skip": skip})
+
+        # The next page is requested while this one is processed
+        for team_wrappers in iter_pages(fetch, take):
             for wrapper in team_wrappers:
                 team = wrapper.get('data', wrapper) if isinstance(wrapper, dict) else wrapper
                 if isinstance(team, dict) and team.get('id'):
@@ -102,11 +85,6 @@ class GameIngester:
             
             print(f"   - Fetched {len(team_wrappers)} teams (Total: {len(all_teams)})...")
             
-            if len(team_wrappers) < take:
-                break # End of list
-            
-            skip += take
-            
         return all_teams
 
     def ingest_season_schedule(self, year):
@@ -130,26 +108,12 @@ class GameIngester:
                 continue
 
             # Pagination for games
-            skip = 0
-            take = 50 
-            
-            while True:
-                # Manually call _get to support skip logic since get_games might hardcode params
+            # Manually call _get to support skip logic since get_games might hardcode params
+            def fetch(skip, take, team_id=team_id):
                 params = {"seasonId": season_id, "teamId": team_id, "take": take, "skip": skip}
-                games_response = self.client._get("/ncaamb/games", params=params)
-                
-                if not games_response:
-                    break
-                
-                game_wrappers = []
-                if isinstance(games_response, dict):
-                    game_wrappers = games_response.get('data', [])
-                elif isinstance(games_response, list):
-                    game_wrappers = games_response
-                
-                if not game_wrappers:
-                    break
+                return self.client._get("/ncaamb/games", params=params)
 
+            for game_wrappers in iter_pages(fetch, 50):
                 for game_wrapper in game_wrappers:
                     game = game_wrapper.get('data', game_wrapper) if isinstance(game_wrapper, dict) else game_wrapper
                     
@@ -163,10 +127,6 @@ class GameIngester:
                     self.save_game_metadata(game, season_id)
                     processed_game_ids.add(game_id)
                 
-                if len(game_wrappers) < take:
-                    break
-                skip += take
-                
         print(f"\n🎉 Ingestion Complete. {len(processed_game_ids)} unique games indexed.")
 
     def save_game_metadata(self, game_data, season_id):
@@ -1,9 +1,16 @@
 import os
 import requests
 import sqlite3
+import sys
 import time
 from dotenv import load_dotenv
 
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from src.ingestion.db import upsert_sql  # noqa: E402
+from src.ingestion.writer import BatchWriter  # noqa: E402
+
 # Load environment variables from project root .env (works locally and on Streamlit Cloud)
 ENV_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../..", ".env"))
 load_dotenv(ENV_PATH)
@@ -11,6 +18,18 @@ load_dotenv(ENV_PATH)
 DB_PATH = os.path.join(os.getcwd(), "data/skout.db")
 API_KEY = os.getenv("SYNERGY_API_KEY")
 
+PLAY_COLUMNS = [
+    "play_id", "game_id", "period", "clock_seconds", "clock_display", "description", "team_id",
+    "player_id", "player_name", "x_loc", "y_loc", "tags",
+]
+# Updated in place (tags, tag_mask and the pipeline's extra columns survive).
+UPSERT_PLAYS_SQL = upsert_sql(
+    "plays",
+    PLAY_COLUMNS,
+    key=["play_id"],
+    update=[c for c in PLAY_COLUMNS if c not in ("play_id", "tags")],
+)
+
 def setup_db():
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
@@ -124,7 +143,7 @@ def process_events(events, game_id):
 
 def ingest_events():
     conn = setup_db() # This will DROP and RECREATE the table
-    cursor = conn.cursor()
+    writer = BatchWriter(conn)
     
     games = get_linked_games()
     print(f"🎯 Re-Ingesting plays for {len(games)} games (fixing descriptions)...")
@@ -138,17 +157,14 @@ def ingest_events():
         
         if events:
             rows = process_events(events, g_id)
-            cursor.executemany('''
-                INSERT OR REPLACE INTO plays 
-                (play_id, game_id, period, clock_seconds, clock_display, description, team_id, player_id, player_name, x_loc, y_loc, tags)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', rows)
+            writer.add(UPSERT_PLAYS_SQL, rows)
+            writer.end_unit()
             total_new_plays += len(rows)
-            conn.commit()
             print(f"   ✅ Saved {len(rows)} plays.")
         else:
             print("   ⚠️ No events found.")
 
+    writer.flush()
     conn.close()
     print(f"\n🚀 Repair Complete. {total_new_plays} valid plays stored.")
 
@@ -1,11 +1,11 @@
 import os
 import sys
 import argparse
-import time
 import chromadb
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 
+from src.ingestion.pagination import iter_pages
 from src.ingestion.synergy_client import SynergyClient
 
 
@@ -27,33 +27,22 @@ class GamePlayIngester:
     def fetch_game_plays(self, game_id):
         print(f"\n🔍 Fetching plays for game_id: {game_id}")
 
-        skip = 0
-        take = 200
         all_plays = []
 
-        while True:
+        def fetch(skip, take):
             response = self.client._get(
                 f"/ncaamb/games/{game_id}/plays",
                 params={"take": take, "skip": skip}
             )
-
             # ❗ Licensed endpoint may return None / 404
             if not response:
                 print("⚠ No response returned from API — stopping play fetch")
-                break
-
-            plays = response.get("data", [])
-            if not plays:
-                break
+            return response
 
+        # Page N+1 is fetched (through the client's rate limiter) while page N is stored
+        for plays in iter_pages(fetch, 200):
             all_plays.extend(plays)
 
-            if len(plays) < take:
-                break
-
-            skip += take
-            time.sleep(0.3)
-
         print(f"✅ Retrieved {len(all_plays)} plays")
         return all_plays
 
@@ -2,29 +2,36 @@ import os
 import sys
 import time
 import argparse
-import chromadb
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 
+from src.ingestion import ledger
+from src.ingestion.db import connect_db, ensure_schema
 from src.ingestion.synergy_client import SynergyClient
 
+VIDEO_ENDPOINT = "play_video"
+WRITE_BATCH = 500
+READ_BATCH = 5000
 
-class PlayVideoIngester:
-    def __init__(self):
-        self.client = SynergyClient()
 
-        db_path = os.path.join(os.getcwd(), "data/vector_db")
-        os.makedirs(db_path, exist_ok=True)
+class PlayVideoIngester:
+    def __init__(self, client=None, play_collection=None, video_collection=None):
+        # Collections default to the on-disk Chroma store; pass both to skip it.
+        self.client = client or SynergyClient()
 
-        self.chroma_client = chromadb.PersistentClient(path=db_path)
+        if play_collection is None or video_collection is None:
+            import chromadb
 
-        self.play_collection = self.chroma_client.get_or_create_collection(
-            name="skout_game_plays"
-        )
+            db_path = os.path.join(os.getcwd(), "data/vector_db")
+            os.makedirs(db_path, exist_ok=True)
+            self.chroma_client = chromadb.PersistentClient(path=db_path)
+            if play_collection is None:
+                play_collection = self.chroma_client.get_or_create_collection(name="skout_game_plays")
+            if video_collection is None:
+                video_collection = self.chroma_client.get_or_create_collection(name="skout_play_videos")
 
-        self.video_collection = self.chroma_client.get_or_create_collection(
-            name="skout_play_videos"
-        )
+        self.play_collection = play_collection
+        self.video_collection = video_collection
 
     # --------------------------------------------------
     # FETCH VIDEO FOR A SINGLE PLAY
@@ -41,47 +48,125 @@ class PlayVideoIngester:
         videos = response.get("data", [])
         return videos
 
+    def _fetch_for_ledger(self, play_id):
+        """(videos, elapsed, error) for one play; error is None when the answer is final."""
+        t0 = time.perf_counter()
+        response = self.client._get(f"/ncaamb/plays/{play_id}/video")
+        elapsed = time.perf_counter() - t0
+        if response is None:
+            # 404 = no video for this play, which is an answer; anything else is retried next run
+            if self.client.last_status_code == 404:
+                return [], elapsed, None
+            return [], elapsed, self.client.last_error or "request failed"
+        videos = response.get("data", []) if isinstance(response, dict) else []
+        return videos, elapsed, None
+
+    # --------------------------------------------------
+    # RESUME
+    # --------------------------------------------------
+    def linked_play_ids(self):
+        """Play ids that already have at least one video in skout_play_videos."""
+        linked = set()
+        offset = 0
+        while True:
+            res = self.video_collection.get(limit=READ_BATCH, offset=offset, include=["metadatas"])
+            metas = res.get("metadatas") or []
+            if not res.get("ids"):
+                break
+            linked.update(str(m["play_id"]) for m in metas if m and m.get("play_id"))
+            offset += READ_BATCH
+        return linked
+
     # --------------------------------------------------
     # INGEST ALL PLAY VIDEOS
     # --------------------------------------------------
-    def ingest_all(self, limit=None):
+    def ingest_all(self, limit=None, max_workers=None, batch_size=WRITE_BATCH, refetch=False):
+        """Link videos for every play in skout_game_plays.
+
+        Plays are fetched concurrently through the client's worker pool (one
+        shared rate limiter) and written to Chroma batch_size records at a time.
+        Plays that already have a linked video, or whose fetch completed without
+        one (recorded in ingest_ledger), are skipped unless refetch is set, so a
+        re-run only requests new plays. limit caps the plays requested this run.
+        """
         print("\n🎥 Linking play → video assets\n")
 
-        play_ids = self.play_collection.get()["ids"]
+        # ids only; the play documents are not needed here
+        play_ids = self.play_collection.get(include=[])["ids"]
 
         if not play_ids:
             print("⚠ No plays found in skout_game_plays — did you ingest plays first?")
-            return
+            return 0
+
+        conn = connect_db()
+        ensure_schema(conn)
+
+        if not refetch:
+            done = self.linked_play_ids() | ledger.completed(conn, VIDEO_ENDPOINT)
+            skipped = len(play_ids)
+            play_ids = [pid for pid in play_ids if pid not in done]
+            skipped -= len(play_ids)
+            print(f"⏭  Skipping {skipped} plays already checked")
 
         if limit:
             play_ids = play_ids[:limit]
 
         total_videos = 0
-
-        for idx, play_id in enumerate(play_ids, 1):
-            print(f"[{idx}/{len(play_ids)}] Processing play {play_id}")
-
-            videos = self.fetch_play_video(play_id)
-
-            if not videos:
-                continue
-
-            for wrapper in videos:
-                video = wrapper.get("data", wrapper)
-                self.save_video(video, play_id)
-                total_videos += 1
-
-            time.sleep(0.25)
+        pending = {}
+        ledger_rows = []
+
+        def flush():
+            # Ledger rows only commit once their videos are in Chroma, so a crash
+            # between the two just refetches those plays.
+            if pending:
+                records = list(pending.values())
+                self.video_collection.upsert(
+                    ids=[r[0] for r in records],
+                    documents=[r[1] for r in records],
+                    metadatas=[r[2] for r in records],
+                )
+                pending.clear()
+            if ledger_rows:
+                conn.executemany(ledger.RECORD_SQL, ledger_rows)
+                conn.commit()
+                ledger_rows.clear()
+
+        fetched = self.client.map(self._fetch_for_ledger, play_ids, max_workers=max_workers)
+        try:
+            for idx, (play_id, (videos, elapsed, error)) in enumerate(fetched, 1):
+                if idx % 100 == 0:
+                    print(f"[{idx}/{len(play_ids)}] plays processed, {total_videos} videos")
+
+                linked = 0
+                for wrapper in videos:
+                    record = self._video_record(wrapper.get("data", wrapper), play_id)
+                    if record:
+                        pending[record[0]] = record
+                        linked += 1
+                total_videos += linked
+
+                status = ledger.STATUS_ERROR if error else ledger.STATUS_OK
+                ledger_rows.append(
+                    ledger.record_row(
+                        VIDEO_ENDPOINT, play_id, status, row_count=linked, duration_s=elapsed, error=error
+                    )
+                )
+                if len(pending) >= batch_size or len(ledger_rows) >= batch_size:
+                    flush()
+            flush()
+        finally:
+            conn.close()
 
         print(f"\n🎉 Video ingestion complete: {total_videos} videos linked")
+        return total_videos
 
     # --------------------------------------------------
     # STORAGE
     # --------------------------------------------------
-    def save_video(self, video, play_id):
+    def _video_record(self, video, play_id):
+        if video.get("id") is None:
+            return None
         video_id = str(video.get("id"))
-        if not video_id:
-            return
 
         metadata = {
             "play_id": play_id,
@@ -93,8 +178,15 @@ class PlayVideoIngester:
         }
 
         document = f"Video for play {play_id}"
+        return video_id, document, metadata
+
+    def save_video(self, video, play_id):
+        record = self._video_record(video, play_id)
+        if not record:
+            return
 
-        self.video_collection.add(
+        video_id, document, metadata = record
+        self.video_collection.upsert(
             ids=[video_id],
             documents=[document],
             metadatas=[metadata]
@@ -114,8 +206,19 @@ if __name__ == "__main__":
         help="Limit number of plays (for testing)",
         default=None
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Concurrent video requests (default: client setting)",
+        default=None
+    )
+    parser.add_argument(
+        "--refetch",
+        action="store_true",
+        help="Request every play again, including ones already linked"
+    )
 
     args = parser.parse_args()
 
     ingester = PlayVideoIngester()
-    ingester.ingest_all(limit=args.limit)
+    ingester.ingest_all(limit=args.limit, max_workers=args.workers, refetch=args.refetch)
@@ -1,12 +1,19 @@
 from __future__ import annotations
 
+import argparse
 import sqlite3
-from collections import defaultdict
-from datetime import datetime
+import time
+from datetime import UTC, datetime
 
-from src.ingestion.synergy_client import SynergyClient
-from src.ingestion.db import db_path, connect_db, ensure_schema
+import numpy as np
+import pandas as pd
 
+from src.ingestion import ledger
+from src.ingestion.db import connect_db, ensure_schema, upsert_sql
+from src.ingestion.metrics import Metrics
+from src.ingestion.pagination import iter_pages
+from src.ingestion.synergy_client import SynergyClient
+from src.ingestion.writer import BatchWriter
 
 PLAY_TYPES = [
     "Iso",
@@ -22,215 +29,262 @@ PLAY_TYPES = [
     "HandOff",
 ]
 
+PAGE_SIZE = 512
+
+# player_playtype_stats column -> Synergy stat name
+PLAYTYPE_STATS = {
+    "gp": "gp",
+    "possessions": "possessions",
+    "points": "points",
+    "fg_made": "fgMade",
+    "fg_miss": "fgMiss",
+    "fg_attempt": "fgAttempt",
+    "fg_percent_effective": "fgPercentEffective",
+    "shot2_made": "shot2Made",
+    "shot2_miss": "shot2Miss",
+    "shot2_attempt": "shot2Attempt",
+    "shot3_made": "shot3Made",
+    "shot3_miss": "shot3Miss",
+    "shot3_attempt": "shot3Attempt",
+    "ft_made": "ftMade",
+    "ft_miss": "ftMiss",
+    "ft_attempt": "ftAttempt",
+    "plus_one": "plusOne",
+    "shot_foul": "shotFoul",
+    "score": "score",
+    "turnover": "turnover",
+}
+
+PLAYTYPE_COLUMNS = ["player_id", "season_id", "team_id", "play_type", *PLAYTYPE_STATS, "updated_at"]
+
+PLAYTYPE_UPSERT_SQL = upsert_sql(
+    "player_playtype_stats",
+    PLAYTYPE_COLUMNS,
+    key=["season_id", "team_id", "play_type", "player_id"],
+    ignore_changes=["updated_at"],
+)
+
+SEASON_STATS_COLUMNS = [
+    "player_id", "season_id", "team_id", "gp", "possessions", "points",
+    "fg_made", "fg_miss", "fg_attempt", "fg_percent", "fg_percent_effective",
+    "shot2_made", "shot2_miss", "shot2_attempt", "shot2_percent",
+    "shot3_made", "shot3_miss", "shot3_attempt", "shot3_percent",
+    "ft_made", "ft_miss", "ft_attempt", "ft_percent",
+    "plus_one", "shot_foul", "score", "turnover", "updated_at",
+]
+
+# Boxscore columns (minutes, reb, ast, ...) come from other backfills; leave them alone.
+SEASON_STATS_UPSERT_SQL = upsert_sql(
+    "player_season_stats",
+    SEASON_STATS_COLUMNS,
+    key=["player_id", "season_id"],
+    ignore_changes=["updated_at"],
+)
+
+
+def ledger_endpoint(season_id: str) -> str:
+    """Ledger endpoint for one season's play-type reports; entity ids are "team:play_type"."""
+    return f"playtype_stats:{season_id}"
+
 
 def _coalesce_int(val):
     return int(val or 0)
 
 
-def _coalesce_float(val):
-    return float(val) if val is not None else None
-
-
-def _aggregate_stats(target: dict, stats: dict):
-    target["gp"] += _coalesce_int(stats.get("gp"))
-    target["possessions"] += _coalesce_int(stats.get("possessions"))
-    target["points"] += _coalesce_int(stats.get("points"))
-    target["fg_made"] += _coalesce_int(stats.get("fgMade"))
-    target["fg_miss"] += _coalesce_int(stats.get("fgMiss"))
-    target["fg_attempt"] += _coalesce_int(stats.get("fgAttempt"))
-    target["fg_percent_effective"] += _coalesce_float(stats.get("fgPercentEffective") or 0.0)
-    target["shot2_made"] += _coalesce_int(stats.get("shot2Made"))
-    target["shot2_miss"] += _coalesce_int(stats.get("shot2Miss"))
-    target["shot2_attempt"] += _coalesce_int(stats.get("shot2Attempt"))
-    target["shot3_made"] += _coalesce_int(stats.get("shot3Made"))
-    target["shot3_miss"] += _coalesce_int(stats.get("shot3Miss"))
-    target["shot3_attempt"] += _coalesce_int(stats.get("shot3Attempt"))
-    target["ft_made"] += _coalesce_int(stats.get("ftMade"))
-    target["ft_miss"] += _coalesce_int(stats.get("ftMiss"))
-    target["ft_attempt"] += _coalesce_int(stats.get("ftAttempt"))
-    target["plus_one"] += _coalesce_int(stats.get("plusOne"))
-    target["shot_foul"] += _coalesce_int(stats.get("shotFoul"))
-    target["score"] += _coalesce_int(stats.get("score"))
-    target["turnover"] += _coalesce_int(stats.get("turnover"))
-
-
-def _finalize(target: dict):
-    fg_att = max(1, target["fg_attempt"])
-    shot2_att = max(1, target["shot2_attempt"])
-    shot3_att = max(1, target["shot3_attempt"])
-    ft_att = max(1, target["ft_attempt"])
-
-    target["fg_percent"] = round(target["fg_made"] / fg_att, 4)
-    target["shot2_percent"] = round(target["shot2_made"] / shot2_att, 4)
-    target["shot3_percent"] = round(target["shot3_made"] / shot3_att, 4)
-    target["ft_percent"] = round(target["ft_made"] / ft_att, 4)
-
-    # average eFG across play types (weighted by attempts)
-    if target["fg_attempt"] > 0:
-        target["fg_percent_effective"] = round(target["fg_percent_effective"] / len(PLAY_TYPES), 4)
-    else:
-        target["fg_percent_effective"] = None
-
-
-def ingest_player_season_stats(league_code: str = "ncaamb", batch_limit: int | None = None) -> int:
-    conn = connect_db()
+def _playtype_rows(items: list, season_id: str, team_id: str, play_type: str, now: str) -> list[tuple]:
+    rows = []
+    for item in items:
+        rec = item.get("data") if isinstance(item, dict) and "data" in item else item
+        if not isinstance(rec, dict):
+            continue
+        pid = (rec.get("player") or {}).get("id")
+        if not pid:
+            continue
+        stats = rec.get("stats") or {}
+        values = [
+            float(stats.get(name) or 0.0) if col == "fg_percent_effective" else _coalesce_int(stats.get(name))
+            for col, name in PLAYTYPE_STATS.items()
+        ]
+        rows.append((pid, season_id, team_id, play_type, *values, now))
+    return rows
+
+
+def aggregate_season_stats(frame: pd.DataFrame) -> pd.DataFrame:
+    """Collapse player_playtype_stats rows into one player_season_stats row per player.
+
+    Counts are summed across play types. fg_percent_effective is the mean over
+    all PLAY_TYPES (missing play types count as 0), None without attempts; a
+    player seen for several teams keeps the team with the most possessions.
+    """
+    if frame.empty:
+        return pd.DataFrame(columns=SEASON_STATS_COLUMNS[:-1])
+
+    stats = list(PLAYTYPE_STATS)
+    out = frame.groupby(["player_id", "season_id"], sort=False)[stats].sum()
+    team = (
+        frame.sort_values("possessions", ascending=False, kind="stable")
+        .drop_duplicates(["player_id", "season_id"])
+        .set_index(["player_id", "season_id"])["team_id"]
+    )
+    out["team_id"] = team.reindex(out.index)
+
+    for prefix in ("fg", "shot2", "shot3", "ft"):
+        made = out[f"{prefix}_made"].to_numpy(dtype=float)
+        att = out[f"{prefix}_attempt"].to_numpy(dtype=float)
+        out[f"{prefix}_percent"] = np.round(made / np.maximum(att, 1.0), 4)
+
+    eff = np.round(out["fg_percent_effective"].to_numpy(dtype=float) / len(PLAY_TYPES), 4)
+    out["fg_percent_effective"] = pd.Series(eff, index=out.index).where(out["fg_attempt"] > 0)
+
+    return out.reset_index()[SEASON_STATS_COLUMNS[:-1]]
+
+
+def _frame_rows(frame: pd.DataFrame, now: str) -> list[tuple]:
+    # object dtype hands sqlite plain ints/floats; NaN -> NULL
+    values = frame.astype(object).where(frame.notna(), None)
+    return [(*row, now) for row in values.itertuples(index=False, name=None)]
+
+
+def ingest_player_season_stats(
+    league_code: str = "ncaamb",
+    batch_limit: int | None = None,
+    season_id: str | None = None,
+    max_workers: int | None = None,
+    client: SynergyClient | None = None,
+    conn: sqlite3.Connection | None = None,
+    metrics: Metrics | None = None,
+) -> int:
+    """Refresh player_season_stats for one season from the play-type reports.
+
+    Every (team, play type) report is fetched concurrently through the client's
+    worker pool and rate limiter (max_workers=1 is the old serial walk). Raw rows
+    land in player_playtype_stats together with an ingest_ledger entry, so a rerun
+    only fetches the reports that have not completed; batch_limit caps how many
+    pending teams one run takes on. The season rows are then rebuilt from the
+    stored reports with one pandas groupby and written in one batched upsert.
+    Returns the number of player_season_stats rows written. With its own client,
+    request/row/commit metrics go to data/metrics/ingest_player_season_stats.prom.
+    """
+    own_conn = conn is None
+    conn = conn or connect_db()
     ensure_schema(conn)
     cur = conn.cursor()
 
-    cur.execute("SELECT DISTINCT season_id FROM games WHERE season_id IS NOT NULL")
-    seasons = [r[0] for r in cur.fetchall()]
-    if not seasons:
-        conn.close()
-        raise RuntimeError("No season_id found in games table.")
-
-    season_id = seasons[0]
+    if season_id is None:
+        cur.execute("SELECT DISTINCT season_id FROM games WHERE season_id IS NOT NULL")
+        seasons = [r[0] for r in cur.fetchall()]
+        if not seasons:
+            if own_conn:
+                conn.close()
+            raise RuntimeError("No season_id found in games table.")
+        season_id = seasons[0]
 
     cur.execute("SELECT DISTINCT team_id FROM players WHERE team_id IS NOT NULL")
     team_ids = [r[0] for r in cur.fetchall()]
     if not team_ids:
-        conn.close()
+        if own_conn:
+            conn.close()
         raise RuntimeError("No team_id found in players table.")
 
-    # Resume support: skip teams already processed for this season
-    cur.execute(
-        """
-        SELECT DISTINCT team_id
-        FROM player_season_stats
-        WHERE season_id = ? AND team_id IS NOT NULL
-        """,
-        (season_id,),
-    )
-    done_team_ids = {r[0] for r in cur.fetchall()}
-    pending_team_ids = [tid for tid in team_ids if tid not in done_team_ids]
+    # Resume support: skip reports already stored for this season
+    endpoint = ledger_endpoint(season_id)
+    done = ledger.completed(conn, endpoint)
+    pending_team_ids = [
+        tid for tid in team_ids if any(f"{tid}:{pt}" not in done for pt in PLAY_TYPES)
+    ]
     if batch_limit:
         pending_team_ids = pending_team_ids[: batch_limit]
+    tasks = [
+        (tid, pt) for tid in pending_team_ids for pt in PLAY_TYPES if f"{tid}:{pt}" not in done
+    ]
 
-    # Use current players list to filter
-    cur.execute("SELECT DISTINCT player_id FROM players WHERE player_id IS NOT NULL")
-    player_ids = {r[0] for r in cur.fetchall()}
-
-    client = SynergyClient()
-
-    agg = defaultdict(lambda: {
-        "gp": 0,
-        "possessions": 0,
-        "points": 0,
-        "fg_made": 0,
-        "fg_miss": 0,
-        "fg_attempt": 0,
-        "fg_percent": None,
-        "fg_percent_effective": 0.0,
-        "shot2_made": 0,
-        "shot2_miss": 0,
-        "shot2_attempt": 0,
-        "shot2_percent": None,
-        "shot3_made": 0,
-        "shot3_miss": 0,
-        "shot3_attempt": 0,
-        "shot3_percent": None,
-        "ft_made": 0,
-        "ft_miss": 0,
-        "ft_attempt": 0,
-        "ft_percent": None,
-        "plus_one": 0,
-        "shot_foul": 0,
-        "score": 0,
-        "turnover": 0,
-        "team_id": None,
-    })
-
-    for team_id in pending_team_ids:
-        for play_type in PLAY_TYPES:
-            skip = 0
-            while True:
-                payload = client.get_player_playtype_stats(
-                    league_code=league_code,
-                    season_id=season_id,
-                    play_type=play_type,
-                    team_id=team_id,
-                    skip=skip,
-                    take=512,
-                )
-                data = None
-                if isinstance(payload, dict):
-                    data = payload.get("data") or payload.get("items")
-                if not data:
-                    break
-
-                for item in data:
-                    rec = item.get("data") if isinstance(item, dict) and "data" in item else item
-                    if not isinstance(rec, dict):
-                        continue
-                    player = rec.get("player") or {}
-                    pid = player.get("id")
-                    if not pid or pid not in player_ids:
-                        continue
-                    stats = rec.get("stats") or {}
-                    _aggregate_stats(agg[pid], stats)
-                    agg[pid]["team_id"] = team_id
-
-                if len(data) < 512:
-                    break
-                skip += 512
-
-    updates = []
-    now = datetime.utcnow().isoformat()
-    for pid, s in agg.items():
-        _finalize(s)
-        updates.append(
-            (
-                pid,
-                season_id,
-                s.get("team_id"),
-                s["gp"],
-                s["possessions"],
-                s["points"],
-                s["fg_made"],
-                s["fg_miss"],
-                s["fg_attempt"],
-                s["fg_percent"],
-                s["fg_percent_effective"],
-                s["shot2_made"],
-                s["shot2_miss"],
-                s["shot2_attempt"],
-                s["shot2_percent"],
-                s["shot3_made"],
-                s["shot3_miss"],
-                s["shot3_attempt"],
-                s["shot3_percent"],
-                s["ft_made"],
-                s["ft_miss"],
-                s["ft_attempt"],
-                s["ft_percent"],
-                s["plus_one"],
-                s["shot_foul"],
-                s["score"],
-                s["turnover"],
-                now,
+    metrics = metrics or Metrics()
+    own_client = client is None
+    client = client or SynergyClient(metrics=metrics)
+    now = datetime.now(UTC).isoformat()
+
+    def fetch_report(task):
+        team_id, play_type = task
+        t0 = time.perf_counter()
+        failed = []
+
+        def fetch(skip, take):
+            payload = client.get_player_playtype_stats(
+                league_code=league_code,
+                season_id=season_id,
+                play_type=play_type,
+                team_id=team_id,
+                skip=skip,
+                take=take,
             )
-        )
+            if payload is None:
+                failed.append(client.last_error or "request failed")
+            return payload if isinstance(payload, dict) else None
 
-    if updates:
-        cur.executemany(
-            """
-            INSERT OR REPLACE INTO player_season_stats (
-                player_id, season_id, team_id, gp, possessions, points,
-                fg_made, fg_miss, fg_attempt, fg_percent, fg_percent_effective,
-                shot2_made, shot2_miss, shot2_attempt, shot2_percent,
-                shot3_made, shot3_miss, shot3_attempt, shot3_percent,
-                ft_made, ft_miss, ft_attempt, ft_percent,
-                plus_one, shot_foul, score, turnover, updated_at
+        # Concurrency comes from the task pool, so pages within a report stay serial.
+        rows = []
+        for page in iter_pages(fetch, PAGE_SIZE, prefetch=False):
+            rows.extend(_playtype_rows(page, season_id, team_id, play_type, now))
+        return rows, time.perf_counter() - t0, (failed[0] if failed else None)
+
+    writer = BatchWriter(conn, metrics=metrics)
+    for (team_id, play_type), (rows, elapsed, error) in client.map(fetch_report, tasks, max_workers=max_workers):
+        entity = f"{team_id}:{play_type}"
+        if error:
+            writer.execute(
+                ledger.RECORD_SQL,
+                ledger.record_row(endpoint, entity, ledger.STATUS_ERROR, duration_s=elapsed, error=error),
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            updates,
+            writer.end_unit()
+            continue
+        # A report's rows and its ledger entry commit together. No rows is a valid
+        # answer here (play type unused by the team), so it still counts as done.
+        writer.add(PLAYTYPE_UPSERT_SQL, rows)
+        writer.execute(
+            ledger.RECORD_SQL,
+            ledger.record_row(endpoint, entity, ledger.STATUS_OK, row_count=len(rows), duration_s=elapsed),
         )
-        conn.commit()
+        writer.end_unit()
+    writer.flush()
+
+    # Use current players list to filter
+    frame = pd.read_sql_query(
+        """
+        SELECT * FROM player_playtype_stats
+        WHERE season_id = ?
+          AND player_id IN (SELECT player_id FROM players WHERE player_id IS NOT NULL)
+        """,
+        conn,
+        params=(season_id,),
+    )
+    updates = _frame_rows(aggregate_season_stats(frame), now)
 
-    conn.close()
+    if updates:
+        writer.add(SEASON_STATS_UPSERT_SQL, updates)
+        writer.flush()
+
+        try:
+            from src.percentiles import rebuild_percentile_tables
+            rebuild_percentile_tables(conn)
+        except Exception:
+            pass
+
+    if own_conn:
+        conn.close()
+    if own_client:
+        client.collect_metrics()
+        metrics.write_textfile("ingest_player_season_stats")
     return len(updates)
 
 
 if __name__ == "__main__":
-    count = ingest_player_season_stats()
+    parser = argparse.ArgumentParser(description="Refresh player_season_stats from play-type reports")
+    parser.add_argument("--league", default="ncaamb")
+    parser.add_argument("--season", default=None, help="Season id (default: first season in games)")
+    parser.add_argument("--workers", type=int, default=None, help="Concurrent report fetches (default: client setting)")
+    parser.add_argument("--limit", type=int, default=None, help="Max pending teams this run")
+    args = parser.parse_args()
+    count = ingest_player_season_stats(
+        args.league, batch_limit=args.limit, season_id=args.season, max_workers=args.workers
+    )
     print(f"✅ player_season_stats updated for {count} players")
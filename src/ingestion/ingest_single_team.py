@@ -1,13 +1,13 @@
 import os
 import sys
 import argparse
-import time
 import re
 import chromadb
 
 # Ensure project root is on path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 
+from src.ingestion.pagination import iter_pages
 from src.ingestion.synergy_client import SynergyClient
 
 from config.ncaa_di_mens_basketball import NCAA_DI_MENS_BASKETBALL
@@ -87,19 +87,10 @@ class SingleTeamIngester:
 
         normalized_target = normalize(team_name)
 
-        skip = 0
-        take = 500
-
-        while True:
-            response = self.client._get(
-                "/ncaamb/teams",
-                params={"take": take, "skip": skip}
-            )
-
-            teams = response.get("data", [])
-            if not teams:
-                break
+        def fetch(skip, take):
+            return self.client._get("/ncaamb/teams", params={"take": take, "skip": skip})
 
+        for teams in iter_pages(fetch, 500):
             for wrapper in teams:
                 team = wrapper.get("data", wrapper)
                 name = normalize(team.get("name", ""))
@@ -112,12 +103,6 @@ class SingleTeamIngester:
                     print(f"✅ Matched Synergy team: {team.get('market')} {team.get('name')}")
                     return team["id"]
 
-            if len(teams) < take:
-                break
-
-            skip += take
-            time.sleep(0.2)
-
         raise RuntimeError(f"Team '{team_name}' not found in Synergy team list")
 
     # --------------------------------------------------
@@ -149,35 +134,23 @@ class SingleTeamIngester:
         for season in seasons:
             print(f"\n📅 Ingesting {season['name']}")
 
-            skip = 0
-            take = 50
-
-            while True:
-                response = self.client._get(
+            def fetch(skip, take, season_id=season["id"]):
+                return self.client._get(
                     "/ncaamb/games",
                     params={
-                        "seasonId": season["id"],
+                        "seasonId": season_id,
                         "teamId": team_id,
                         "take": take,
                         "skip": skip
                     }
                 )
 
-                games = response.get("data", [])
-                if not games:
-                    break
-
+            for games in iter_pages(fetch, 50):
                 for wrapper in games:
                     game = wrapper.get("data", wrapper)
                     self.save_game_metadata(game, season["id"])
                     total += 1
 
-                if len(games) < take:
-                    break
-
-                skip += take
-                time.sleep(0.2)
-
         print(f"\n🎉 Ingestion complete: {total} games indexed for {team_name}")
 
     # --------------------------------------------------
@@ -0,0 +1,30 @@
+"""JSON decode/encode for Synergy payloads: orjson when installed, stdlib otherwise.
+
+Full-game event payloads run to megabytes; orjson parses them several times
+faster than json/requests' .json(), which matters once many games are fetched
+(or replayed from the response cache) concurrently. Both paths produce the same
+Python objects.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(data: bytes | str) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    """Compact UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
@@ -0,0 +1,110 @@
+"""Per-entity ingest ledger.
+
+One row per (endpoint, entity_id) recording the last fetch: status, attempt
+count, a hash of the payload and timing. run_pipeline uses it to skip work that
+already succeeded and to resume after a crash.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+from collections.abc import Iterable
+from datetime import UTC, datetime
+
+STATUS_OK = "ok"
+STATUS_EMPTY = "empty"
+STATUS_ERROR = "error"
+
+EVENTS_ENDPOINT = "game_events"
+
+
+def payload_hash(payload) -> str | None:
+    if payload is None:
+        return None
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+RECORD_SQL = """
+    INSERT INTO ingest_ledger
+        (endpoint, entity_id, status, attempts, payload_hash, row_count, duration_ms, last_error, updated_at)
+    VALUES (?, ?, ?, 1, ?, ?, ?, ?, ?)
+    ON CONFLICT(endpoint, entity_id) DO UPDATE SET
+        status = excluded.status,
+        attempts = ingest_ledger.attempts + 1,
+        payload_hash = COALESCE(excluded.payload_hash, ingest_ledger.payload_hash),
+        row_count = excluded.row_count,
+        duration_ms = excluded.duration_ms,
+        last_error = excluded.last_error,
+        updated_at = excluded.updated_at
+"""
+
+
+def record_row(
+    endpoint: str,
+    entity_id: str,
+    status: str,
+    payload=None,
+    row_count: int | None = None,
+    duration_s: float | None = None,
+    error: str | None = None,
+) -> tuple:
+    """Parameters for RECORD_SQL (for queuing on a BatchWriter)."""
+    return (
+        endpoint,
+        str(entity_id),
+        status,
+        payload_hash(payload),
+        row_count,
+        None if duration_s is None else duration_s * 1000.0,
+        error,
+        datetime.now(UTC).isoformat(),
+    )
+
+
+def record(conn: sqlite3.Connection, endpoint: str, entity_id: str, status: str, **kw) -> None:
+    """Upsert the ledger row for one fetch attempt (caller commits)."""
+    conn.execute(RECORD_SQL, record_row(endpoint, entity_id, status, **kw))
+
+
+def completed(conn: sqlite3.Connection, endpoint: str) -> set[str]:
+    cur = conn.execute(
+        "SELECT entity_id FROM ingest_ledger WHERE endpoint = ? AND status = ?",
+        (endpoint, STATUS_OK),
+    )
+    return {r[0] for r in cur.fetchall()}
+
+
+def adopt_existing_events(conn: sqlite3.Connection, game_ids: Iterable[str]) -> int:
+    """Mark games that already have plays (ingested before the ledger existed) as done.
+
+    A game's plays are committed together with its ledger row (BatchWriter only
+    commits at end_unit() between games; without a writer upsert_plays commits
+    the game on its own), so any plays at all means that game's events were
+    fully written.
+    """
+    game_ids = list(game_ids)
+    if not game_ids:
+        return 0
+    cur = conn.cursor()
+    cur.execute("CREATE TEMP TABLE IF NOT EXISTS _ledger_games (game_id TEXT PRIMARY KEY)")
+    cur.execute("DELETE FROM _ledger_games")
+    cur.executemany("INSERT OR IGNORE INTO _ledger_games VALUES (?)", [(g,) for g in game_ids])
+    cur.execute(
+        """
+        INSERT INTO ingest_ledger (endpoint, entity_id, status, attempts, row_count, updated_at)
+        SELECT ?, t.game_id, ?, 0, COUNT(p.play_id), ?
+        FROM _ledger_games t
+        JOIN plays p ON p.game_id = t.game_id
+        WHERE NOT EXISTS (
+            SELECT 1 FROM ingest_ledger l WHERE l.endpoint = ? AND l.entity_id = t.game_id
+        )
+        GROUP BY t.game_id
+        """,
+        (EVENTS_ENDPOINT, STATUS_OK, datetime.now(UTC).isoformat(), EVENTS_ENDPOINT),
+    )
+    adopted = cur.rowcount
+    conn.commit()
+    return adopted
@@ -0,0 +1,240 @@
+"""In-process ingestion metrics: counters, gauges and histograms.
+
+SynergyClient records every HTTP attempt (endpoint class, status, latency,
+bytes, parse time, 5xx backoff) and BatchWriter every commit (rows per table,
+commit latency); the rate limiter's pacing/429 sleep is folded in by
+SynergyClient.collect_metrics(). One Metrics is shared per run and exported as
+
+- a Prometheus text file under data/metrics/ (node_exporter textfile format,
+  written atomically so a scrape never sees half a file), and
+- a JSON-able summary (run_pipeline returns it under "metrics").
+
+Endpoints are labelled by class ("events", "schedule", ...) rather than URL so
+label cardinality stays fixed.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import re
+import threading
+from collections.abc import Sequence
+from functools import lru_cache
+
+from src.ingestion.db import project_root
+
+# Seconds; covers sub-ms cache-speed work up to multi-second API calls.
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# name -> (type, help). Cumulative values copied from elsewhere (limiter, cache)
+# are set() but still exported with the type listed here.
+METRICS = {
+    "synergy_requests_total": ("counter", "HTTP attempts by endpoint class and status (error = no response)"),
+    "synergy_request_duration_seconds": ("histogram", "HTTP attempt latency"),
+    "synergy_response_bytes_total": ("counter", "Response body bytes received"),
+    "synergy_parse_duration_seconds": ("histogram", "JSON decode time per successful response"),
+    "synergy_backoff_seconds_total": ("counter", "Seconds slept backing off 5xx responses"),
+    "synergy_rate_limit_wait_seconds_total": ("counter", "Seconds blocked in the rate limiter (pacing, or 429 pauses)"),
+    "synergy_throttled_total": ("counter", "429 responses that paused the client"),
+    "synergy_rate_per_second": ("gauge", "Request rate the adaptive limiter settled at"),
+    "synergy_cache_lookups_total": ("counter", "Response-cache lookups by result"),
+    "ingest_rows_total": ("counter", "Rows written by table"),
+    "ingest_commits_total": ("counter", "Transactions committed"),
+    "ingest_commit_duration_seconds": ("histogram", "executemany + commit time per flush"),
+    "ingest_phase_seconds": ("gauge", "Wall time per pipeline phase"),
+    "ingest_run_seconds": ("gauge", "Wall time of the whole run"),
+    "ingest_last_run_timestamp_seconds": ("gauge", "Unix time the run finished"),
+}
+
+# endpoint class for labels; first match wins
+_ENDPOINT_KINDS = [
+    (re.compile(r"/games/[^/]+/events$"), "events"),
+    (re.compile(r"/games$"), "schedule"),
+    (re.compile(r"/teams/[^/]+/players$"), "players"),
+    (re.compile(r"/teams$"), "teams"),
+    (re.compile(r"/seasons$"), "seasons"),
+    (re.compile(r"/playerplaytypestats$"), "playtype_stats"),
+    (re.compile(r"/video$"), "video"),
+]
+
+_INSERT_TABLE_RX = re.compile(r"\bINTO\s+([A-Za-z_]\w*)", re.IGNORECASE)
+_UPDATE_TABLE_RX = re.compile(r"^\s*(?:UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM)\s+([A-Za-z_]\w*)", re.IGNORECASE)
+
+
+def endpoint_kind(endpoint: str) -> str:
+    for rx, kind in _ENDPOINT_KINDS:
+        if rx.search(endpoint):
+            return kind
+    return "other"
+
+
+@lru_cache(maxsize=256)
+def table_of(sql: str) -> str:
+    """Target table of an INSERT/UPDATE/DELETE statement ("other" if unparsable)."""
+    m = _INSERT_TABLE_RX.search(sql) or _UPDATE_TABLE_RX.search(sql)
+    return m.group(1) if m else "other"
+
+
+def metrics_dir() -> str:
+    return os.getenv("SKOUT_METRICS_DIR") or os.path.join(project_root(), "data", "metrics")
+
+
+def _key(labels: dict) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class _Histogram:
+    __slots__ = ("buckets", "count", "counts", "sum")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        for i, le in enumerate(self.buckets):
+            if value <= le:
+                self.counts[i] += 1
+                break
+
+
+class Metrics:
+    """Thread-safe registry; label values are stringified."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: dict[str, dict[tuple, float]] = {}
+        self._gauges: dict[str, dict[tuple, float]] = {}
+        self._histograms: dict[str, dict[tuple, _Histogram]] = {}
+
+    def inc(self, name: str, value: float = 1.0, **labels) -> None:
+        key = _key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def set(self, name: str, value: float, **labels) -> None:
+        with self._lock:
+            self._gauges.setdefault(name, {})[_key(labels)] = float(value)
+
+    def observe(self, name: str, value: float, buckets: Sequence[float] = DEFAULT_BUCKETS, **labels) -> None:
+        key = _key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = _Histogram(buckets)
+            hist.observe(value)
+
+    def value(self, name: str, **labels) -> float:
+        """Counter/gauge value, summed over series matching `labels` (histograms: their sum)."""
+        want = set(_key(labels))
+        with self._lock:
+            series = self._counters.get(name) or self._gauges.get(name)
+            if series is not None:
+                return sum(v for k, v in series.items() if want <= set(k))
+            hists = self._histograms.get(name) or {}
+            return sum(h.sum for k, h in hists.items() if want <= set(k))
+
+    def summary(self) -> dict:
+        """{name: value} for unlabelled series, {name: {"a:b": value}} otherwise; histograms give count/sum."""
+
+        def label(key: tuple) -> str:
+            return ":".join(v for _, v in key)
+
+        out: dict = {}
+        with self._lock:
+            for name, series in [*self._counters.items(), *self._gauges.items()]:
+                if list(series) == [()]:
+                    out[name] = round(series[()], 6)
+                else:
+                    out[name] = {label(k): round(v, 6) for k, v in sorted(series.items())}
+            for name, series in self._histograms.items():
+                stats = {label(k): {"count": h.count, "sum": round(h.sum, 6)} for k, h in sorted(series.items())}
+                out[name] = stats.get("") if list(series) == [()] else stats
+        return out
+
+    def prometheus_text(self) -> str:
+        def fmt_labels(key: tuple, extra: tuple = ()) -> str:
+            pairs = [*key, *extra]
+            if not pairs:
+                return ""
+            body = ",".join(f'{k}="{_escape(v)}"' for k, v in pairs)
+            return "{" + body + "}"
+
+        lines: list[str] = []
+        with self._lock:
+            families = [
+                *((n, s, "counter") for n, s in self._counters.items()),
+                *((n, s, "gauge") for n, s in self._gauges.items()),
+                *((n, s, "histogram") for n, s in self._histograms.items()),
+            ]
+            for name, series, kind in sorted(families, key=lambda f: f[0]):
+                kind, help_text = METRICS.get(name, (kind, ""))
+                if help_text:
+                    lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for key in sorted(series):
+                    item = series[key]
+                    if not isinstance(item, _Histogram):
+                        lines.append(f"{name}{fmt_labels(key)} {_num(item)}")
+                        continue
+                    cumulative = 0
+                    for le, n in zip(item.buckets, item.counts, strict=True):
+                        cumulative += n
+                        lines.append(f"{name}_bucket{fmt_labels(key, (('le', repr(float(le))),))} {cumulative}")
+                    lines.append(f"{name}_bucket{fmt_labels(key, (('le', '+Inf'),))} {item.count}")
+                    lines.append(f"{name}_sum{fmt_labels(key)} {_num(item.sum)}")
+                    lines.append(f"{name}_count{fmt_labels(key)} {item.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, name: str, directory: str | None = None) -> str:
+        """Write <directory>/<name>.prom atomically; returns the path."""
+        directory = directory or metrics_dir()
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{name}.prom")
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp, path)
+        return path
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _num(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def time_breakdown(metrics: Metrics, wall_s: float) -> dict:
+    """Where a run's wall time went: sleeping (pacing, 429 pauses, 5xx backoff) vs working.
+
+    HTTP and parse seconds are summed across worker threads, so with several
+    workers they can exceed wall time; sleep is likewise per thread.
+    """
+    sleep = {
+        "pacing": metrics.value("synergy_rate_limit_wait_seconds_total", reason="pacing"),
+        "throttle": metrics.value("synergy_rate_limit_wait_seconds_total", reason="throttle"),
+        "backoff": metrics.value("synergy_backoff_seconds_total"),
+    }
+    total_sleep = sum(sleep.values())
+    return {
+        "wall_s": round(wall_s, 3),
+        "sleep_s": {k: round(v, 3) for k, v in sleep.items()},
+        "sleep_total_s": round(total_sleep, 3),
+        "http_s": round(metrics.value("synergy_request_duration_seconds"), 3),
+        "parse_s": round(metrics.value("synergy_parse_duration_seconds"), 3),
+        "commit_s": round(metrics.value("ingest_commit_duration_seconds"), 3),
+        "requests": int(metrics.value("synergy_requests_total")),
+        "throttled": int(metrics.value("synergy_throttled_total")),
+        "bytes": int(metrics.value("synergy_response_bytes_total")),
+        "rows": int(metrics.value("ingest_rows_total")),
+    }
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+
+def page_items(payload: Any) -> list:
+    """Items of one Synergy page: {"data": [...]}, {"items": [...]} or a bare list."""
+    if isinstance(payload, dict):
+        return payload.get("data") or payload.get("items") or []
+    if isinstance(payload, list):
+        return payload
+    return []
+
+
+def iter_pages(
+    fetch_page: Callable[[int, int], Any],
+    take: int,
+    max_pages: int | None = None,
+    prefetch: bool = True,
+) -> Iterator[list]:
+    """Yield the pages of a skip/take endpoint, fetching page N+1 while page N is consumed.
+
+    fetch_page(skip, take) returns the raw payload (normally a SynergyClient call,
+    so prefetched requests still go through the client's rate limiter). Paging
+    stops at an empty payload/page, a short page or `max_pages`. A short page is
+    known to be last before anything more is requested, so prefetching never
+    issues a request the sequential loop would not have made. Items are yielded
+    as returned (wrappers are not unwrapped); exceptions from fetch_page propagate.
+    """
+    if not prefetch:
+        yield from _pages(lambda skip: page_items(fetch_page(skip, take)), take, max_pages)
+        return
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="page-prefetch") as pool:
+        def submit(skip: int):
+            return pool.submit(lambda: page_items(fetch_page(skip, take)))
+
+        skip = 0
+        fut = submit(skip)
+        pages = 0
+        try:
+            while fut is not None:
+                page = fut.result()
+                if not page:
+                    return
+                pages += 1
+                more = len(page) >= take and (max_pages is None or pages < max_pages)
+                skip += take
+                fut = submit(skip) if more else None
+                yield page
+        finally:
+            # Consumer stopped early: drop the prefetch if it has not started yet.
+            if fut is not None:
+                fut.cancel()
+
+
+def _pages(fetch: Callable[[int], list], take: int, max_pages: int | None) -> Iterator[list]:
+    skip = 0
+    pages = 0
+    while max_pages is None or pages < max_pages:
+        page = fetch(skip)
+        if not page:
+            return
+        pages += 1
+        yield page
+        if len(page) < take:
+            return
+        skip += take
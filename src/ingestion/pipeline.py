@@ -1,10 +1,17 @@
 from __future__ import annotations
 
+import time
 from dataclasses import dataclass
-from typing import Any, Iterable
+from typing import Any, Iterable, Iterator
 
-from src.ingestion.db import connect_db, ensure_schema
+from src.ingestion import ledger
+from src.ingestion.db import connect_db, ensure_schema, upsert_sql
+from src.ingestion.metrics import Metrics, time_breakdown
+from src.ingestion.pagination import iter_pages
+from src.ingestion.rate_limiter import save_rate_state
 from src.ingestion.synergy_client import SynergyClient
+from src.ingestion.writer import BatchWriter
+from src.processing.play_tagger import clock_mask, description_mask, mask_tags, tag_mask, tag_play
 
 
 @dataclass(frozen=True)
@@ -13,6 +20,10 @@ class PipelinePlan:
     season_id: str
     team_ids: list[str]  # empty => all accessible teams (if possible)
     ingest_events: bool = True
+    workers: int | None = None  # concurrent API calls (default: the rate policy's)
+    rate_policy: str | None = None  # conservative / adaptive / burst (default: SYNERGY_RATE_POLICY or adaptive)
+    refetch_events: bool = False  # ignore the ingest ledger and refetch every game
+    derive_traits: bool = True  # False when a scheduler runs the trait engine as its own stage
 
 
 def _unwrap_list_payload(payload: Any) -> list[Any]:
@@ -42,75 +53,84 @@ def iter_games(
     take: int = 100,
     max_pages: int = 50,
 ) -> Iterable[dict]:
-    """Paginate through games using skip/take.
+    """Paginate through games using skip/take, prefetching the next page.
 
     NOTE: This relies on Synergy supporting `skip` for /games. If it doesn't,
     we'll still collect the first page.
     """
 
-    skip = 0
-    for _ in range(max_pages):
-        payload = client.get_games(
+    def fetch(skip: int, take: int):
+        return client.get_games(
             league_code=league_code,
             season_id=season_id,
             team_id=team_id,
             limit=take,
             skip=skip,
         )
-        if not payload:
-            break
 
-        page = [g for g in _unwrap_list_payload(payload) if isinstance(g, dict)]
-        if not page:
-            break
+    for page in iter_pages(fetch, take, max_pages=max_pages):
+        for g in _unwrap_list_payload(page):
+            if isinstance(g, dict):
+                yield g
 
-        for g in page:
-            yield g
 
-        if len(page) < take:
-            break
-        skip += take
+FINISHED_STATUSES = {"GameOver", "Final", "Closed"}
 
+# video_path is owned by the local video linker and never written here.
+UPSERT_GAMES_SQL = upsert_sql(
+    "games",
+    ["game_id", "season_id", "date", "home_team", "away_team", "home_score", "away_score", "status"],
+    key=["game_id"],
+)
 
-def upsert_games(conn, season_id: str, games: list[dict]) -> int:
-    cur = conn.cursor()
-    count = 0
 
+def _write_rows(conn, sql: str, rows: Iterable[tuple], writer: BatchWriter | None) -> int:
+    """Queue rows on the writer, or write + commit immediately without one."""
+    if writer is not None:
+        return writer.add(sql, rows)
+    rows = list(rows)
+    if not rows:
+        return 0
+    conn.cursor().executemany(sql, rows)
+    conn.commit()
+    return len(rows)
+
+
+def game_rows(season_id: str, games: Iterable[dict]) -> Iterator[tuple]:
     for game in games:
         status = game.get("status")
-        if status not in {"GameOver", "Final", "Closed"}:
+        if status not in FINISHED_STATUSES:
             continue
 
         home_team = (game.get("homeTeam") or {}).get("name", "Unknown")
         away_team = (game.get("awayTeam") or {}).get("name", "Unknown")
 
-        cur.execute(
-            """
-            INSERT OR REPLACE INTO games
-            (game_id, season_id, date, home_team, away_team, home_score, away_score, status, video_path)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, COALESCE((SELECT video_path FROM games WHERE game_id = ?), ?))
-            """,
-            (
-                game.get("id"),
-                season_id,
-                game.get("date"),
-                home_team,
-                away_team,
-                game.get("homeScore", 0),
-                game.get("awayScore", 0),
-                status,
-                game.get("id"),
-                None,
-            ),
+        yield (
+            game.get("id"),
+            season_id,
+            game.get("date"),
+            home_team,
+            away_team,
+            game.get("homeScore", 0),
+            game.get("awayScore", 0),
+            status,
         )
-        count += 1
 
-    conn.commit()
-    return count
 
+def upsert_games(conn, season_id: str, games: Iterable[dict], writer: BatchWriter | None = None) -> int:
+    return _write_rows(conn, UPSERT_GAMES_SQL, game_rows(season_id, games), writer)
 
-def upsert_players(conn, team_id: str, players: list[dict]) -> int:
-    cur = conn.cursor()
+
+# Roster payloads often omit physicals/class; don't erase values backfilled elsewhere.
+UPSERT_PLAYERS_SQL = upsert_sql(
+    "players",
+    ["player_id", "team_id", "first_name", "last_name", "full_name", "position", "height_in", "weight_lb", "class_year"],
+    key=["player_id"],
+    keep_existing=["first_name", "last_name", "full_name", "position", "height_in", "weight_lb", "class_year"],
+)
+
+
+def upsert_players(conn, team_id: str, players: list[dict], writer: BatchWriter | None = None) -> int:
     rows = []
 
     for p in players:
@@ -152,67 +172,158 @@ def upsert_players(conn, team_id: str, players: list[dict]) -> int:
             )
         )
 
-    if not rows:
-        return 0
-
-    cur.executemany(
-        """
-        INSERT OR REPLACE INTO players
-        (player_id, team_id, first_name, last_name, full_name, position, height_in, weight_lb, class_year)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        rows,
+    return _write_rows(conn, UPSERT_PLAYERS_SQL, rows, writer)
+
+
+PLAY_COLUMNS = [
+    "play_id", "game_id", "period", "clock_seconds", "clock_display", "description", "team_id",
+    "player_id", "player_name", "x_loc", "y_loc", "tags",
+    "ato", "short_clock", "eob", "heave", "press", "zone", "hard_double",
+    "assist_player_id", "o_player_id", "d_player_id", "r_player_id",
+    "duration", "utc", "home_score", "away_score", "is_home", "offense_team", "defense_team", "offensive_lineup",
+    "tag_mask",
+]
+
+# Tags are computed once here: tag_mask (expanded into play_tags by trigger) follows
+# the description, while the display string is only set on first insert so
+# re-ingesting does not wipe tags edited later.
+UPSERT_PLAYS_SQL = upsert_sql(
+    "plays",
+    PLAY_COLUMNS,
+    key=["play_id"],
+    update=[c for c in PLAY_COLUMNS if c not in ("play_id", "tags")],
+)
+
+
+def _event_row(game_id: str, evt: dict) -> tuple:
+    """One plays row, event by event (the reference for play_rows)."""
+    # description per Synergy spec
+    desc_text = evt.get("description") or "Unknown Play"
+
+    extras = []
+    if evt.get("pickAndRoll") is True:
+        extras.append("(PnR)")
+    if evt.get("transition") is True:
+        extras.append("(Trans)")
+    if extras:
+        desc_text += " " + " ".join(extras)
+
+    # Synergy spec (Event schema):
+    # - gameQuarter: int
+    # - clock: int (int32). Treat as seconds remaining and format MM:SS.
+    quarter = evt.get("gameQuarter")
+    raw_clock = evt.get("clock")
+
+    clock_sec = raw_clock if isinstance(raw_clock, int) else 0
+    mm = max(0, clock_sec) // 60
+    ss = max(0, clock_sec) % 60
+    clock_display = f"{mm}:{ss:02d}"
+    tags = tag_play(desc_text, clock_sec)
+
+    person = evt.get("person") or evt.get("player")
+    player_id = None
+    player_name = None
+    if person:
+        player_id = person.get("id")
+        first = person.get("nameFirst") or ""
+        last = person.get("nameLast") or ""
+        player_name = f"{first} {last}".strip() or person.get("name")
+
+    assist = evt.get("assist") or {}
+    o_player = evt.get("oPlayer") or {}
+    d_player = evt.get("dPlayer") or {}
+    r_player = evt.get("rPlayer") or {}
+    offense = evt.get("offense") or {}
+    defense = evt.get("defense") or {}
+
+    return (
+        evt.get("id"),
+        game_id,
+        quarter if isinstance(quarter, int) else None,
+        clock_sec,
+        clock_display,
+        desc_text,
+        offense.get("id"),
+        player_id,
+        player_name,
+        evt.get("shotX"),
+        evt.get("shotY"),
+        ", ".join(tags),
+        1 if evt.get("ato") else 0,
+        1 if evt.get("shortClock") else 0,
+        1 if evt.get("eob") else 0,
+        1 if evt.get("heave") else 0,
+        1 if evt.get("press") else 0,
+        1 if evt.get("zone") else 0,
+        1 if evt.get("hardDouble") else 0,
+        assist.get("id") if isinstance(assist, dict) else None,
+        o_player.get("id") if isinstance(o_player, dict) else None,
+        d_player.get("id") if isinstance(d_player, dict) else None,
+        r_player.get("id") if isinstance(r_player, dict) else None,
+        evt.get("duration"),
+        evt.get("utc"),
+        evt.get("homeScore"),
+        evt.get("awayScore"),
+        1 if evt.get("isHome") else 0,
+        offense.get("name") or offense.get("abbr"),
+        defense.get("name") or defense.get("abbr"),
+        evt.get("offensiveLineup"),
+        tag_mask(tags),
     )
-    conn.commit()
-    return len(rows)
 
 
-def upsert_plays(conn, game_id: str, events: list[dict]) -> int:
-    cur = conn.cursor()
+def play_rows(game_id: str, events: list[dict]) -> list[tuple]:
+    """plays rows for one game; the same rows as _event_row, built faster.
+
+    Tags come from the cached description_mask (descriptions repeat across
+    games) plus clock bits, and the display string is built once per distinct
+    mask, so no per-event tag_play / sort / join. Clock strings are memoized and
+    dict lookups are bound once per event.
+    """
+    labels: dict[int, str] = {}
+    displays: dict[int, str] = {}
     rows = []
+    append = rows.append
 
     for evt in events:
-        # description per Synergy spec
-        desc_text = evt.get("description") or "Unknown Play"
-
-        extras = []
-        if evt.get("pickAndRoll") is True:
-            extras.append("(PnR)")
-        if evt.get("transition") is True:
-            extras.append("(Trans)")
-        if extras:
-            desc_text += " " + " ".join(extras)
-
-        # Synergy spec (Event schema):
-        # - gameQuarter: int
-        # - clock: int (int32). Treat as seconds remaining and format MM:SS.
-        quarter = evt.get("gameQuarter")
-        raw_clock = evt.get("clock")
-
-        clock_sec = raw_clock if isinstance(raw_clock, int) else 0
-        mm = max(0, clock_sec) // 60
-        ss = max(0, clock_sec) % 60
-        clock_display = f"{mm}:{ss:02d}"
-
-        person = evt.get("person") or evt.get("player")
-        player_id = None
-        player_name = None
+        get = evt.get
+        desc_text = get("description") or "Unknown Play"
+        pnr = get("pickAndRoll") is True
+        trans = get("transition") is True
+        if pnr or trans:
+            desc_text += " (PnR) (Trans)" if pnr and trans else (" (PnR)" if pnr else " (Trans)")
+
+        quarter = get("gameQuarter")
+        clock_sec = get("clock")
+        if not isinstance(clock_sec, int):
+            clock_sec = 0
+        clock_display = displays.get(clock_sec)
+        if clock_display is None:
+            c = max(0, clock_sec)
+            clock_display = displays[clock_sec] = f"{c // 60}:{c % 60:02d}"
+
+        mask = description_mask(desc_text) | clock_mask(clock_sec)
+        label = labels.get(mask)
+        if label is None:
+            label = labels[mask] = ", ".join(sorted(mask_tags(mask)))
+
+        person = get("person") or get("player")
         if person:
             player_id = person.get("id")
-            first = person.get("nameFirst") or ""
-            last = person.get("nameLast") or ""
-            player_name = f"{first} {last}".strip() or person.get("name")
+            player_name = f"{person.get('nameFirst') or ''} {person.get('nameLast') or ''}".strip() or person.get("name")
+        else:
+            player_id = player_name = None
 
-        assist = evt.get("assist") or {}
-        o_player = evt.get("oPlayer") or {}
-        d_player = evt.get("dPlayer") or {}
-        r_player = evt.get("rPlayer") or {}
-        offense = evt.get("offense") or {}
-        defense = evt.get("defense") or {}
+        assist = get("assist")
+        o_player = get("oPlayer")
+        d_player = get("dPlayer")
+        r_player = get("rPlayer")
+        offense = get("offense") or {}
+        defense = get("defense") or {}
 
-        rows.append(
+        append(
             (
-                evt.get("id"),
+                get("id"),
                 game_id,
                 quarter if isinstance(quarter, int) else None,
                 clock_sec,
@@ -221,59 +332,66 @@ def upsert_plays(conn, game_id: str, events: list[dict]) -> int:
                 offense.get("id"),
                 player_id,
                 player_name,
-                evt.get("shotX"),
-                evt.get("shotY"),
-                "",
-                1 if evt.get("ato") else 0,
-                1 if evt.get("shortClock") else 0,
-                1 if evt.get("eob") else 0,
-                1 if evt.get("heave") else 0,
-                1 if evt.get("press") else 0,
-                1 if evt.get("zone") else 0,
-                1 if evt.get("hardDouble") else 0,
+                get("shotX"),
+                get("shotY"),
+                label,
+                1 if get("ato") else 0,
+                1 if get("shortClock") else 0,
+                1 if get("eob") else 0,
+                1 if get("heave") else 0,
+                1 if get("press") else 0,
+                1 if get("zone") else 0,
+                1 if get("hardDouble") else 0,
                 assist.get("id") if isinstance(assist, dict) else None,
                 o_player.get("id") if isinstance(o_player, dict) else None,
                 d_player.get("id") if isinstance(d_player, dict) else None,
                 r_player.get("id") if isinstance(r_player, dict) else None,
-                evt.get("duration"),
-                evt.get("utc"),
-                evt.get("homeScore"),
-                evt.get("awayScore"),
-                1 if evt.get("isHome") else 0,
+                get("duration"),
+                get("utc"),
+                get("homeScore"),
+                get("awayScore"),
+                1 if get("isHome") else 0,
                 offense.get("name") or offense.get("abbr"),
                 defense.get("name") or defense.get("abbr"),
-                evt.get("offensiveLineup"),
+                get("offensiveLineup"),
+                mask,
             )
         )
 
-    if not rows:
-        return 0
+    return rows
 
-    cur.executemany(
-        """
-        INSERT OR REPLACE INTO plays
-        (play_id, game_id, period, clock_seconds, clock_display, description, team_id, player_id, player_name, x_loc, y_loc, tags,
-         ato, short_clock, eob, heave, press, zone, hard_double,
-         assist_player_id, o_player_id, d_player_id, r_player_id,
-         duration, utc, home_score, away_score, is_home, offense_team, defense_team, offensive_lineup)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        rows,
-    )
-    conn.commit()
-    return len(rows)
+
+def upsert_plays(
+    conn, game_id: str, events: list[dict], writer: BatchWriter | None = None, fast: bool = True
+) -> int:
+    """Upsert one game's events; fast=False builds rows event by event (_event_row)."""
+    rows = play_rows(game_id, events) if fast else [_event_row(game_id, evt) for evt in events]
+    return _write_rows(conn, UPSERT_PLAYS_SQL, rows, writer)
 
 
 def run_pipeline(plan: PipelinePlan, api_key: str, progress_cb=None) -> dict:
     """Run a minimal end-to-end ingestion pipeline.
 
-    progress_cb(step:str, info:dict) is optional.
+    progress_cb(step:str, info:dict) is optional. The result's "metrics" holds
+    the run's time breakdown (sleeping vs working) and every counter; the same
+    counters are written to data/metrics/run_pipeline.prom.
     """
 
-    client = SynergyClient(api_key=api_key)
+    t_run = time.perf_counter()
+    metrics = Metrics()
+    client = SynergyClient(api_key=api_key, max_workers=plan.workers, policy=plan.rate_policy, metrics=metrics)
 
     conn = connect_db()
     ensure_schema(conn)
+    # Rows from every game share batched commits (WAL, synchronous=NORMAL).
+    writer = BatchWriter(conn, metrics=metrics)
+    t_phase = time.perf_counter()
+
+    def phase_done(phase: str) -> None:
+        nonlocal t_phase
+        now = time.perf_counter()
+        metrics.set("ingest_phase_seconds", now - t_phase, phase=phase)
+        t_phase = now
 
     def tick(step: str, **info):
         if progress_cb:
@@ -281,17 +399,19 @@ def run_pipeline(plan: PipelinePlan, api_key: str, progress_cb=None) -> dict:
 
     # 1) Games
     tick("schedule:start", season_id=plan.season_id)
-    games: list[dict] = []
-
-    if plan.team_ids:
-        for tid in plan.team_ids:
-            for g in iter_games(client, plan.league_code, plan.season_id, tid):
-                games.append(g)
-    else:
-        for g in iter_games(client, plan.league_code, plan.season_id, None):
-            games.append(g)
 
-    inserted_games = upsert_games(conn, plan.season_id, games)
+    def stream_games() -> Iterator[dict]:
+        for tid in plan.team_ids or [None]:
+            yield from iter_games(client, plan.league_code, plan.season_id, tid)
+
+    # Streamed page by page into the writer; the season is never held in memory.
+    # Each game row is its own unit, so the writer commits on its usual budget.
+    inserted_games = 0
+    for game in stream_games():
+        inserted_games += upsert_games(conn, plan.season_id, [game], writer=writer)
+        writer.end_unit()
+    writer.flush()
+    phase_done("schedule")
     tick("schedule:done", inserted_games=inserted_games)
 
     # 2) Players (if team_ids supplied)
@@ -299,70 +419,118 @@ def run_pipeline(plan: PipelinePlan, api_key: str, progress_cb=None) -> dict:
         for tid in plan.team_ids:
             payload = client.get_team_players(plan.league_code, tid)
             players = [p for p in _unwrap_list_payload(payload) if isinstance(p, dict)]
-            upsert_players(conn, tid, players)
+            upsert_players(conn, tid, players, writer=writer)
+            writer.end_unit()
+        writer.flush()
+
+        try:
+            from src.percentiles import rebuild_percentile_tables
+            rebuild_percentile_tables(conn)
+        except Exception:
+            pass
+        phase_done("players")
 
     # 3) Events
     inserted_plays = 0
+    skipped_games = 0
     if plan.ingest_events:
         tick("events:start")
         cur = conn.cursor()
         cur.execute("SELECT game_id FROM games WHERE season_id = ?", (plan.season_id,))
         game_ids = [r[0] for r in cur.fetchall()]
 
-        for idx, gid in enumerate(game_ids):
+        # Resume: stored games are finished (upsert_games filters on status), so a
+        # game whose events were written once never needs refetching.
+        if not plan.refetch_events:
+            ledger.adopt_existing_events(conn, game_ids)
+            done = ledger.completed(conn, ledger.EVENTS_ENDPOINT)
+            todo = [gid for gid in game_ids if gid not in done]
+            skipped_games = len(game_ids) - len(todo)
+            game_ids = todo
+            tick("events:resume", skipped=skipped_games, remaining=len(game_ids))
+
+        def fetch_events(gid):
+            t0 = time.perf_counter()
+            payload = client.get_game_events(plan.league_code, gid, final=True)
+            return payload, time.perf_counter() - t0, client.last_error
+
+        # Fetch on worker threads, write on this one (the sqlite connection isn't shared).
+        # Only finished games are stored, so their events are cached permanently.
+        fetched = client.map(fetch_events, game_ids)
+        for idx, (gid, (payload, elapsed, error)) in enumerate(fetched):
             if idx % 10 == 0:
                 tick("events:progress", current=idx, total=len(game_ids))
 
-            payload = client.get_game_events(plan.league_code, gid)
             if not payload:
+                status = ledger.STATUS_ERROR if payload is None else ledger.STATUS_EMPTY
+                writer.execute(
+                    ledger.RECORD_SQL,
+                    ledger.record_row(ledger.EVENTS_ENDPOINT, gid, status, duration_s=elapsed, error=error),
+                )
+                writer.end_unit()
                 continue
 
+            # A game's plays and its ledger row are one unit: the writer only
+            # commits between games, so a crash never leaves a partial game.
             events = [e for e in _unwrap_list_payload(payload) if isinstance(e, dict)]
-            inserted_plays += upsert_plays(conn, gid, events)
-
-        tick("events:done", inserted_plays=inserted_plays)
-
-    # 3) Derived Traits (optional)
-    if inserted_plays > 0:
-        try:
-            from src.processing.derive_player_traits import build_player_traits
-            build_player_traits()
-        except Exception:
-            pass
-
-        try:
-            from src.processing.derive_leadership import build_leadership_metrics
-            build_leadership_metrics()
-        except Exception:
-            pass
-
-        try:
-            from src.processing.derive_resilience import build_resilience_metrics
-            build_resilience_metrics()
-        except Exception:
-            pass
-
-        try:
-            from src.processing.derive_defensive_big import build_defensive_big_metrics
-            build_defensive_big_metrics()
-        except Exception:
-            pass
+            n = upsert_plays(conn, gid, events, writer=writer)
+            inserted_plays += n
+            writer.execute(
+                ledger.RECORD_SQL,
+                ledger.record_row(
+                    ledger.EVENTS_ENDPOINT,
+                    gid,
+                    ledger.STATUS_OK if n else ledger.STATUS_EMPTY,
+                    payload=payload,
+                    row_count=n,
+                    duration_s=elapsed,
+                ),
+            )
+            writer.end_unit()
+        writer.flush()
+        phase_done("events")
+
+        tick("events:done", inserted_plays=inserted_plays, skipped_games=skipped_games)
+
+    # 3) Derived Traits (optional): one pass over plays feeds every metric. Fold
+    # every game not yet in the persisted per-player counters -- this run's, plus
+    # any a failed or skipped earlier fold left behind; a refetch may have changed
+    # folded games, so rebuild.
+    traits = None
+    traits_error = None
+    traits_full = plan.refetch_events
+    if plan.derive_traits:
+        from src.processing.trait_engine import run_trait_engine
 
         try:
-            from src.processing.derive_clutch import build_clutch_metrics
-            build_clutch_metrics()
-        except Exception:
-            pass
+            traits = run_trait_engine(incremental=not traits_full)
+        except Exception as e:
+            # Plays are committed and stay unfolded, so the next run catches up.
+            traits_error = f"{type(e).__name__}: {e}"
+            print(f"⚠️ Trait engine failed ({traits_error}); unfolded games will be retried next run")
+            tick("traits:error", error=traits_error)
+        phase_done("traits")
+
+    changes = conn.total_changes  # rows actually modified; unchanged upserts are skipped
+    conn.close()
 
-        try:
-            from src.processing.derive_undervalued import build_undervalued_metrics
-            build_undervalued_metrics()
-        except Exception:
-            pass
+    # The rate this run settled at is what the dry-run planner assumes next time.
+    if client.cache.misses:
+        save_rate_state(client.bucket)
 
-    conn.close()
+    wall_s = time.perf_counter() - t_run
+    client.collect_metrics()
+    metrics.set("ingest_run_seconds", wall_s)
+    metrics.set("ingest_last_run_timestamp_seconds", time.time())
+    metrics.write_textfile("run_pipeline")
 
     return {
+        "changes": changes,
         "inserted_games": inserted_games,
         "inserted_plays": inserted_plays,
+        "skipped_games": skipped_games,
+        "traits": traits,
+        "traits_error": traits_error,
+        "traits_full": traits_full,
+        "metrics": {**time_breakdown(metrics, wall_s), "counters": metrics.summary()},
     }
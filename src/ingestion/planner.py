@@ -0,0 +1,269 @@
+"""Dry-run planner for run_pipeline.
+
+Walks the same requests run_pipeline would make, but against the response
+cache only: fresh entries cost nothing, anything else counts as one HTTP
+request (stale payloads still tell us which games/players exist). Combined with
+the ingest ledger and the rate the last run settled at, that gives a request
+count, a wall-time estimate and new-vs-present counts before anything is
+fetched. Output is plain dicts / JSON so a scheduler can split plans across
+nights and API keys.
+
+    python -m src.ingestion.planner --season <id> --teams t1,t2 --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+from collections import Counter
+from collections.abc import Iterable
+
+from src.ingestion import ledger
+from src.ingestion.db import connect_db, ensure_schema
+from src.ingestion.metrics import endpoint_kind
+from src.ingestion.pipeline import FINISHED_STATUSES, PipelinePlan, _unwrap_list_payload, iter_games
+from src.ingestion.rate_limiter import get_policy, load_rate_state
+from src.ingestion.response_cache import DEFAULT_TTL_RULE, FOREVER, ResponseCache, is_missing
+from src.ingestion.synergy_client import SynergyClient
+
+
+class PlanningClient(SynergyClient):
+    """SynergyClient that never touches the network.
+
+    Every call is tallied: `cached` if a fresh cache entry would serve it,
+    otherwise `requests` (an HTTP request the real run would issue). Stale
+    entries are still returned so paging and id lookups can continue; calls
+    with no cache entry at all return None and are also counted in `unknown`.
+    """
+
+    def __init__(self, cache_root: str | None = None):
+        # The real key (never sent) selects the same cache scope as a real run.
+        super().__init__(
+            api_key=os.getenv("SYNERGY_API_KEY") or "dry-run",
+            cache=ResponseCache(root=cache_root, mode="readwrite"),
+        )
+        self.stale = ResponseCache(root=cache_root, mode="replay")
+        self.requests: Counter = Counter()
+        self.cached: Counter = Counter()
+        self.unknown: Counter = Counter()
+
+    def _get(self, endpoint, params=None, retries=8, ttl=DEFAULT_TTL_RULE):
+        kind = endpoint_kind(endpoint)
+        self.last_error = None
+        if ttl is FOREVER:
+            # Final-game events: only existence matters, don't parse the payload.
+            if self.cache.has(endpoint, params, ttl=FOREVER, scope=self.cache_scope):
+                self.cached[kind] += 1
+                self.last_status_code = 200
+                return {}
+            self.requests[kind] += 1
+            return None
+
+        fresh = self.cache.get(endpoint, params, ttl=ttl, scope=self.cache_scope)
+        if not is_missing(fresh):
+            self.cached[kind] += 1
+            self.last_status_code = 200
+            return fresh
+        self.requests[kind] += 1
+        stale = self.stale.get(endpoint, params, scope=self.cache_scope)
+        if is_missing(stale):
+            self.unknown[kind] += 1
+            self.last_error = "not cached"
+            return None
+        return stale
+
+
+def estimate_seconds(requests: int, start_rate: float, ceiling: float, increase: float) -> float:
+    """Wall time for `requests` through an AdaptiveTokenBucket ramping from start_rate to ceiling.
+
+    Assumes no 429s; ceiling is the rate the previous run settled at, which
+    already reflects how hard the API pushed back.
+    """
+    ceiling = max(ceiling, 1e-6)
+    rate = min(start_rate, ceiling)
+    seconds = 0.0
+    n = 0
+    while n < requests and rate < ceiling:
+        seconds += 1.0 / rate
+        rate = min(ceiling, rate + increase)
+        n += 1
+    return seconds + (requests - n) / ceiling
+
+
+def current_rate(rate: float | None = None, policy: str | None = None) -> dict:
+    """Rate assumptions: explicit override, else the last run's settled rate, else the policy maximum.
+
+    The last run's rate never lifts the estimate above what `policy` allows.
+    """
+    policy = get_policy(policy)
+    if rate is not None:
+        ceiling, source = float(rate), "override"
+    else:
+        state = load_rate_state()
+        if state and state.get("rate"):
+            ceiling, source = min(float(state["rate"]), policy.max_rate), "last_run"
+        else:
+            ceiling, source = policy.max_rate, "policy_max"
+    return {
+        "policy": policy.name,
+        "start": policy.rate,
+        "ceiling": ceiling,
+        "increase": policy.increase,
+        "source": source,
+    }
+
+
+def _tallies(client: PlanningClient) -> dict[str, Counter]:
+    return {
+        "requests": Counter(client.requests),
+        "cached": Counter(client.cached),
+        "unknown": Counter(client.unknown),
+    }
+
+
+def plan_pipeline(
+    plan: PipelinePlan,
+    client: PlanningClient | None = None,
+    conn: sqlite3.Connection | None = None,
+    rate: float | None = None,
+) -> dict:
+    """Estimate one run_pipeline(plan) without issuing any requests."""
+    client = client or PlanningClient()
+    own_conn = conn is None
+    conn = conn or connect_db()
+    ensure_schema(conn)
+    before = _tallies(client)
+
+    # 1) Schedule: same pages as run_pipeline; stale pages reveal the games.
+    scheduled = set()
+    for tid in plan.team_ids or [None]:
+        for game in iter_games(client, plan.league_code, plan.season_id, tid):
+            if game.get("status") in FINISHED_STATUSES and game.get("id"):
+                scheduled.add(str(game["id"]))
+
+    present_games = {
+        r[0] for r in conn.execute("SELECT game_id FROM games WHERE season_id = ?", (plan.season_id,))
+    }
+    season_games = present_games | scheduled
+
+    # 2) Players
+    present_players = {r[0] for r in conn.execute("SELECT player_id FROM players WHERE player_id IS NOT NULL")}
+    seen_players = set()
+    for tid in plan.team_ids:
+        payload = client.get_team_players(plan.league_code, tid)
+        for p in _unwrap_list_payload(payload):
+            if isinstance(p, dict) and p.get("id"):
+                seen_players.add(str(p["id"]))
+
+    # 3) Events: pending = not in the ledger and without stored plays
+    with_plays = {r[0] for r in conn.execute("SELECT DISTINCT game_id FROM plays")}
+    if not plan.ingest_events:
+        pending = []
+    elif plan.refetch_events:
+        pending = sorted(season_games)
+    else:
+        done = ledger.completed(conn, ledger.EVENTS_ENDPOINT) | with_plays
+        pending = sorted(season_games - done)
+    for gid in pending:
+        client.get_game_events(plan.league_code, gid, final=True)
+
+    plays_present, games_with_plays = conn.execute(
+        "SELECT COUNT(*), COUNT(DISTINCT game_id) FROM plays"
+    ).fetchone()
+    per_game = plays_present / games_with_plays if games_with_plays else None
+    if own_conn:
+        conn.close()
+
+    delta = {k: v - before[k] for k, v in _tallies(client).items()}
+    requests = dict(delta["requests"])
+    total = sum(requests.values())
+    rates = current_rate(rate, plan.rate_policy)
+
+    return {
+        "league_code": plan.league_code,
+        "season_id": plan.season_id,
+        "team_ids": list(plan.team_ids),
+        "requests": {**requests, "total": total},
+        "cached": dict(delta["cached"]),
+        # Uncached schedule pages hide any further pages (and their games), so
+        # counts are lower bounds when this is non-empty.
+        "uncached": dict(delta["unknown"]),
+        "games": {
+            "scheduled": len(scheduled),
+            "new": len(scheduled - present_games),
+            "present": len(present_games),
+        },
+        "events": {
+            "games_pending": len(pending),
+            "games_done": len(season_games) - len(pending),
+            "plays_present": plays_present,
+            "plays_new_estimate": round(per_game * len(pending)) if per_game is not None else None,
+        },
+        "players": {
+            "seen": len(seen_players),
+            "new": len(seen_players - present_players),
+            "present": len(present_players),
+        },
+        "rate": rates,
+        "wall_time_s": round(estimate_seconds(total, rates["start"], rates["ceiling"], rates["increase"]), 1),
+    }
+
+
+def plan_runs(plans: Iterable[PipelinePlan], rate: float | None = None) -> dict:
+    """Plan several pipeline runs (e.g. one per season) sharing one cache view."""
+    client = PlanningClient()
+    runs = [plan_pipeline(p, client=client, rate=rate) for p in plans]
+    total = sum(r["requests"]["total"] for r in runs)
+    return {
+        "runs": runs,
+        "requests_total": total,
+        # Each run starts a new client, so the ramp is paid per run.
+        "wall_time_s": round(sum(r["wall_time_s"] for r in runs), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Estimate requests and wall time for run_pipeline (no API calls)")
+    parser.add_argument("--league", default="ncaamb")
+    parser.add_argument("--season", action="append", required=True, help="Season id (repeatable)")
+    parser.add_argument("--teams", default="", help="Comma-separated team ids (default: all)")
+    parser.add_argument("--no-events", action="store_true")
+    parser.add_argument("--refetch-events", action="store_true")
+    parser.add_argument("--policy", default=None, help="Rate policy the run will use (conservative/adaptive/burst)")
+    parser.add_argument("--rate", type=float, default=None, help="Requests/s to assume instead of the last run's")
+    parser.add_argument("--json", action="store_true", help="Print the full plan as JSON")
+    args = parser.parse_args()
+
+    team_ids = [t.strip() for t in args.teams.split(",") if t.strip()]
+    plans = [
+        PipelinePlan(
+            league_code=args.league,
+            season_id=season_id,
+            team_ids=team_ids,
+            ingest_events=not args.no_events,
+            refetch_events=args.refetch_events,
+            rate_policy=args.policy,
+        )
+        for season_id in args.season
+    ]
+    out = plan_runs(plans, rate=args.rate)
+    if args.json:
+        print(json.dumps(out, indent=2))
+        return
+    for r in out["runs"]:
+        print(
+            f"{r['season_id']}: {r['requests']['total']} requests "
+            f"(events {r['requests'].get('events', 0)}), ~{r['wall_time_s'] / 60:.1f} min; "
+            f"games new {r['games']['new']}/{r['games']['scheduled']}, "
+            f"players new {r['players']['new']}/{r['players']['seen']} "
+            f"[{r['rate']['policy']} @ {r['rate']['ceiling']:.2f}/s, {r['rate']['source']}]"
+        )
+        if r["uncached"]:
+            print(f"  ⚠️ uncached (counts are lower bounds): {r['uncached']}")
+    print(f"Total: {out['requests_total']} requests, ~{out['wall_time_s'] / 60:.1f} min")
+
+
+if __name__ == "__main__":
+    main()
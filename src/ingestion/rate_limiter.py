@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, replace
+
+RATE_STATE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "data", "cache", "rate_state.json"
+)
+
+
+class AdaptiveTokenBucket:
+    """Thread-safe token bucket shared by every worker talking to one API.
+
+    - acquire() blocks until a token is available (start-to-start spacing).
+    - on_success() ramps the permitted rate up additively.
+    - on_throttle() cuts it multiplicatively and pauses *all* callers for
+      Retry-After (or one interval), so a 429 seen by one worker slows everyone.
+      The in-flight requests of one burst all come back 429 together; only the
+      first of them cuts the rate (later ones inside the pause, or within one
+      interval of the cut, just extend the pause).
+    """
+
+    def __init__(
+        self,
+        rate: float = 1 / 1.5,
+        min_rate: float = 1 / 8.0,
+        max_rate: float = 4.0,
+        capacity: float = 1.0,
+        increase: float = 0.05,
+        decrease: float = 0.5,
+    ):
+        self.min_rate = float(min_rate)
+        self.max_rate = max(float(max_rate), self.min_rate)
+        self.rate = min(max(float(rate), self.min_rate), self.max_rate)
+        self.capacity = max(1.0, float(capacity))
+        self.increase = float(increase)
+        self.decrease = float(decrease)
+
+        self._lock = threading.Lock()
+        self._tokens = 1.0
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._last_cut = float("-inf")
+
+        # Introspection
+        self.throttle_count = 0
+        self.total_wait_s = 0.0
+        self.throttle_wait_s = 0.0  # part of total_wait_s spent in 429 pauses
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(0.0, now - self._updated)
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """Block until the caller may send a request. Returns seconds waited."""
+        waited = 0.0
+        paused = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                    paused += wait
+                elif self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    self.total_wait_s += waited
+                    self.throttle_wait_s += paused
+                    return waited
+                else:
+                    wait = (1.0 - self._tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def on_success(self) -> None:
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self, retry_after: float | None = None) -> float:
+        """Record a 429: cut the rate and pause everyone. Returns the pause length."""
+        with self._lock:
+            self.throttle_count += 1
+            now = time.monotonic()
+            # One multiplicative cut per throttle window, not one per 429.
+            if now >= self._paused_until and now - self._last_cut >= 1.0 / self.rate:
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+                self._last_cut = now
+            pause = float(retry_after) if retry_after is not None else 1.0 / self.rate
+            self._paused_until = max(self._paused_until, now + pause)
+            self._tokens = 0.0
+            self._updated = now
+            return pause
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "rate": self.rate,
+                "throttle_count": self.throttle_count,
+                "total_wait_s": self.total_wait_s,
+                "throttle_wait_s": self.throttle_wait_s,
+            }
+
+
+@dataclass(frozen=True)
+class RatePolicy:
+    """How hard one SynergyClient may push the API: bucket shape plus worker count.
+
+    Inject into SynergyClient(policy=...) instead of patching requests; every
+    request the client makes goes through policy.bucket(), nothing else is slowed.
+    """
+
+    name: str
+    rate: float  # starting requests/s
+    min_rate: float
+    max_rate: float
+    increase: float  # additive ramp per success
+    decrease: float = 0.5  # multiplicative cut per 429
+    capacity: float = 1.0  # requests allowed back to back
+    max_workers: int = 4
+
+    def bucket(self) -> AdaptiveTokenBucket:
+        return AdaptiveTokenBucket(
+            rate=self.rate,
+            min_rate=self.min_rate,
+            max_rate=self.max_rate,
+            capacity=self.capacity,
+            increase=self.increase,
+            decrease=self.decrease,
+        )
+
+
+POLICIES = {
+    # Long unattended builds: one worker, at most one request every 2s.
+    "conservative": RatePolicy("conservative", rate=0.5, min_rate=1 / 16.0, max_rate=0.5, increase=0.02, max_workers=1),
+    # Default: start at the old 1.5s spacing and ramp (AIMD) until the API pushes back.
+    "adaptive": RatePolicy("adaptive", rate=1 / 1.5, min_rate=1 / 8.0, max_rate=4.0, increase=0.05),
+    # Short interactive pulls: small bursts allowed, fast ramp, more workers.
+    "burst": RatePolicy("burst", rate=2.0, min_rate=1 / 4.0, max_rate=8.0, increase=0.25, capacity=4.0, max_workers=8),
+}
+DEFAULT_POLICY = "adaptive"
+
+
+def get_policy(policy: str | RatePolicy | None = None) -> RatePolicy:
+    """Resolve a policy name (default: SYNERGY_RATE_POLICY, else adaptive).
+
+    SYNERGY_MAX_RPS still sets the adaptive policy's max_rate, as it did
+    before policies existed.
+    """
+    if isinstance(policy, RatePolicy):
+        return policy
+    name = (policy or os.getenv("SYNERGY_RATE_POLICY") or DEFAULT_POLICY).lower()
+    if name not in POLICIES:
+        raise ValueError(f"Unknown rate policy: {name!r} (expected one of {tuple(POLICIES)})")
+    resolved = POLICIES[name]
+    if name == "adaptive" and os.getenv("SYNERGY_MAX_RPS"):
+        max_rate = max(float(os.getenv("SYNERGY_MAX_RPS")), resolved.min_rate)
+        resolved = replace(resolved, max_rate=max_rate, rate=min(resolved.rate, max_rate))
+    return resolved
+
+
+def save_rate_state(bucket: AdaptiveTokenBucket, path: str | None = None) -> None:
+    """Persist the rate a run ended at, for planners estimating the next run."""
+    state = {**bucket.snapshot(), "max_rate": bucket.max_rate, "saved_at": time.time()}
+    path = path or RATE_STATE_PATH
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+    except OSError:
+        pass
+
+
+def load_rate_state(path: str | None = None) -> dict | None:
+    try:
+        with open(path or RATE_STATE_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def parse_retry_after(value) -> float | None:
+    """Seconds from a Retry-After header (delta-seconds or HTTP date)."""
+    if value is None:
+        return None
+    text = str(value).strip()
+    try:
+        return max(0.0, float(text))
+    except ValueError:
+        pass
+    try:
+        from email.utils import parsedate_to_datetime
+
+        dt = parsedate_to_datetime(text)
+        return max(0.0, dt.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,197 @@
+"""On-disk cache of Synergy JSON responses.
+
+Entries are keyed on sha256(scope + endpoint + sorted params) and stored as
+data/cache/synergy/<k[:2]>/<k>.json, so reruns of ingestion scripts and ML
+training skip payloads that have not changed. The scope (see cache_scope) is
+the API base URL plus a fingerprint of the key, so stand-in or trial-key
+responses never serve a production run. TTLs depend on the endpoint class;
+finished-game events never expire, which is why empty event payloads (the
+game may not be published yet) are not stored.
+
+Modes (SYNERGY_CACHE env var or the `mode` argument):
+    readwrite  serve fresh entries, fetch + store misses (default)
+    replay     serve only from cache, never touch the network (offline runs)
+    off        bypass the cache entirely
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+from urllib.parse import urlencode
+
+from src.ingestion import json_codec
+
+CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "data", "cache", "synergy"
+)
+MODES = ("readwrite", "replay", "off")
+
+HOUR = 3600.0
+DAY = 24 * HOUR
+
+# (endpoint pattern, ttl seconds); first match wins, None = never expires.
+TTL_RULES: list[tuple[re.Pattern, float | None]] = [
+    (re.compile(r"/seasons$"), 30 * DAY),
+    (re.compile(r"/teams$"), 7 * DAY),
+    (re.compile(r"/teams/[^/]+/players$"), 1 * DAY),
+    (re.compile(r"/games/[^/]+/events$"), 10 * 60.0),  # unless the caller marks the game final
+    (re.compile(r"/games$"), 1 * HOUR),
+    (re.compile(r"/events/reports/"), 1 * DAY),
+]
+DEFAULT_TTL = 1 * HOUR
+FOREVER = None
+
+# Empty answers from these endpoints are retried by the ingest ledger, so they
+# must not be cached (a final game's events would otherwise be empty forever).
+_NO_EMPTY_RX = re.compile(r"/games/[^/]+/events$")
+
+_MISSING = object()
+# Pass as `ttl` to use the endpoint-class rule from TTL_RULES.
+DEFAULT_TTL_RULE = object()
+
+
+def cache_scope(base_url: str, api_key: str | None) -> str:
+    """Cache namespace for one API deployment + credential (the key itself is never stored).
+
+    SYNERGY_CACHE_SCOPE replaces the key fingerprint, e.g. to replay a keyed
+    cache offline without the key.
+    """
+    fingerprint = os.getenv("SYNERGY_CACHE_SCOPE") or (
+        hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16] if api_key else ""
+    )
+    return f"{base_url.rstrip('/')}|{fingerprint}"
+
+
+def cache_key(endpoint: str, params: dict | None = None, scope: str = "") -> str:
+    items = sorted((str(k), str(v)) for k, v in (params or {}).items() if v is not None)
+    raw = f"{endpoint}?{urlencode(items)}"
+    if scope:
+        raw = f"{scope}\n{raw}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def is_empty_payload(payload) -> bool:
+    """[] or {"data": []}: a valid answer with nothing in it."""
+    if isinstance(payload, dict):
+        return "data" in payload and not payload["data"]
+    return isinstance(payload, list) and not payload
+
+
+def ttl_for(endpoint: str) -> float | None:
+    for rx, ttl in TTL_RULES:
+        if rx.search(endpoint):
+            return ttl
+    return DEFAULT_TTL
+
+
+class ResponseCache:
+    def __init__(self, root: str | None = None, mode: str | None = None):
+        mode = (mode or os.getenv("SYNERGY_CACHE") or "readwrite").lower()
+        if mode not in MODES:
+            raise ValueError(f"Unknown SYNERGY_CACHE mode: {mode!r} (expected one of {MODES})")
+        self.root = root or os.getenv("SYNERGY_CACHE_DIR") or CACHE_DIR
+        self.mode = mode
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    @property
+    def replay(self) -> bool:
+        return self.mode == "replay"
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.json")
+
+    def get(
+        self,
+        endpoint: str,
+        params: dict | None = None,
+        ttl: float | None | object = DEFAULT_TTL_RULE,
+        scope: str = "",
+    ):
+        """Cached payload, or _MISSING. Replay mode ignores TTLs."""
+        if not self.enabled:
+            return _MISSING
+        key = cache_key(endpoint, params, scope)
+        try:
+            with open(self._path(key), "rb") as f:
+                entry = json_codec.loads(f.read())
+        except (OSError, ValueError):
+            self._count(hit=False)
+            return _MISSING
+
+        if not self.replay:
+            ttl = ttl_for(endpoint) if ttl is DEFAULT_TTL_RULE else ttl
+            if ttl is not None and time.time() - float(entry.get("fetched_at") or 0) > ttl:
+                self._count(hit=False)
+                return _MISSING
+        self._count(hit=True)
+        return entry.get("payload")
+
+    def has(
+        self,
+        endpoint: str,
+        params: dict | None = None,
+        ttl: float | None | object = DEFAULT_TTL_RULE,
+        scope: str = "",
+    ) -> bool:
+        """True if get() would hit, without counting it; never-expiring entries skip the read."""
+        if not self.enabled:
+            return False
+        path = self._path(cache_key(endpoint, params, scope))
+        ttl = ttl_for(endpoint) if ttl is DEFAULT_TTL_RULE else ttl
+        if ttl is None or self.replay:
+            return os.path.exists(path)
+        try:
+            with open(path, "rb") as f:
+                entry = json_codec.loads(f.read())
+        except (OSError, ValueError):
+            return False
+        return time.time() - float(entry.get("fetched_at") or 0) <= ttl
+
+    def put(self, endpoint: str, params: dict | None, payload, scope: str = "") -> None:
+        if self.mode != "readwrite" or payload is None:
+            return
+        if is_empty_payload(payload) and _NO_EMPTY_RX.search(endpoint):
+            return
+        key = cache_key(endpoint, params, scope)
+        path = self._path(key)
+        entry = {
+            "scope": scope,
+            "endpoint": endpoint,
+            "params": params or {},
+            "fetched_at": time.time(),
+            "payload": payload,
+        }
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Unique temp file + rename: safe with concurrent writers.
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(json_codec.dumps(entry))
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+
+def is_missing(value) -> bool:
+    return value is _MISSING
@@ -1,30 +1,92 @@
 import os
+import threading
 import time
 
 import requests
 
 from config.settings import BASE_URL
+from src.http_session import get_session
+from src.ingestion import json_codec
+from src.ingestion.concurrent_fetch import fetch_concurrently
+from src.ingestion.metrics import Metrics, endpoint_kind
+from src.ingestion.rate_limiter import (
+    AdaptiveTokenBucket,
+    RatePolicy,
+    get_policy,
+    parse_retry_after,
+)
+from src.ingestion.response_cache import (
+    DEFAULT_TTL_RULE,
+    FOREVER,
+    ResponseCache,
+    cache_scope,
+    is_missing,
+)
 
 
 class SynergyClient:
-    def __init__(self, api_key: str | None = None):
+    def __init__(
+        self,
+        api_key: str | None = None,
+        bucket: AdaptiveTokenBucket | None = None,
+        max_workers: int | None = None,
+        cache: ResponseCache | None = None,
+        policy: str | RatePolicy | None = None,
+        base_url: str | None = None,
+        metrics: Metrics | None = None,
+    ):
+        self.cache = cache or ResponseCache()
         self.api_key = api_key or os.getenv("SYNERGY_API_KEY")
-        if not self.api_key:
+        # Replay mode serves from the response cache only, so no key is needed.
+        if not self.api_key and not self.cache.replay:
             raise ValueError("❌ ERROR: SYNERGY_API_KEY not found (env/secrets missing)")
 
-        self.base_url = BASE_URL
+        # SYNERGY_BASE_URL points every client at a local stand-in (src.ingestion.synergy_standin).
+        self.base_url = (base_url or os.getenv("SYNERGY_BASE_URL") or BASE_URL).rstrip("/")
+        # Cache entries are namespaced by deployment + key, so stand-in or
+        # trial-key responses never leak into a production run.
+        self.cache_scope = cache_scope(self.base_url, self.api_key)
         self.headers = {
-            "x-api-key": self.api_key,
+            "x-api-key": self.api_key or "",
             "Content-Type": "application/json",
         }
 
-        # Introspection for callers (capabilities, UI, etc.)
-        self.last_status_code: int | None = None
-        self.last_error: str | None = None
+        # One bucket per client, shared by every thread using it; the policy
+        # (conservative / adaptive / burst) sets its shape and the worker count.
+        self.policy = get_policy(policy)
+        self.bucket = bucket or self.policy.bucket()
+        self.max_workers = max(1, int(max_workers or self.policy.max_workers))
+
+        # Pass a shared Metrics to aggregate a run across clients and writers.
+        self.metrics = metrics or Metrics()
+
+        # Introspection for callers (capabilities, UI, etc.); per-thread so
+        # concurrent workers don't clobber each other's status.
+        self._local = threading.local()
+
+    @property
+    def last_status_code(self) -> int | None:
+        return getattr(self._local, "last_status_code", None)
+
+    @last_status_code.setter
+    def last_status_code(self, value: int | None) -> None:
+        self._local.last_status_code = value
 
-    def _get(self, endpoint, params=None, retries=8):
+    @property
+    def last_error(self) -> str | None:
+        return getattr(self._local, "last_error", None)
+
+    @last_error.setter
+    def last_error(self, value: str | None) -> None:
+        self._local.last_error = value
+
+    def _get(self, endpoint, params=None, retries=8, ttl=DEFAULT_TTL_RULE):
         """Executes a GET request with adaptive rate-limit handling.
 
+        Safe to call from several threads: all of them draw from self.bucket,
+        and a 429 on any thread pauses the whole client. Responses go through
+        self.cache (ttl overrides the endpoint-class TTL; FOREVER never expires).
+
         Returns:
             Parsed JSON (dict/list) on success, else None.
 
@@ -32,49 +94,43 @@ class SynergyClient:
             Populates last_status_code and last_error for callers.
         """
 
-        url = f"{self.base_url}{endpoint}"
-        print(f"  > Requesting URL: {url} with params: {params}")
         self.last_status_code = None
         self.last_error = None
 
-        # Adaptive throttle: increases on 429, slowly decreases on success
-        if not hasattr(self, "_min_interval_s"):
-            self._min_interval_s = 1.5
-        if not hasattr(self, "_last_request_ts"):
-            self._last_request_ts = 0.0
-        if not hasattr(self, "_req_count"):
-            self._req_count = 0
+        cached = self.cache.get(endpoint, params, ttl=ttl, scope=self.cache_scope)
+        if not is_missing(cached):
+            self.last_status_code = 200
+            return cached
+        if self.cache.replay:
+            self.last_error = f"replay: no cached response for {endpoint}"
+            return None
 
-        for attempt in range(retries):
-            # Global throttle between requests
-            now = time.time()
-            wait_needed = self._min_interval_s - (now - self._last_request_ts)
-            if wait_needed > 0:
-                time.sleep(wait_needed)
+        url = f"{self.base_url}{endpoint}"
+        print(f"  > Requesting URL: {url} with params: {params}")
+        metrics = self.metrics
+        kind = endpoint_kind(endpoint)
 
-            # Periodic micro-cooldown every 25 requests
-            self._req_count += 1
-            if self._req_count % 25 == 0:
-                time.sleep(3.0)
+        for attempt in range(retries):
+            self.bucket.acquire()
 
+            response = None
+            t0 = time.perf_counter()
             try:
-                response = requests.get(url, headers=self.headers, params=params, timeout=30)
-                self._last_request_ts = time.time()
+                response = get_session().get(url, headers=self.headers, params=params, timeout=30)
+                metrics.observe("synergy_request_duration_seconds", time.perf_counter() - t0, endpoint=kind)
+                metrics.inc("synergy_requests_total", endpoint=kind, status=response.status_code)
+                metrics.inc("synergy_response_bytes_total", len(response.content), endpoint=kind)
                 self.last_status_code = response.status_code
                 print(f"  < Status Code: {response.status_code}")
 
-                # 1. Handle Rate Limiting (429)
+                # 1. Handle Rate Limiting (429): slow down every worker, not just this one
                 if response.status_code == 429:
-                    retry_after = response.headers.get("Retry-After")
-                    if retry_after and str(retry_after).isdigit():
-                        wait_time = int(retry_after)
-                    else:
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    if retry_after is None:
                         # exponential backoff + jitter
-                        wait_time = min(90, (2 ** attempt) * 3) + (0.7 * attempt)
-                    # Increase baseline throttle after a 429
-                    self._min_interval_s = min(8.0, self._min_interval_s + 0.75)
-                    print(f"      ⚠️ Rate limit hit (429). Pausing for {wait_time:.1f}s... (min_interval={self._min_interval_s:.2f}s)")
-                    time.sleep(wait_time)
+                        retry_after = min(90, (2 ** attempt) * 3) + (0.7 * attempt)
+                    wait_time = self.bucket.on_throttle(retry_after)
+                    print(f"      ⚠️ Rate limit hit (429). Pausing for {wait_time:.1f}s... (rate={self.bucket.rate:.2f}/s)")
                     continue
 
                 # 2. Handle Server Errors (5xx)
@@ -82,13 +138,18 @@ class SynergyClient:
                     wait_time = min(45, 3 + attempt * 3)
                     print(f"      ⚠️ Server Error ({response.status_code}). Retrying in {wait_time}s...")
                     time.sleep(wait_time)
+                    metrics.inc("synergy_backoff_seconds_total", wait_time, endpoint=kind)
                     continue
 
                 response.raise_for_status()
 
-                # Success: slowly relax throttle
-                self._min_interval_s = max(0.8, self._min_interval_s * 0.95)
-                return response.json()
+                # Success: additive increase of the shared rate
+                self.bucket.on_success()
+                t_parse = time.perf_counter()
+                payload = json_codec.loads(response.content)
+                metrics.observe("synergy_parse_duration_seconds", time.perf_counter() - t_parse, endpoint=kind)
+                self.cache.put(endpoint, params, payload, scope=self.cache_scope)
+                return payload
 
             except requests.HTTPError as e:
                 # Non-retry for 401/403/404-ish (no point hammering)
@@ -106,12 +167,42 @@ class SynergyClient:
 
             except Exception as e:
                 self.last_error = str(e)
+                if response is None:
+                    metrics.inc("synergy_requests_total", endpoint=kind, status="error")
                 if attempt == retries - 1:
                     print(f"❌ API Failed on {endpoint}: {e}")
                     return None
 
         return None
 
+    def collect_metrics(self) -> Metrics:
+        """Copy the limiter's sleep totals and cache hit/miss counts into self.metrics."""
+        state = self.bucket.snapshot()
+        m = self.metrics
+        m.set("synergy_rate_limit_wait_seconds_total", state["total_wait_s"] - state["throttle_wait_s"], reason="pacing")
+        m.set("synergy_rate_limit_wait_seconds_total", state["throttle_wait_s"], reason="throttle")
+        m.set("synergy_throttled_total", state["throttle_count"])
+        m.set("synergy_rate_per_second", state["rate"])
+        m.set("synergy_cache_lookups_total", self.cache.hits, result="hit")
+        m.set("synergy_cache_lookups_total", self.cache.misses, result="miss")
+        return m
+
+    def map(self, fn, items, max_workers: int | None = None):
+        """Yield (item, fn(item)) for each item, running up to max_workers calls at once.
+
+        fn normally wraps one of the get_* methods; results come back on the
+        calling thread in completion order.
+        """
+        return fetch_concurrently(fn, items, max_workers=max_workers or self.max_workers)
+
+    def get_game_events_many(self, league_code, game_ids, max_workers: int | None = None, final: bool = False):
+        """Concurrently fetch events for many games; yields (game_id, payload)."""
+        return self.map(
+            lambda gid: self.get_game_events(league_code, gid, final=final),
+            game_ids,
+            max_workers=max_workers,
+        )
+
     def get_seasons(self, league_code="ncaamb"):
         # Spec: GET /{league}/seasons
         return self._get(f"/{league_code}/seasons")
@@ -135,9 +226,13 @@ class SynergyClient:
 
         return self._get(f"/{league_code}/games", params=params)
 
-    def get_game_events(self, league_code, game_id):
+    def get_game_events(self, league_code, game_id, final: bool = False):
         # Spec: GET /{league}/games/{gameId}/events
-        return self._get(f"/{league_code}/games/{game_id}/events")
+        # Events of a finished game never change, so cache them forever.
+        return self._get(
+            f"/{league_code}/games/{game_id}/events",
+            ttl=FOREVER if final else DEFAULT_TTL_RULE,
+        )
 
     def get_team_players(self, league_code, team_id):
         # Spec: GET /{league}/teams/{teamId}/players
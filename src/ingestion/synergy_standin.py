@@ -0,0 +1,477 @@
+"""Local HTTP stand-in for the Synergy endpoints SynergyClient uses.
+
+Serves a generated (deterministic) league, or responses recorded in the
+response cache, with injectable latency, 429s (with or without Retry-After),
+a server-side request-rate cap and 5xx bursts. Point a client at it with
+SYNERGY_BASE_URL (or SynergyClient(base_url=...)) to exercise the concurrent
+client, rate limiter, ledger and ingest paths end to end with no network.
+
+    python -m src.ingestion.synergy_standin --port 8765 --latency 0.05 --p429 0.02 --max-rps 6
+    SYNERGY_BASE_URL=http://127.0.0.1:8765 SYNERGY_API_KEY=x SYNERGY_CACHE=off python -m src.ingestion.planner ...
+
+Request/status counts are served at /_stats.
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Self
+from urllib.parse import parse_qsl, urlsplit
+
+from config.settings import BASE_URL
+from src.ingestion import json_codec
+from src.ingestion.response_cache import ResponseCache, cache_scope, is_missing
+
+_DESCRIPTIONS = [
+    "Pick and Roll Ball Handler", "P&R Roll Man", "Isolation", "Post-Up", "Spot Up",
+    "Cut", "Handoff", "Off Screen", "Transition", "Jump Shot", "Layup", "Dunk",
+    "Make 2 Pts", "Miss 2 Pts", "Make 3 Pts", "Miss 3 Pts", "Free Throw", "Turnover",
+    "Offensive Rebound", "Defensive Rebound", "Foul", "Block", "Steal", "Assisted",
+]
+
+
+@dataclass
+class Faults:
+    """What the stand-in does to otherwise good responses.
+
+    latency/jitter: seconds added to every response (uniform jitter on top).
+    p429: chance a request is rate limited; max_rps caps the accepted request
+    rate over a sliding second and answers the excess with 429 as well.
+    retry_after: Retry-After seconds on those 429s (None omits the header).
+    p5xx: chance a request starts a run of burst_5xx consecutive 503s.
+    """
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    p429: float = 0.0
+    retry_after: float | None = 1.0
+    max_rps: float | None = None
+    p5xx: float = 0.0
+    burst_5xx: int = 1
+    seed: int = 0
+
+
+class GeneratedLeague:
+    """Deterministic league: seasons, teams, rosters, schedules, events and play-type reports."""
+
+    def __init__(
+        self,
+        league_code: str = "ncaamb",
+        seasons: int = 1,
+        teams: int = 8,
+        players_per_team: int = 12,
+        rounds: int = 10,
+        events_per_game: int = 300,
+        seed: int = 0,
+    ):
+        self.league_code = league_code
+        self.events_per_game = events_per_game
+        self.seed = seed
+        self.seasons = [
+            {"id": f"s{y}", "name": f"{y}-{(y + 1) % 100:02d}", "year": y} for y in range(2025 - seasons, 2025)
+        ]
+        self.teams = [
+            {"id": f"t{i}", "name": f"Team {i}", "abbr": f"T{i:02d}", "conference": {"name": f"Conf {i % 4}"}}
+            for i in range(teams)
+        ]
+        self.players = {
+            t["id"]: [
+                {
+                    "id": f"{t['id']}p{j}",
+                    "nameFirst": f"First{j}",
+                    "nameLast": f"Last{t['id']}{j}",
+                    "name": f"First{j} Last{t['id']}{j}",
+                    "position": "GFC"[j % 3],
+                    "heightInches": 72 + j % 12,
+                    "weightPounds": 180 + 5 * (j % 10),
+                }
+                for j in range(players_per_team)
+            ]
+            for t in self.teams
+        }
+        self.games = {s["id"]: self._schedule(s["id"], rounds) for s in self.seasons}
+        self._game_index = {g["id"]: g for games in self.games.values() for g in games}
+
+    def _schedule(self, season_id: str, rounds: int) -> list[dict]:
+        rng = random.Random(f"{self.seed}:{season_id}")
+        games = []
+        n = len(self.teams)
+        for rnd in range(rounds):
+            for i in range(0, n - 1, 2):
+                home, away = self.teams[(i + rnd) % n], self.teams[(i + 1 + 2 * rnd) % n]
+                if home is away:
+                    continue
+                games.append(
+                    {
+                        "id": f"{season_id}g{len(games)}",
+                        "date": f"{season_id[1:]}-12-{1 + rnd % 28:02d}",
+                        "status": "GameOver",
+                        "homeTeam": home,
+                        "awayTeam": away,
+                        "homeScore": rng.randint(55, 95),
+                        "awayScore": rng.randint(55, 95),
+                    }
+                )
+        return games
+
+    def seasons_payload(self) -> dict:
+        return {"data": [{"data": s} for s in self.seasons]}
+
+    def teams_payload(self, params: dict) -> dict:
+        return {"data": [{"data": t} for t in self.teams]}
+
+    def games_payload(self, params: dict) -> dict | None:
+        games = self.games.get(params.get("seasonId", ""))
+        if games is None:
+            return None
+        tid = params.get("teamId")
+        if tid:
+            games = [g for g in games if tid in (g["homeTeam"]["id"], g["awayTeam"]["id"])]
+        return {"data": [{"data": g} for g in _page(games, params)]}
+
+    def players_payload(self, team_id: str) -> dict | None:
+        players = self.players.get(team_id)
+        return None if players is None else {"data": [{"data": p} for p in players]}
+
+    def events_payload(self, game_id: str) -> dict | None:
+        game = self._game_index.get(game_id)
+        if game is None:
+            return None
+        rng = random.Random(f"{self.seed}:{game_id}")
+        sides = [game["homeTeam"], game["awayTeam"]]
+        rosters = [self.players[t["id"]] for t in sides]
+        n = self.events_per_game
+        events = []
+        for i in range(n):
+            off = rng.randrange(2)
+            evt = {
+                "id": f"{game_id}e{i}",
+                "description": " ".join(rng.sample(_DESCRIPTIONS, rng.randint(1, 3))),
+                "gameQuarter": 1 + i * 2 // n,
+                "clock": 1200 - (i * 2400 // n) % 1200,
+                "person": rng.choice(rosters[off]),
+                "offense": sides[off],
+                "defense": sides[1 - off],
+                "shotX": rng.randint(0, 94),
+                "shotY": rng.randint(0, 50),
+                "pickAndRoll": rng.random() < 0.2,
+                "transition": rng.random() < 0.15,
+                "ato": rng.random() < 0.05,
+                "shortClock": rng.random() < 0.1,
+                "isHome": off == 0,
+                "duration": round(rng.uniform(2, 24), 1),
+                "homeScore": i * game["homeScore"] // n,
+                "awayScore": i * game["awayScore"] // n,
+                "offensiveLineup": ",".join(p["id"] for p in rng.sample(rosters[off], 5)),
+            }
+            if rng.random() < 0.3:
+                evt["assist"] = rng.choice(rosters[off])
+            if rng.random() < 0.2:
+                evt["dPlayer"] = rng.choice(rosters[1 - off])
+            events.append({"data": evt})
+        return {"data": events}
+
+    def playtype_payload(self, season_id: str, params: dict) -> dict | None:
+        if season_id not in self.games:
+            return None
+        tid = params.get("teamId")
+        teams = [tid] if tid else list(self.players)
+        play_type = params.get("playType", "")
+        records = []
+        for team_id in teams:
+            for p in self.players.get(team_id, []):
+                rng = random.Random(f"{self.seed}:{season_id}:{p['id']}:{play_type}")
+                s2m, s2x, s3m, s3x = (rng.randint(0, 20) for _ in range(4))
+                ftm, ftx = rng.randint(0, 10), rng.randint(0, 5)
+                fga = s2m + s2x + s3m + s3x
+                stats = {
+                    "gp": rng.randint(1, 30),
+                    "possessions": fga + rng.randint(0, 10),
+                    "points": 2 * s2m + 3 * s3m + ftm,
+                    "fgMade": s2m + s3m, "fgMiss": s2x + s3x, "fgAttempt": fga,
+                    "fgPercentEffective": round((s2m + 1.5 * s3m) / fga, 4) if fga else 0.0,
+                    "shot2Made": s2m, "shot2Miss": s2x, "shot2Attempt": s2m + s2x,
+                    "shot3Made": s3m, "shot3Miss": s3x, "shot3Attempt": s3m + s3x,
+                    "ftMade": ftm, "ftMiss": ftx, "ftAttempt": ftm + ftx,
+                    "plusOne": rng.randint(0, 3), "shotFoul": rng.randint(0, 5),
+                    "score": s2m + s3m, "turnover": rng.randint(0, 6),
+                }
+                records.append({"data": {"player": {"id": p["id"]}, "team": {"id": team_id}, "stats": stats}})
+        return {"data": _page(records, params)}
+
+
+def _page(items: list, params: dict) -> list:
+    skip = int(params.get("skip") or 0)
+    take = int(params.get("take") or len(items))
+    return items[skip : skip + take]
+
+
+class RecordedResponses:
+    """Serves whatever the response cache holds for the exact endpoint + params; misses are 404s.
+
+    scope defaults to what a production client with SYNERGY_API_KEY recorded.
+    """
+
+    def __init__(self, root: str | None = None, scope: str | None = None):
+        self.cache = ResponseCache(root=root, mode="replay")
+        self.scope = cache_scope(BASE_URL, os.getenv("SYNERGY_API_KEY")) if scope is None else scope
+
+    def lookup(self, endpoint: str, params: dict):
+        payload = self.cache.get(endpoint, params or None, scope=self.scope)
+        return None if is_missing(payload) else payload
+
+
+_ROUTES = [
+    (re.compile(r"^/(?P<league>[^/]+)/seasons$"), "seasons"),
+    (re.compile(r"^/(?P<league>[^/]+)/teams$"), "teams"),
+    (re.compile(r"^/(?P<league>[^/]+)/games$"), "games"),
+    (re.compile(r"^/(?P<league>[^/]+)/games/(?P<game_id>[^/]+)/events$"), "events"),
+    (re.compile(r"^/(?P<league>[^/]+)/teams/(?P<team_id>[^/]+)/players$"), "players"),
+    (re.compile(r"^/(?P<league>[^/]+)/seasons/(?P<season_id>[^/]+)/events/reports/playerplaytypestats$"), "playtype"),
+]
+
+
+def route(path: str) -> tuple[str, dict] | None:
+    for rx, kind in _ROUTES:
+        m = rx.match(path)
+        if m:
+            return kind, m.groupdict()
+    return None
+
+
+class _FaultState:
+    """Decides each request's fate; shared by all handler threads."""
+
+    def __init__(self, faults: Faults):
+        self.faults = faults
+        self._rng = random.Random(faults.seed)
+        self._lock = threading.Lock()
+        self._accepted: deque[float] = deque()
+        self._burst_left = 0
+
+    def verdict(self) -> tuple[int, float | None]:
+        """(status, retry_after) to answer with; status 200 means serve normally."""
+        f = self.faults
+        with self._lock:
+            if self._burst_left > 0:
+                self._burst_left -= 1
+                return 503, None
+            if f.p5xx and self._rng.random() < f.p5xx:
+                self._burst_left = max(0, f.burst_5xx - 1)
+                return 503, None
+            if f.p429 and self._rng.random() < f.p429:
+                return 429, f.retry_after
+            if f.max_rps:
+                now = time.monotonic()
+                while self._accepted and now - self._accepted[0] >= 1.0:
+                    self._accepted.popleft()
+                if len(self._accepted) >= f.max_rps:
+                    wait = 1.0 - (now - self._accepted[0])
+                    return 429, math.ceil(wait) if f.retry_after is not None else None
+                self._accepted.append(now)
+            return 200, None
+
+    def delay(self) -> float:
+        f = self.faults
+        if not f.jitter:
+            return f.latency
+        with self._lock:
+            return f.latency + self._rng.uniform(0, f.jitter)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: _StandinHTTPServer
+
+    def do_GET(self):
+        srv = self.server
+        parts = urlsplit(self.path)
+        params = dict(parse_qsl(parts.query))
+        if parts.path == "/_stats":
+            return self._send(200, srv.stats())
+
+        match = route(parts.path)
+        kind = match[0] if match else "unknown"
+        srv.count("requests", kind)
+        if not self.headers.get("x-api-key"):
+            return self._send(401, {"error": "missing x-api-key"}, kind)
+        if match is None:
+            return self._send(404, {"error": f"no route for {parts.path}"}, kind)
+
+        time.sleep(srv.faults.delay())
+        status, retry_after = srv.faults.verdict()
+        if status != 200:
+            headers = {"Retry-After": f"{retry_after:g}"} if retry_after is not None else {}
+            return self._send(status, {"error": "injected"}, kind, headers)
+
+        payload = srv.payload(kind, match[1], parts.path, params)
+        if payload is None:
+            return self._send(404, {"error": "not found"}, kind)
+        return self._send(200, payload, kind)
+
+    def _send(self, status: int, body, kind: str | None = None, headers: dict | None = None):
+        data = json_codec.dumps(body)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+        if kind is not None:
+            self.server.count("status", f"{kind}:{status}")
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class _StandinHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, source, faults: Faults, verbose: bool = False):
+        super().__init__(address, _Handler)
+        self.source = source
+        self.faults = _FaultState(faults)
+        self.verbose = verbose
+        self._counts: dict[str, Counter] = {"requests": Counter(), "status": Counter()}
+        self._counts_lock = threading.Lock()
+
+    def count(self, group: str, key: str) -> None:
+        with self._counts_lock:
+            self._counts[group][key] += 1
+
+    def stats(self) -> dict:
+        with self._counts_lock:
+            return {k: dict(v) for k, v in self._counts.items()}
+
+    def payload(self, kind: str, args: dict, path: str, params: dict):
+        src = self.source
+        if isinstance(src, RecordedResponses):
+            return src.lookup(path, params)
+        if args.get("league") != src.league_code:
+            return None
+        if kind == "seasons":
+            return src.seasons_payload()
+        if kind == "teams":
+            return src.teams_payload(params)
+        if kind == "games":
+            return src.games_payload(params)
+        if kind == "events":
+            return src.events_payload(args["game_id"])
+        if kind == "players":
+            return src.players_payload(args["team_id"])
+        return src.playtype_payload(args["season_id"], params)
+
+
+class SynergyStandin:
+    """Runs the stand-in on a background thread; use as a context manager.
+
+        with SynergyStandin(faults=Faults(p429=0.1, retry_after=0)) as standin:
+            client = SynergyClient(api_key="x", base_url=standin.base_url, cache=ResponseCache(mode="off"))
+    """
+
+    def __init__(
+        self,
+        source: GeneratedLeague | RecordedResponses | None = None,
+        faults: Faults | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        verbose: bool = False,
+    ):
+        self.source = source or GeneratedLeague()
+        self.httpd = _StandinHTTPServer((host, port), self.source, faults or Faults(), verbose=verbose)
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def stats(self) -> dict:
+        return self.httpd.stats()
+
+    def start(self) -> Self:
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="synergy-standin", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> Self:
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the Synergy API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--recorded", default=None, metavar="CACHE_DIR", help="Serve a response-cache directory instead of generated data")
+    parser.add_argument("--league", default="ncaamb")
+    parser.add_argument("--seasons", type=int, default=1)
+    parser.add_argument("--teams", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--events-per-game", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra uniform random latency, seconds")
+    parser.add_argument("--p429", type=float, default=0.0, help="Chance of a 429 per request")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds on 429s (negative: omit)")
+    parser.add_argument("--max-rps", type=float, default=None, help="429 anything above this many requests/s")
+    parser.add_argument("--p5xx", type=float, default=0.0, help="Chance a request starts a 5xx burst")
+    parser.add_argument("--burst-5xx", type=int, default=1, help="Consecutive 503s per burst")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-v", "--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    if args.recorded:
+        source = RecordedResponses(args.recorded)
+    else:
+        source = GeneratedLeague(
+            league_code=args.league,
+            seasons=args.seasons,
+            teams=args.teams,
+            rounds=args.rounds,
+            events_per_game=args.events_per_game,
+            seed=args.seed,
+        )
+    faults = Faults(
+        latency=args.latency,
+        jitter=args.jitter,
+        p429=args.p429,
+        retry_after=args.retry_after if args.retry_after >= 0 else None,
+        max_rps=args.max_rps,
+        p5xx=args.p5xx,
+        burst_5xx=args.burst_5xx,
+        seed=args.seed,
+    )
+    standin = SynergyStandin(source, faults, host=args.host, port=args.port, verbose=args.verbose)
+    print(f"Synergy stand-in on {standin.base_url} (SYNERGY_BASE_URL={standin.base_url})")
+    if isinstance(source, GeneratedLeague):
+        print(f"  seasons {[s['id'] for s in source.seasons]}, teams t0..t{len(source.teams) - 1}")
+    try:
+        standin.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        standin.httpd.server_close()
+        print(f"stats: {standin.stats()}")
+
+
+if __name__ == "__main__":
+    main()
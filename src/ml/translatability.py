@@ -13,10 +13,10 @@ from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 from sklearn.model_selection import train_test_split
 from xgboost import XGBRegressor
 
-from src.processing.play_tagger import tag_play
+from src.processing.play_tagger import stored_tags
 
 from config.ncaa_di_mens_basketball import NCAA_DI_MENS_BASKETBALL
-from src.ingestion.db import db_path
+from src.ingestion.db import db_path, ensure_schema
 from src.ingestion.synergy_client import SynergyClient
 
 
@@ -166,7 +166,7 @@ def _build_within_season_frame(conn: sqlite3.Connection) -> pd.DataFrame:
         """
         SELECT p.game_id, g.season_id, g.date, p.description, p.clock_seconds,
                p.player_id, p.assist_player_id, p.r_player_id, p.d_player_id,
-               p.duration, p.offensive_lineup
+               p.duration, p.offensive_lineup, p.tag_mask
         FROM plays p
         JOIN games g ON g.game_id = p.game_id
         """,
@@ -205,7 +205,8 @@ def _build_within_season_frame(conn: sqlite3.Connection) -> pd.DataFrame:
 
     rows = []
     for _, r in plays.iterrows():
-        tags = tag_play(r.get("description") or "", r.get("clock_seconds"))
+        mask = r.get("tag_mask")
+        tags = stored_tags(None if pd.isna(mask) else int(mask), r.get("description"), r.get("clock_seconds"))
         lineup_ids = _lineup_player_ids(r.get("offensive_lineup"))
         duration = r.get("duration")
         involved = set(filter(None, [r.get("player_id"), r.get("assist_player_id"), r.get("r_player_id"), r.get("d_player_id")]))
@@ -384,6 +385,7 @@ def _build_within_season_frame(conn: sqlite3.Connection) -> pd.DataFrame:
 def build_training_frame(db_file: str | None = None, allow_fallback: bool = True) -> pd.DataFrame:
     path = db_file or db_path()
     conn = sqlite3.connect(path)
+    ensure_schema(conn)
 
     stats, players, traits = _load_tables(conn)
 
@@ -0,0 +1,195 @@
+"""Empirical per-position percentile tables.
+
+Built from the actual `players` height/weight distribution and each player's
+latest `player_season_stats` row. Every (position, metric) table is a sorted
+list of values, so a lookup is a single bisect (O(log n)). Tables are rebuilt
+at ingest and read from data/percentile_tables.json by the dashboard, chat and
+ghostwriter instead of recomputing distributions per request.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import sqlite3
+from bisect import bisect_right
+from datetime import UTC, datetime
+from functools import lru_cache
+
+from src.position_calibration import map_db_to_canonical
+
+TABLES_VERSION = 1
+TABLES_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "percentile_tables.json")
+
+# Tables with fewer values than this are skipped for the coarse group, then priors.
+MIN_SAMPLES = 20
+
+METRIC_ALIASES = {"h": "height_in", "w": "weight_lb"}
+
+BODY_METRICS = ("height_in", "weight_lb")
+STAT_METRICS = (
+    "ppg",
+    "rpg",
+    "apg",
+    "points",
+    "possessions",
+    "minutes",
+    "reb",
+    "ast",
+    "stl",
+    "blk",
+    "turnover",
+    "fg_percent",
+    "fg_percent_effective",
+    "shot3_percent",
+    "ft_percent",
+)
+
+
+# Specific canonical position -> the coarse group it falls back to.
+COARSE_POSITIONS = {
+    "POINT_GUARD": "GUARD",
+    "SHOOTING_GUARD": "GUARD",
+    "SMALL_FORWARD": "FORWARD",
+    "POWER_FORWARD": "FORWARD",
+}
+
+
+def position_keys(raw_pos: str) -> list[str]:
+    """Table keys to try for a DB or canonical position, most specific first.
+
+    PG/SG/SF/PF rank against their own position and fall back to GUARD/FORWARD;
+    a bare G or F only has the coarse group.
+    """
+    mapped = map_db_to_canonical(raw_pos)
+    specific = [p for p in mapped if p in COARSE_POSITIONS]
+    if len(specific) == 1:
+        key = specific[0]
+    else:
+        key = mapped[0] if mapped else (raw_pos or "").upper()
+    return [key, COARSE_POSITIONS[key]] if key in COARSE_POSITIONS else [key]
+
+
+def _table_keys(raw_pos: str) -> list[str]:
+    # A player counts toward every canonical position their DB position maps to.
+    mapped = map_db_to_canonical(raw_pos)
+    return mapped or ([raw_pos.upper()] if raw_pos else [])
+
+
+def _numeric(val) -> float | None:
+    try:
+        f = float(val)
+    except (TypeError, ValueError):
+        return None
+    if math.isnan(f):
+        return None
+    return f
+
+
+def build_percentile_tables(conn: sqlite3.Connection) -> dict[str, dict[str, list[float]]]:
+    """Return {position: {metric: sorted values}} from players + latest season stats."""
+    values: dict[str, dict[str, list[float]]] = {}
+
+    def add(raw_pos: str, metric: str, val) -> None:
+        f = _numeric(val)
+        if f is None or (metric in BODY_METRICS and f <= 0):
+            return
+        for key in _table_keys(raw_pos):
+            values.setdefault(key, {}).setdefault(metric, []).append(f)
+
+    cur = conn.cursor()
+    cur.execute("SELECT position, height_in, weight_lb FROM players WHERE position IS NOT NULL")
+    for pos, h, w in cur.fetchall():
+        add(str(pos), "height_in", h)
+        add(str(pos), "weight_lb", w)
+
+    cur.execute("PRAGMA table_info(player_season_stats)")
+    stat_cols = [m for m in STAT_METRICS if m in {row[1] for row in cur.fetchall()}]
+    if stat_cols:
+        cols = ", ".join(f"s.{c}" for c in stat_cols)
+        cur.execute(
+            f"""
+            SELECT position, {", ".join(stat_cols)} FROM (
+                SELECT p.position AS position, {cols},
+                       ROW_NUMBER() OVER (PARTITION BY s.player_id ORDER BY s.season_id DESC) AS rn
+                FROM player_season_stats s
+                JOIN players p ON s.player_id = p.player_id
+                WHERE p.position IS NOT NULL
+            ) sub
+            WHERE rn = 1
+            """
+        )
+        for row in cur.fetchall():
+            for metric, val in zip(stat_cols, row[1:], strict=True):
+                add(str(row[0]), metric, val)
+
+    return {pos: {m: sorted(vs) for m, vs in metrics.items()} for pos, metrics in values.items()}
+
+
+def rebuild_percentile_tables(conn: sqlite3.Connection, path: str | None = None) -> int:
+    """Rebuild and persist the tables; returns the number of (position, metric) tables."""
+    path = path or TABLES_PATH
+    tables = build_percentile_tables(conn)
+    bundle = {
+        "version": TABLES_VERSION,
+        "built_at": datetime.now(UTC).isoformat(),
+        "tables": tables,
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(bundle, f, separators=(",", ":"))
+    os.replace(tmp, path)
+    return sum(len(m) for m in tables.values())
+
+
+@lru_cache(maxsize=1)
+def _load_tables(path: str, mtime: float) -> dict[str, dict[str, list[float]]]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            bundle = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if bundle.get("version") != TABLES_VERSION:
+        return {}
+    return bundle.get("tables") or {}
+
+
+def load_percentile_tables(path: str | None = None) -> dict[str, dict[str, list[float]]]:
+    """Cached tables; reloaded automatically when the file is rebuilt."""
+    path = path or TABLES_PATH
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return {}
+    return _load_tables(path, mtime)
+
+
+def _table(raw_pos: str, metric: str) -> list[float] | None:
+    metric = METRIC_ALIASES.get(metric, metric)
+    tables = load_percentile_tables()
+    for key in position_keys(raw_pos):
+        arr = tables.get(key, {}).get(metric)
+        if arr and len(arr) >= MIN_SAMPLES:
+            return arr
+    return None
+
+
+def empirical_percentile(value: float | None, raw_pos: str, metric: str) -> int | None:
+    """Percentile (0-99) of value within its position's table, or None if no table."""
+    f = _numeric(value)
+    if f is None:
+        return None
+    arr = _table(raw_pos, metric)
+    if arr is None:
+        return None
+    pct = bisect_right(arr, f) / float(len(arr))
+    return max(0, min(99, int(pct * 100)))
+
+
+def position_median(raw_pos: str, metric: str) -> float | None:
+    arr = _table(raw_pos, metric)
+    if arr is None:
+        return None
+    return arr[len(arr) // 2]
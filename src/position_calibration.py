@@ -2,7 +2,8 @@ import json
 import math
 import re
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple, Any
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 
 # ----------------------------
 # Canonical positions
@@ -214,26 +215,74 @@ def normalize_text(text: str) -> str:
     return t
 
 
-def extract_group_hits(text: str) -> Dict[str, int]:
-    t = normalize_text(text)
-    hits: Dict[str, int] = {}
-    for gid, g in TERM_GROUPS.items():
-        count = 0
-        for pat in g["patterns"]:
-            if pat.search(t):
-                count += 1
-        if count > 0:
-            hits[gid] = count
-    return hits
+# All TERM_GROUPS patterns folded into one alternation. Each pattern gets a
+# named group inside a lookahead so a single finditer pass reports hits
+# without consuming text. An alternation only reports the first pattern that
+# matches at a position, so patterns that can start on the same character
+# (e.g. "big" and "big man") are re-checked at that position only.
+_GROUP_HIT_CACHE_SIZE = 4096
 
 
-def extract_base_terms(text: str) -> List[str]:
-    t = normalize_text(text)
+def _lead_char(pattern: str) -> Optional[str]:
+    body = pattern.removeprefix(r"\b").lstrip("(")
+    ch = body[:1].lower()
+    return ch if ch.isalnum() else None
+
+
+def _build_group_regex() -> Tuple[re.Pattern, Dict[str, Tuple[Tuple[str, re.Pattern], ...]]]:
+    names: List[str] = []
+    pats: List[re.Pattern] = []
+    for gid, g in TERM_GROUPS.items():
+        for i, pat in enumerate(g["patterns"]):
+            names.append(f"{gid}__{i}")
+            pats.append(pat)
+    alternation = "|".join(f"(?P<{n}>{p.pattern})" for n, p in zip(names, pats, strict=True))
+    anchored = all(p.pattern.startswith(r"\b") for p in pats)
+    rx = re.compile((r"\b" if anchored else "") + f"(?=(?:{alternation}))", flags=re.IGNORECASE)
+
+    # name -> later (name, pattern) pairs that may also match at the same start
+    co_start: Dict[str, Tuple[Tuple[str, re.Pattern], ...]] = {}
+    for k, name in enumerate(names):
+        lead = _lead_char(pats[k].pattern)
+        co_start[name] = tuple(
+            (names[j], pats[j])
+            for j in range(k + 1, len(pats))
+            if lead is None or _lead_char(pats[j].pattern) in (None, lead)
+        )
+    return rx, co_start
+
+
+_GROUP_RX, _GROUP_CO_START = _build_group_regex()
+
+# Multi-word base synonyms, longest first (matched as plain substrings).
+_BASE_PHRASES: Tuple[str, ...] = tuple(
+    k for k in sorted(POSITION_SYNONYMS.keys(), key=lambda s: -len(s)) if " " in k
+)
+_BASE_PHRASE_RX = re.compile("(?=(" + "|".join(re.escape(k) for k in _BASE_PHRASES) + "))")
+
+
+@lru_cache(maxsize=_GROUP_HIT_CACHE_SIZE)
+def _group_hits_normalized(t: str) -> Tuple[Tuple[str, int], ...]:
+    matched: set = set()
+    for m in _GROUP_RX.finditer(t):
+        matched.add(m.lastgroup)
+        pos = m.start()
+        for name, pat in _GROUP_CO_START[m.lastgroup]:
+            if name not in matched and pat.match(t, pos):
+                matched.add(name)
+    counts: Dict[str, int] = {}
+    for name in matched:
+        gid = name.rsplit("__", 1)[0]
+        counts[gid] = counts.get(gid, 0) + 1
+    # Preserve TERM_GROUPS order in the result.
+    return tuple((gid, counts[gid]) for gid in TERM_GROUPS if gid in counts)
+
+
+@lru_cache(maxsize=_GROUP_HIT_CACHE_SIZE)
+def _base_terms_normalized(t: str) -> Tuple[str, ...]:
     # phrase-first for base synonyms
-    found: List[str] = []
-    for k in sorted(POSITION_SYNONYMS.keys(), key=lambda s: -len(s)):
-        if " " in k and k in t:
-            found.append(k)
+    phrases = {m.group(1) for m in _BASE_PHRASE_RX.finditer(t)}
+    found: List[str] = [k for k in _BASE_PHRASES if k in phrases]
     found.extend(t.split(" ") if t else [])
     # dedup
     out: List[str] = []
@@ -242,7 +291,15 @@ def extract_base_terms(text: str) -> List[str]:
         if x and x not in seen:
             seen.add(x)
             out.append(x)
-    return out
+    return tuple(out)
+
+
+def extract_group_hits(text: str) -> Dict[str, int]:
+    return dict(_group_hits_normalized(normalize_text(text)))
+
+
+def extract_base_terms(text: str) -> List[str]:
+    return list(_base_terms_normalized(normalize_text(text)))
 
 
 # ----------------------------
@@ -356,8 +413,20 @@ def topk(scores: Dict[str, float], k: int = 3) -> List[Tuple[str, float]]:
 
 
 def calculate_percentile(value: Optional[float], raw_pos: str, metric: str = "h") -> int:
+    # metric: "h" / "w" or any player_season_stats column in src.percentiles.
+    # Empirical per-position tables win; Gaussian priors cover h/w without data.
     if value is None:
         return 0
+    try:
+        from src.percentiles import empirical_percentile
+
+        pct = empirical_percentile(value, raw_pos, metric)
+        if pct is not None:
+            return pct
+    except Exception:
+        pass
+    if metric not in ("h", "w"):
+        return 0
     mapped = map_db_to_canonical(raw_pos)
     pos = (mapped[0] if mapped else (raw_pos or "")).upper()
     if pos not in POSITION_SIZE_PRIORS:
@@ -436,6 +505,9 @@ def calibrate_group_size_evidence(
     # Precompute per-position means for delta modeling
     pos_means = calibrate_position_priors(samples)
 
+    # Extract hits once per sample and reuse them for every group.
+    sample_hits = [extract_group_hits(s["text"]) if s.get("text") else {} for s in samples]
+
     group_stats: Dict[str, Dict[str, Any]] = {}
     for gid in TERM_GROUPS.keys():
         hs: List[float] = []
@@ -444,11 +516,7 @@ def calibrate_group_size_evidence(
         deltas_w: List[float] = []
         n = 0
 
-        for s in samples:
-            text = s.get("text", "")
-            if not text:
-                continue
-            hits = extract_group_hits(text)
+        for s, hits in zip(samples, sample_hits, strict=True):
             if gid not in hits:
                 continue
 
@@ -515,47 +583,41 @@ def calibrate_group_size_evidence(
     return group_stats
 
 
-def learn_global_weights_logreg(
-    samples: List[Dict[str, Any]],
-    candidate_positions: Optional[List[str]] = None,
-    max_iter: int = 300,
-) -> Dict[str, Any]:
-    # Learns alpha_semantic and beta_size via logistic regression over two features:
-    #  f1 = semantic_score_only(pos)
-    #  f2 = size_ll_only(pos)
-    #
-    # This is stable and interpretable.
-    #
-    # Requires scikit-learn. If not available, returns defaults.
+def default_weight_positions() -> List[str]:
+    return [p for p in CANONICAL_POSITIONS if p not in ("GUARD", "FORWARD")]
 
-    try:
-        from sklearn.linear_model import LogisticRegression
-    except Exception:
-        return {"alpha_semantic": 1.0, "beta_size": 1.0, "note": "scikit-learn not available"}
 
-    pos_list = candidate_positions or [p for p in CANONICAL_POSITIONS if p not in ("GUARD", "FORWARD")]
+def sample_weight_features(
+    sample: Dict[str, Any],
+    pos_list: List[str],
+) -> Tuple[List[List[float]], List[int]]:
+    # Training rows for one sample: one row per candidate position,
+    #  f1 = semantic_score_only(pos), f2 = size_ll_only(pos),
+    # label 1 if pos == true_position else 0. Empty if the sample is unusable.
+    true_pos = sample.get("true_position")
+    if true_pos not in pos_list:
+        return [], []
+    text = sample.get("text", "")
+    h = sample.get("height_in")
+    w = sample.get("weight_lb")
 
-    X: List[List[float]] = []
-    y: List[int] = []
-    pos_to_idx = {p: i for i, p in enumerate(pos_list)}
+    # score_positions scores every position at once; decompose per position.
+    sem_scores = score_positions(text, None, None, alpha_semantic=1.0, beta_size=0.0)
+    size_scores = score_positions(text, h, w, alpha_semantic=0.0, beta_size=1.0)
+    rows = [[sem_scores.get(p, 0.0), size_scores.get(p, 0.0)] for p in pos_list]
+    labels = [1 if p == true_pos else 0 for p in pos_list]
+    return rows, labels
 
-    # Build training rows: one row per (sample, pos) with label 1 if pos == true_position else 0
-    for s in samples:
-        true_pos = s.get("true_position")
-        if true_pos not in pos_to_idx:
-            continue
-        text = s.get("text", "")
-        h = s.get("height_in")
-        w = s.get("weight_lb")
 
-        # Compute per-position decomposition
-        for p in pos_list:
-            sem = score_positions(text, None, None, alpha_semantic=1.0, beta_size=0.0).get(p, 0.0)
-            size = score_positions(text, h, w, alpha_semantic=0.0, beta_size=1.0).get(p, 0.0)
-            X.append([sem, size])
-            y.append(1 if p == true_pos else 0)
+def fit_global_weights(X: Any, y: Any, max_iter: int = 300) -> Dict[str, Any]:
+    # Fit the [semantic, size] logistic regression on prebuilt features.
+    # X may be a list of rows or a NumPy array.
+    try:
+        from sklearn.linear_model import LogisticRegression
+    except Exception:
+        return {"alpha_semantic": 1.0, "beta_size": 1.0, "note": "scikit-learn not available"}
 
-    if not X:
+    if len(X) == 0:
         return {"alpha_semantic": 1.0, "beta_size": 1.0, "note": "no training rows"}
 
     clf = LogisticRegression(max_iter=max_iter, solver="lbfgs")
@@ -578,6 +640,38 @@ def learn_global_weights_logreg(
     }
 
 
+def learn_global_weights_logreg(
+    samples: List[Dict[str, Any]],
+    candidate_positions: Optional[List[str]] = None,
+    max_iter: int = 300,
+) -> Dict[str, Any]:
+    # Learns alpha_semantic and beta_size via logistic regression over two features:
+    #  f1 = semantic_score_only(pos)
+    #  f2 = size_ll_only(pos)
+    #
+    # This is stable and interpretable.
+    #
+    # Requires scikit-learn. If not available, returns defaults.
+
+    try:
+        import sklearn  # noqa: F401
+    except Exception:
+        return {"alpha_semantic": 1.0, "beta_size": 1.0, "note": "scikit-learn not available"}
+
+    pos_list = candidate_positions or default_weight_positions()
+
+    X: List[List[float]] = []
+    y: List[int] = []
+
+    # Build training rows: one row per (sample, pos) with label 1 if pos == true_position else 0
+    for s in samples:
+        rows, labels = sample_weight_features(s, pos_list)
+        X.extend(rows)
+        y.extend(labels)
+
+    return fit_global_weights(X, y, max_iter=max_iter)
+
+
 # ----------------------------
 # Model bundle I/O
 # ----------------------------
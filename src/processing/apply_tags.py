@@ -1,53 +1,72 @@
+import argparse
 import os
 import sys
-import sqlite3
 
 # Add project root to path so we can import the tagger
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 
-from src.processing.play_tagger import tag_play
+from src.ingestion.db import connect_db, ensure_schema
+from src.processing.play_tagger import mask_tags, tag_plays
 
-DB_PATH = os.path.join(os.getcwd(), "data/skout.db")
+BATCH = 5000
 
-def apply_tags():
+
+def apply_tags(retag_all: bool = False):
+    """Store tags for plays ingested before tagging moved into the pipeline.
+
+    Writes both the display string (plays.tags) and plays.tag_mask; a trigger
+    expands the mask into play_tags. Use retag_all after changing tag_play rules.
+    """
     print("🧠 Starting Smart Tagging Process...")
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect_db()
+    ensure_schema(conn)
     cursor = conn.cursor()
 
-    # 1. Fetch all plays that haven't been tagged yet (or all if you want to re-run)
+    # 1. Walk plays without a stored tag mask (or all of them when re-tagging)
+    # in rowid order, BATCH at a time: memory stays bounded and each batch
+    # commits on its own, so the write lock is never held for the whole backfill.
     # We grab the ID, Description, and Clock
-    cursor.execute("SELECT play_id, description, clock_seconds FROM plays")
-    all_plays = cursor.fetchall()
-    
-    print(f"📦 Processing {len(all_plays)} plays...")
-    
-    updates = []
+    where = "" if retag_all else " AND tag_mask IS NULL"
+    select = (
+        "SELECT rowid, play_id, description, clock_seconds FROM plays"
+        f" WHERE rowid > ?{where} ORDER BY rowid LIMIT ?"
+    )
+
     tagged_count = 0
-    
-    for row in all_plays:
-        p_id, desc, clock = row
-        
-        # Run the Tagger Logic
+    processed = 0
+    labels: dict[int, str] = {}
+    last_rowid = -1
+    while True:
+        rows = cursor.execute(select, (last_rowid, BATCH)).fetchall()
+        if not rows:
+            break
+        last_rowid = rows[-1][0]
         # Ensure clock is an int (it might be None in DB)
-        c_val = int(clock) if clock is not None and str(clock).isdigit() else None
-        
-        tags_list = tag_play(desc, c_val)
-        
-        if tags_list:
-            # Convert list ['3pt', 'missed'] -> string "3pt, missed"
-            tags_str = ", ".join(tags_list)
-            updates.append((tags_str, p_id))
-            tagged_count += 1
-
-    # 2. Bulk Update
-    if updates:
-        print("💾 Saving tags to database...")
-        cursor.executemany("UPDATE plays SET tags = ? WHERE play_id = ?", updates)
+        clocks = [int(c) if c is not None and str(c).isdigit() else None for _, _, _, c in rows]
+        masks = tag_plays([desc for _, _, desc, _ in rows], clocks)
+        updates = []
+        for (_, p_id, _, _), mask in zip(rows, masks, strict=True):
+            mask = int(mask)
+            if mask not in labels:
+                # Convert mask -> sorted tag string "3pt, missed" (same as tag_play order)
+                labels[mask] = ", ".join(sorted(mask_tags(mask)))
+            updates.append((labels[mask], mask, p_id))
+            tagged_count += mask != 0
+
+        # 2. Bulk Update
+        cursor.executemany("UPDATE plays SET tags = ?, tag_mask = ? WHERE play_id = ?", updates)
         conn.commit()
-    
+        processed += len(rows)
+        print(f"📦 Processed {processed} plays...")
+
     conn.close()
     print(f"✅ Successfully tagged {tagged_count} plays.")
     print("   (Example: A play was labeled: '3pt, jumpshot, late_clock, missed')")
+    return tagged_count
+
 
 if __name__ == "__main__":
-    apply_tags()
+    parser = argparse.ArgumentParser(description="Backfill plays.tags / tag_mask / play_tags")
+    parser.add_argument("--all", action="store_true", help="Re-tag every play, not just untagged ones")
+    args = parser.parse_args()
+    apply_tags(retag_all=args.all)
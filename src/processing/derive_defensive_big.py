@@ -2,10 +2,10 @@ from __future__ import annotations
 
 import math
 import sqlite3
-from collections import defaultdict
+from collections.abc import Iterable
 
-from src.processing.play_tagger import tag_play
 from src.ingestion.db import db_path
+from src.processing.trait_engine import TraitAccumulator, register, run_trait_engine
 
 RIM_RADIUS = 4.0  # feet (approx)
 
@@ -20,60 +20,34 @@ def _near_rim(x, y) -> bool:
         return False
 
 
-def _choose_xy_columns(cur: sqlite3.Cursor) -> tuple[str, str]:
-    cur.execute("PRAGMA table_info(plays)")
-    cols = {r[1] for r in cur.fetchall()}
-    if "shotX" in cols and "shotY" in cols:
-        return "shotX", "shotY"
-    if "x_loc" in cols and "y_loc" in cols:
-        return "x_loc", "y_loc"
-    raise RuntimeError("plays table missing both shotX/shotY and x_loc/y_loc coordinate pairs")
-
-
-def build_defensive_big_metrics() -> None:
-    conn = sqlite3.connect(db_path())
-    cur = conn.cursor()
-    x_col, y_col = _choose_xy_columns(cur)
-
-    cur.execute(
-        f"""
-        SELECT play_id, description, {x_col}, {y_col}, d_player_id, r_player_id
-        FROM plays
-        WHERE d_player_id IS NOT NULL OR r_player_id IS NOT NULL
-        """
-    )
-    rows = cur.fetchall()
-
-    if not rows:
-        conn.close()
-        return
-
-    stats = defaultdict(lambda: {
-        "def_events": 0,
-        "block": 0,
-        "rim_contest": 0,
-        "def_reb": 0,
-    })
-
-    for _, desc, x, y, d_pid, r_pid in rows:
-        tags = tag_play(desc or "")
-        missed = "missed" in tags
-        block = "block" in tags
-        rim = _near_rim(x, y)
+@register
+class DefensiveBigAccumulator(TraitAccumulator):
+    """Block / rim contest / defensive rebound rates + defensive_big_index."""
 
+    group = "defensive_big"
+
+    def new_state(self) -> dict:
+        return {
+            "def_events": 0,
+            "block": 0,
+            "rim_contest": 0,
+            "def_reb": 0,
+        }
+
+    def add(self, stats: dict, row: sqlite3.Row, tags: frozenset[str]) -> None:
+        d_pid, r_pid = row["d_player_id"], row["r_player_id"]
         if d_pid:
             s = stats[d_pid]
             s["def_events"] += 1
-            if block:
+            if "block" in tags:
                 s["block"] += 1
-            if rim and missed:
+            if "missed" in tags and _near_rim(row["x"], row["y"]):
                 s["rim_contest"] += 1
 
         if r_pid:
             stats[r_pid]["def_reb"] += 1
 
-    updates = []
-    for pid, s in stats.items():
+    def finalize(self, player_id: str, s: dict) -> dict:
         total = max(1, s["def_events"])
         block_rate = s["block"] / total
         rim_contest_rate = s["rim_contest"] / total
@@ -85,30 +59,17 @@ def build_defensive_big_metrics() -> None:
             + 1.5 * defensive_rebound_rate
         )
 
-        updates.append(
-            (
-                defensive_big,
-                block_rate,
-                rim_contest_rate,
-                defensive_rebound_rate,
-                pid,
-            )
-        )
+        return {
+            "defensive_big_index": defensive_big,
+            "block_rate": block_rate,
+            "rim_contest_rate": rim_contest_rate,
+            "defensive_rebound_rate": defensive_rebound_rate,
+        }
+
 
-    cur.executemany(
-        """
-        UPDATE player_traits
-        SET defensive_big_index = ?,
-            block_rate = ?,
-            rim_contest_rate = ?,
-            defensive_rebound_rate = ?
-        WHERE player_id = ?
-        """,
-        updates,
-    )
-
-    conn.commit()
-    conn.close()
+def build_defensive_big_metrics(game_ids: Iterable[str] | None = None) -> None:
+    """Full rebuild, or fold only `game_ids` into the persisted counters."""
+    run_trait_engine(game_ids, groups=[DefensiveBigAccumulator.group], db_file=db_path(), verbose=False)
 
 
 if __name__ == "__main__":
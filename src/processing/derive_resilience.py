@@ -1,65 +1,43 @@
 from __future__ import annotations
 
 import sqlite3
-from collections import defaultdict
+from collections.abc import Iterable
 
-from src.processing.play_tagger import tag_play
 from src.ingestion.db import db_path
-
-
-def _choose_quarter_column(cur: sqlite3.Cursor) -> str:
-    cur.execute("PRAGMA table_info(plays)")
-    cols = {r[1] for r in cur.fetchall()}
-    if "gameQuarter" in cols:
-        return "gameQuarter"
-    if "period" in cols:
-        return "period"
-    raise RuntimeError("plays table missing both gameQuarter and period columns")
-
-
-def build_resilience_metrics() -> None:
-    conn = sqlite3.connect(db_path())
-    cur = conn.cursor()
-    quarter_col = _choose_quarter_column(cur)
-
-    cur.execute(
-        f"""
-        SELECT player_id, description, {quarter_col}, clock_seconds,
-               short_clock, eob, press, zone, hard_double,
-               home_score, away_score, is_home
-        FROM plays
-        WHERE player_id IS NOT NULL
-        """
-    )
-    rows = cur.fetchall()
-
-    if not rows:
-        conn.close()
-        return
-
-    stats = defaultdict(lambda: {
-        "total": 0,
-        "made": 0,
-        "turnover": 0,
-        "trailing": 0,
-        "trailing_made": 0,
-        "short": 0,
-        "short_made": 0,
-        "eob": 0,
-        "eob_made": 0,
-        "press": 0,
-        "press_success": 0,
-        "zone": 0,
-        "zone_success": 0,
-        "hard": 0,
-        "hard_success": 0,
-        "clutch": 0,
-        "clutch_made": 0,
-    })
-
-    for (player_id, desc, quarter, clock_sec, short_clock, eob, press, zone,
-         hard_double, home_score, away_score, is_home) in rows:
-        tags = tag_play(desc or "")
+from src.processing.trait_engine import TraitAccumulator, register, run_trait_engine
+
+
+@register
+class ResilienceAccumulator(TraitAccumulator):
+    """Make rates when trailing / under pressure / in the clutch + resilience_index."""
+
+    group = "resilience"
+
+    def new_state(self) -> dict:
+        return {
+            "total": 0,
+            "made": 0,
+            "turnover": 0,
+            "trailing": 0,
+            "trailing_made": 0,
+            "short": 0,
+            "short_made": 0,
+            "eob": 0,
+            "eob_made": 0,
+            "press": 0,
+            "press_success": 0,
+            "zone": 0,
+            "zone_success": 0,
+            "hard": 0,
+            "hard_success": 0,
+            "clutch": 0,
+            "clutch_made": 0,
+        }
+
+    def add(self, stats: dict, row: sqlite3.Row, tags: frozenset[str]) -> None:
+        player_id = row["player_id"]
+        if player_id is None:
+            return
         made_or_score = "made" in tags or "score" in tags
         turnover = "turnover" in tags
 
@@ -71,6 +49,7 @@ def build_resilience_metrics() -> None:
             s["turnover"] += 1
 
         # trailing context
+        home_score, away_score, is_home = row["home_score"], row["away_score"], row["is_home"]
         if home_score is not None and away_score is not None and is_home is not None:
             team_score = home_score if is_home else away_score
             opp_score = away_score if is_home else home_score
@@ -79,35 +58,35 @@ def build_resilience_metrics() -> None:
                 if made_or_score:
                     s["trailing_made"] += 1
 
-        if short_clock:
+        if row["short_clock"]:
             s["short"] += 1
             if made_or_score:
                 s["short_made"] += 1
-        if eob:
+        if row["eob"]:
             s["eob"] += 1
             if made_or_score:
                 s["eob_made"] += 1
-        if press:
+        if row["press"]:
             s["press"] += 1
             if made_or_score and not turnover:
                 s["press_success"] += 1
-        if zone:
+        if row["zone"]:
             s["zone"] += 1
             if made_or_score:
                 s["zone_success"] += 1
-        if hard_double:
+        if row["hard_double"]:
             s["hard"] += 1
             if made_or_score:
                 s["hard_success"] += 1
 
         # clutch: 4Q last 2 minutes
-        if quarter == 4 and isinstance(clock_sec, int) and clock_sec <= 120:
+        clock_sec = row["clock_seconds"]
+        if row["quarter"] == 4 and isinstance(clock_sec, int) and clock_sec <= 120:
             s["clutch"] += 1
             if made_or_score:
                 s["clutch_made"] += 1
 
-    updates = []
-    for pid, s in stats.items():
+    def finalize(self, player_id: str, s: dict) -> dict:
         total = max(1, s["total"])
         trailing_make_rate = s["trailing_made"] / max(1, s["trailing"])
         short_clock_make_rate = s["short_made"] / max(1, s["short"])
@@ -129,38 +108,21 @@ def build_resilience_metrics() -> None:
             - 1.5 * turnover_rate
         )
 
-        updates.append(
-            (
-                resilience,
-                trailing_make_rate,
-                short_clock_make_rate,
-                eob_make_rate,
-                press_success_rate,
-                zone_success_rate,
-                hard_double_success_rate,
-                clutch_make_rate,
-                pid,
-            )
-        )
-
-    cur.executemany(
-        """
-        UPDATE player_traits
-        SET resilience_index = ?,
-            trailing_make_rate = ?,
-            short_clock_make_rate = ?,
-            eob_make_rate = ?,
-            press_success_rate = ?,
-            zone_success_rate = ?,
-            hard_double_success_rate = ?,
-            clutch_make_rate = ?
-        WHERE player_id = ?
-        """,
-        updates,
-    )
-
-    conn.commit()
-    conn.close()
+        return {
+            "resilience_index": resilience,
+            "trailing_make_rate": trailing_make_rate,
+            "short_clock_make_rate": short_clock_make_rate,
+            "eob_make_rate": eob_make_rate,
+            "press_success_rate": press_success_rate,
+            "zone_success_rate": zone_success_rate,
+            "hard_double_success_rate": hard_double_success_rate,
+            "clutch_make_rate": clutch_make_rate,
+        }
+
+
+def build_resilience_metrics(game_ids: Iterable[str] | None = None) -> None:
+    """Full rebuild, or fold only `game_ids` into the persisted counters."""
+    run_trait_engine(game_ids, groups=[ResilienceAccumulator.group], db_file=db_path(), verbose=False)
 
 
 if __name__ == "__main__":
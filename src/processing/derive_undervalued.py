@@ -1,56 +1,44 @@
 from __future__ import annotations
 
 import sqlite3
-from collections import defaultdict
+from collections.abc import Iterable
 
-from src.processing.play_tagger import tag_play
 from src.ingestion.db import db_path
+from src.processing.trait_engine import TraitAccumulator, register, run_trait_engine
 
 
-def build_undervalued_metrics() -> None:
-    conn = sqlite3.connect(db_path())
-    cur = conn.cursor()
+@register
+class UndervaluedAccumulator(TraitAccumulator):
+    """High yield on few touches: low_touch / high_yield scores + undervalued_index."""
 
-    cur.execute(
-        """
-        SELECT player_id, description, duration
-        FROM plays
-        WHERE player_id IS NOT NULL
-        """
-    )
-    rows = cur.fetchall()
+    group = "undervalued"
 
-    if not rows:
-        conn.close()
-        return
-
-    stats = defaultdict(lambda: {
-        "total": 0,
-        "made": 0,
-        "assist": 0,
-        "turnover": 0,
-        "duration_sum": 0.0,
-    })
-
-    for player_id, desc, duration in rows:
-        tags = tag_play(desc or "")
-        made_or_score = "made" in tags or "score" in tags
-        turnover = "turnover" in tags
-        assist = "assist" in tags
+    def new_state(self) -> dict:
+        return {
+            "total": 0,
+            "made": 0,
+            "assist": 0,
+            "turnover": 0,
+            "duration_sum": 0.0,
+        }
 
+    def add(self, stats: dict, row: sqlite3.Row, tags: frozenset[str]) -> None:
+        player_id = row["player_id"]
+        if player_id is None:
+            return
         s = stats[player_id]
         s["total"] += 1
-        if made_or_score:
+        if "made" in tags or "score" in tags:
             s["made"] += 1
-        if assist:
+        if "assist" in tags:
             s["assist"] += 1
-        if turnover:
+        if "turnover" in tags:
             s["turnover"] += 1
+        duration = row["duration"]
         if duration:
             s["duration_sum"] += float(duration)
 
-    updates = []
-    for pid, s in stats.items():
+    def finalize(self, player_id: str, s: dict) -> dict:
         total = max(1, s["total"])
         make_rate = s["made"] / total
         assist_rate = s["assist"] / total
@@ -67,30 +55,17 @@ def build_undervalued_metrics() -> None:
             - 1.8 * low_usage_turnover_rate
         )
 
-        updates.append(
-            (
-                undervalued,
-                low_touch,
-                high_yield,
-                low_usage_turnover_rate,
-                pid,
-            )
-        )
+        return {
+            "undervalued_index": undervalued,
+            "low_touch_score": low_touch,
+            "high_yield_score": high_yield,
+            "low_usage_turnover_rate": low_usage_turnover_rate,
+        }
 
-    cur.executemany(
-        """
-        UPDATE player_traits
-        SET undervalued_index = ?,
-            low_touch_score = ?,
-            high_yield_score = ?,
-            low_usage_turnover_rate = ?
-        WHERE player_id = ?
-        """,
-        updates,
-    )
 
-    conn.commit()
-    conn.close()
+def build_undervalued_metrics(game_ids: Iterable[str] | None = None) -> None:
+    """Full rebuild, or fold only `game_ids` into the persisted counters."""
+    run_trait_engine(game_ids, groups=[UndervaluedAccumulator.group], db_file=db_path(), verbose=False)
 
 
 if __name__ == "__main__":
@@ -1,14 +1,12 @@
-import os
-import sqlite3
 from pathlib import Path
 
 import chromadb
 from tqdm import tqdm
 
+from src.ingestion.db import connect_db
 from src.search.semantic import get_embedder
 
 REPO_ROOT = Path(__file__).resolve().parents[2]
-DB_PATH = REPO_ROOT / "data" / "skout.db"
 VECTOR_DB_PATH = REPO_ROOT / "data" / "vector_db"
 
 
@@ -22,7 +20,7 @@ def generate_embeddings():
     collection = client.get_or_create_collection(name="skout_plays")
 
     # Fetch Data
-    conn = sqlite3.connect(str(DB_PATH))
+    conn = connect_db()
     cursor = conn.cursor()
     cursor.execute("SELECT play_id, description, tags, game_id, clock_display, player_id, player_name FROM plays")
     rows = cursor.fetchall()
@@ -64,6 +62,7 @@ def generate_embeddings():
 
     print(f"✅ Successfully indexed {len(rows)} plays.")
     print("   The system is now ready for Semantic Search.")
+    return len(rows)
 
 
 if __name__ == "__main__":
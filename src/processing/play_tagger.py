@@ -1,3 +1,42 @@
+from collections.abc import Iterable
+from functools import lru_cache
+
+# Integer tag dictionary. A tag's id is its position here and is persisted
+# (plays.tag_mask bit, tag_dictionary / play_tags rows): only ever append.
+TAGS = (
+    "pnr", "iso", "handoff", "post_up", "drive", "cut", "rim_pressure", "pull_up",
+    "3pt", "jumpshot", "dunk", "rim_finish", "layup",
+    "non_possession", "made", "score", "missed", "assist", "ft",
+    "turnover", "live_ball_turnover", "steal", "rebound", "oreb", "dreb",
+    "foul", "charge_taken", "block", "rim_protection", "deflection", "loose_ball",
+    "transition", "late_clock", "buzzer_beater_scenario",
+)
+TAG_IDS = {name: i for i, name in enumerate(TAGS)}
+
+
+def tag_mask(tags: Iterable[str]) -> int:
+    """Bitmask of tags (bit i = TAGS[i]); unknown tags are ignored."""
+    mask = 0
+    for t in tags:
+        i = TAG_IDS.get(t)
+        if i is not None:
+            mask |= 1 << i
+    return mask
+
+
+@lru_cache(maxsize=4096)
+def mask_tags(mask: int) -> frozenset[str]:
+    """Inverse of tag_mask. Cached: real plays only use a few hundred distinct masks."""
+    return frozenset(name for i, name in enumerate(TAGS) if mask >> i & 1)
+
+
+def stored_tags(mask: int | None, description: str | None, clock: int | str | None = None) -> frozenset[str]:
+    """Tags of a plays row: the stored tag_mask, or tag_play() for rows not yet tagged."""
+    if mask is not None:
+        return mask_tags(mask)
+    return frozenset(tag_play(description or "", clock))
+
+
 def _parse_clock_to_seconds(clock: int | str | None) -> int | None:
     if clock is None:
         return None
@@ -18,13 +57,9 @@ def _parse_clock_to_seconds(clock: int | str | None) -> int | None:
     return None
 
 
-def tag_play(description: str, clock: int | str | None = None) -> list[str]:
-    """
-    Analyzes a play description and game clock to assign tactical tags.
-    """
+def _text_tags(desc: str) -> set[str]:
+    """Tags implied by a lower-cased description (everything except the clock tags)."""
     tags = set()
-    desc = (description or "").lower()
-    clock_seconds = _parse_clock_to_seconds(clock)
 
     # --- OFFENSIVE ACTIONS ---
     if "screen" in desc or "pick" in desc or "p&r" in desc:
@@ -120,6 +155,16 @@ def tag_play(description: str, clock: int | str | None = None) -> list[str]:
     if "fast break" in desc or "transition" in desc:
         tags.add("transition")
     
+    return tags
+
+
+def tag_play(description: str, clock: int | str | None = None) -> list[str]:
+    """
+    Analyzes a play description and game clock to assign tactical tags.
+    """
+    tags = _text_tags((description or "").lower())
+    clock_seconds = _parse_clock_to_seconds(clock)
+
     # --- CLOCK SITUATIONS ---
     # Assuming clock_seconds is seconds remaining in the period
     if clock_seconds is not None:
@@ -129,3 +174,66 @@ def tag_play(description: str, clock: int | str | None = None) -> list[str]:
             tags.add("buzzer_beater_scenario")
 
     return sorted(list(tags))
+
+
+@lru_cache(maxsize=65536)
+def description_mask(description: str) -> int:
+    """tag_mask of the description-only tags (no clock tags). Cached: descriptions repeat across games."""
+    return tag_mask(_text_tags(description.lower()))
+
+
+_LATE_CLOCK = 1 << TAG_IDS["late_clock"]
+_BUZZER = 1 << TAG_IDS["buzzer_beater_scenario"]
+
+
+def clock_mask(clock_seconds: int | None) -> int:
+    """Clock-situation bits of tag_play for seconds remaining in the period."""
+    if clock_seconds is None or clock_seconds <= 0 or clock_seconds > 5:
+        return 0
+    return _LATE_CLOCK | (_BUZZER if clock_seconds <= 2 else 0)
+
+
+def tag_plays(descriptions: Iterable[str | None], clocks: Iterable[int | str | None] | None = None):
+    """Batch tag_play: an int64 array of tag masks (bit i = TAGS[i]), one per description.
+
+    Play descriptions repeat heavily (Synergy taxonomy strings, clock values), so
+    each distinct description and clock is evaluated once and the results are
+    broadcast back with NumPy; the clock tags are plain array comparisons.
+    mask_tags(int(m)) gives exactly set(tag_play(d, c)); see tag_matrix() for a
+    boolean (n, len(TAGS)) view.
+    """
+    import numpy as np
+    import pandas as pd
+
+    codes, uniques = pd.factorize(pd.Series(list(descriptions), dtype=object))
+    # One extra slot so missing descriptions (code -1) map to an empty mask.
+    text = np.zeros(len(uniques) + 1, dtype=np.int64)
+    for i, desc in enumerate(uniques):
+        text[i] = description_mask(str(desc))
+    masks = text[codes]
+
+    if clocks is None:
+        return masks
+
+    ccodes, cuniques = pd.factorize(pd.Series(list(clocks), dtype=object))
+    if len(ccodes) != len(masks):
+        raise ValueError("descriptions and clocks must have the same length")
+    secs = np.full(len(cuniques) + 1, -1, dtype=np.int64)
+    for i, clock in enumerate(cuniques):
+        if isinstance(clock, np.integer):
+            clock = int(clock)
+        parsed = _parse_clock_to_seconds(clock)
+        if parsed is not None:
+            secs[i] = parsed
+    secs = secs[ccodes]
+    masks |= ((secs > 0) & (secs <= 5)).astype(np.int64) << TAG_IDS["late_clock"]
+    masks |= ((secs > 0) & (secs <= 2)).astype(np.int64) << TAG_IDS["buzzer_beater_scenario"]
+    return masks
+
+
+def tag_matrix(masks):
+    """Boolean matrix (len(masks), len(TAGS)) from tag_plays() masks; column i is TAGS[i]."""
+    import numpy as np
+
+    masks = np.asarray(masks, dtype=np.int64)
+    return ((masks[:, None] >> np.arange(len(TAGS), dtype=np.int64)) & 1).astype(bool)
@@ -0,0 +1,222 @@
+"""Single-pass trait engine.
+
+The derive_* modules each register a TraitAccumulator. run_trait_engine()
+streams `plays` once, reads each play's stored tag_mask (batch-tagging the text
+only for rows ingested before tag masks existed), feeds each registered accumulator,
+persists their counters (see trait_state) and writes every player_traits column
+in one batched transaction. Per-metric timings are returned and printed.
+
+    run_trait_engine()                     # full rebuild, all metrics
+    run_trait_engine(game_ids=new_games)   # fold newly ingested games only
+    run_trait_engine(groups=["clutch"])    # a single metric
+"""
+
+from __future__ import annotations
+
+import importlib
+import sqlite3
+import time
+from collections import defaultdict
+from collections.abc import Iterable
+from typing import Any
+
+from src.ingestion.db import db_path, ensure_schema, upsert_sql
+from src.processing.play_tagger import mask_tags, tag_plays
+from src.processing.trait_state import TraitScope
+
+# Modules that register accumulators, in write order: when two metrics write the
+# same column (clutch_make_rate) the later one wins, as with the old scripts.
+ACCUMULATOR_MODULES = [
+    "src.processing.derive_player_traits",
+    "src.processing.derive_leadership",
+    "src.processing.derive_resilience",
+    "src.processing.derive_defensive_big",
+    "src.processing.derive_clutch",
+    "src.processing.derive_undervalued",
+]
+
+FETCH_SIZE = 5000
+
+_REGISTRY: dict[str, type[TraitAccumulator]] = {}
+
+
+class TraitAccumulator:
+    """One metric group: per-player counters over plays -> player_traits columns.
+
+    group         name used for persisted state and timings
+    creates_rows  True if this metric inserts player_traits rows; others only
+                  update rows that already exist
+    """
+
+    group: str = ""
+    creates_rows: bool = False
+
+    def prepare(self, conn: sqlite3.Connection) -> None:
+        """Load any lookup data finalize() needs (runs once per engine run)."""
+
+    def new_state(self) -> dict:
+        raise NotImplementedError
+
+    def add(self, stats: dict, row: sqlite3.Row, tags: frozenset[str]) -> None:
+        """Fold one play into stats (a defaultdict of new_state())."""
+        raise NotImplementedError
+
+    def finalize(self, player_id: str, s: dict) -> dict[str, Any]:
+        """player_traits column values for one player's counters."""
+        raise NotImplementedError
+
+
+def register(cls: type[TraitAccumulator]) -> type[TraitAccumulator]:
+    _REGISTRY[cls.group] = cls
+    return cls
+
+
+def registry() -> dict[str, type[TraitAccumulator]]:
+    for mod in ACCUMULATOR_MODULES:
+        importlib.import_module(mod)
+    return dict(_REGISTRY)
+
+
+def _plays_select(cur: sqlite3.Cursor) -> str:
+    cur.execute("PRAGMA table_info(plays)")
+    cols = {r[1] for r in cur.fetchall()}
+    if "gameQuarter" in cols:
+        quarter = "gameQuarter"
+    elif "period" in cols:
+        quarter = "period"
+    else:
+        raise RuntimeError("plays table missing both gameQuarter and period columns")
+    if "shotX" in cols and "shotY" in cols:
+        x, y = "shotX", "shotY"
+    elif "x_loc" in cols and "y_loc" in cols:
+        x, y = "x_loc", "y_loc"
+    else:
+        raise RuntimeError("plays table missing both shotX/shotY and x_loc/y_loc coordinate pairs")
+    return f"""
+        SELECT play_id, game_id, player_id, player_name, description,
+               {quarter} AS quarter, clock_seconds, {x} AS x, {y} AS y,
+               ato, short_clock, eob, heave, press, zone, hard_double,
+               assist_player_id, d_player_id, r_player_id, duration,
+               home_score, away_score, is_home, tag_mask
+        FROM plays
+    """
+
+
+def _write_traits(conn: sqlite3.Connection, columns: dict[str, dict], creates: set[str]) -> int:
+    """Batch rows by (insert-or-update, column set) and write them in one transaction."""
+    batches: dict[tuple[bool, tuple[str, ...]], list[tuple]] = defaultdict(list)
+    for pid, cols in columns.items():
+        names = tuple(cols)
+        batches[(pid in creates, names)].append((pid, *(cols[c] for c in names)))
+
+    cur = conn.cursor()
+    for (create, names), rows in batches.items():
+        if create:
+            sql = upsert_sql("player_traits", ["player_id", *names], key=["player_id"])
+        else:
+            sets = ", ".join(f"{c} = ?" for c in names)
+            sql = f"UPDATE player_traits SET {sets} WHERE player_id = ?"
+            rows = [(*r[1:], r[0]) for r in rows]
+        cur.executemany(sql, rows)
+    return len(columns)
+
+
+def run_trait_engine(
+    game_ids: Iterable[str] | None = None,
+    groups: Iterable[str] | None = None,
+    db_file: str | None = None,
+    verbose: bool = True,
+    incremental: bool = False,
+) -> dict:
+    """Derive trait columns in one pass over plays. Returns row counts and timings.
+
+    With game_ids or incremental=True, only games not yet folded into each
+    group are read (game_ids narrows that set); otherwise every group is rebuilt.
+    """
+    reg = registry()
+    names = list(groups) if groups is not None else list(reg)
+    unknown = [g for g in names if g not in reg]
+    if unknown:
+        raise ValueError(f"Unknown trait groups: {unknown}")
+    game_ids = None if game_ids is None else list(game_ids)
+    full = game_ids is None and not incremental
+
+    timings: dict[str, float] = defaultdict(float)
+    t_start = time.perf_counter()
+    conn = sqlite3.connect(db_file or db_path())
+    try:
+        conn.row_factory = sqlite3.Row
+        ensure_schema(conn)
+        cur = conn.cursor()
+
+        feeds = []
+        for name in names:
+            scope = TraitScope(conn, name, game_ids, full=full)
+            if scope.empty:
+                continue
+            acc = reg[name]()
+            games = None if scope.full else set(scope.games)
+            feeds.append((acc, scope, defaultdict(acc.new_state), games))
+
+        if not feeds:
+            return {"plays": 0, "players": 0, "timings": {}}
+
+        # One scan covering every group's scope.
+        if any(scope.full for _, scope, _, _ in feeds):
+            where = "1"
+        else:
+            where = " OR ".join(f"({scope.plays_filter()})" for _, scope, _, _ in feeds)
+        cur.execute(_plays_select(cur) + f" WHERE {where}")
+
+        plays = 0
+        perf = time.perf_counter
+        while True:
+            t0 = perf()
+            rows = cur.fetchmany(FETCH_SIZE)
+            timings["scan"] += perf() - t0
+            if not rows:
+                break
+            t0 = perf()
+            masks = [row["tag_mask"] for row in rows]
+            untagged = [i for i, m in enumerate(masks) if m is None]
+            if untagged:
+                # Rows ingested before tag masks existed: tag the whole batch at once.
+                for i, m in zip(untagged, tag_plays([rows[i]["description"] for i in untagged]).tolist(), strict=True):
+                    masks[i] = m
+            timings["tag"] += perf() - t0
+            for row, mask in zip(rows, masks, strict=True):
+                plays += 1
+                tags = mask_tags(mask)
+                gid = row["game_id"]
+                for acc, _, stats, games in feeds:
+                    if games is not None and gid not in games:
+                        continue
+                    t0 = perf()
+                    acc.add(stats, row, tags)
+                    timings[acc.group] += perf() - t0
+
+        columns: dict[str, dict] = {}
+        creates: set[str] = set()
+        for acc, scope, stats, _ in feeds:
+            t0 = perf()
+            acc.prepare(conn)
+            merged = scope.commit(stats)
+            for pid, s in merged.items():
+                columns.setdefault(pid, {}).update(acc.finalize(pid, s))
+                if acc.creates_rows:
+                    creates.add(pid)
+            timings[acc.group] += perf() - t0
+
+        t0 = perf()
+        players = _write_traits(conn, columns, creates)
+        conn.commit()
+    finally:
+        conn.close()
+    timings["write"] = perf() - t0
+    timings["total"] = perf() - t_start
+
+    result = {"plays": plays, "players": players, "timings": dict(timings)}
+    if verbose:
+        detail = ", ".join(f"{k}={v:.2f}s" for k, v in result["timings"].items())
+        print(f"✅ player_traits updated for {players} players from {plays} plays ({detail})")
+    return result
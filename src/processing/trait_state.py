@@ -0,0 +1,186 @@
+"""Persisted per-player accumulators for incremental trait derivation.
+
+Every derive_* module aggregates plays into per-player counters and then turns
+those counters into indices. Counters are plain sums, so they can be stored and
+extended: folding a newly ingested game adds its plays' contributions to the
+stored counters and only the players it touched need their indices rewritten.
+
+Each metric group keeps
+    trait_accumulators(group_name, player_id, state_json)   the counters
+    trait_folded_games(group_name, game_id)                 games already counted
+Events of a finished game are fetched once (see the ingest ledger), so a game is
+folded exactly once and incremental results match a full rebuild. An
+incremental run folds every game in `plays` that is not yet in
+trait_folded_games, so games whose fold failed (or that another script wrote)
+are caught up by the next run rather than missed for good.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+from collections.abc import Iterable
+
+
+def ensure_state_tables(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS trait_accumulators (
+            group_name TEXT NOT NULL,
+            player_id TEXT NOT NULL,
+            state_json TEXT,
+            PRIMARY KEY (group_name, player_id)
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS trait_folded_games (
+            group_name TEXT NOT NULL,
+            game_id TEXT NOT NULL,
+            PRIMARY KEY (group_name, game_id)
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_plays_game_id ON plays(game_id)")
+
+
+def merge_counts(dst: dict, src: dict) -> dict:
+    """Add src's counters into dst (nested dicts recurse, non-numbers keep the first value)."""
+    for key, val in src.items():
+        cur = dst.get(key)
+        if isinstance(val, dict):
+            dst[key] = merge_counts(dict(cur) if isinstance(cur, dict) else {}, val)
+        elif isinstance(val, (int, float)) and not isinstance(val, bool):
+            dst[key] = (cur or 0) + val
+        elif cur is None:
+            dst[key] = val
+    return dst
+
+
+class TraitScope:
+    """Which plays a derive_* run has to read, and how its counters are persisted.
+
+    full=True (or a group that was never built) means a full rebuild; otherwise
+    the scope is every game in `plays` not yet folded into this group, narrowed
+    to game_ids when given.
+    """
+
+    def __init__(
+        self,
+        conn: sqlite3.Connection,
+        group: str,
+        game_ids: Iterable[str] | None = None,
+        full: bool = False,
+    ):
+        self.conn = conn
+        self.group = group
+        ensure_state_tables(conn)
+
+        built = conn.execute(
+            "SELECT 1 FROM trait_folded_games WHERE group_name = ? LIMIT 1", (group,)
+        ).fetchone()
+        self.full = full or built is None
+        self.games: list[str] = []
+        if not self.full:
+            tbl = self.table
+            conn.execute(f"CREATE TEMP TABLE IF NOT EXISTS {tbl} (game_id TEXT PRIMARY KEY)")
+            conn.execute(f"DELETE FROM {tbl}")
+            conn.execute(
+                f"""
+                INSERT INTO {tbl} SELECT DISTINCT game_id FROM plays
+                WHERE game_id IS NOT NULL AND game_id NOT IN
+                    (SELECT game_id FROM trait_folded_games WHERE group_name = ?)
+                """,
+                (group,),
+            )
+            self.games = [r[0] for r in conn.execute(f"SELECT game_id FROM {tbl}")]
+            if game_ids is not None:
+                wanted = {str(g) for g in game_ids if g}
+                drop = [g for g in self.games if g not in wanted]
+                conn.executemany(f"DELETE FROM {tbl} WHERE game_id = ?", [(g,) for g in drop])
+                self.games = [g for g in self.games if g in wanted]
+
+    @property
+    def table(self) -> str:
+        """Temp table holding this group's unfolded games (one per group, so scopes can coexist)."""
+        return f"_trait_scope_{self.group}"
+
+    @property
+    def empty(self) -> bool:
+        return not self.full and not self.games
+
+    def plays_filter(self) -> str:
+        """SQL condition restricting `plays` to this scope (AND it into the WHERE)."""
+        if self.full:
+            return "1"
+        return f"game_id IN (SELECT game_id FROM temp.{self.table})"
+
+    def dirty_players(self) -> set[str]:
+        """Every player appearing (in any role) in the scoped plays."""
+        cur = self.conn.execute(
+            f"""
+            SELECT player_id FROM plays WHERE {self.plays_filter()}
+            UNION SELECT assist_player_id FROM plays WHERE {self.plays_filter()}
+            UNION SELECT d_player_id FROM plays WHERE {self.plays_filter()}
+            UNION SELECT r_player_id FROM plays WHERE {self.plays_filter()}
+            """
+        )
+        return {r[0] for r in cur.fetchall() if r[0] is not None}
+
+    def commit(self, deltas: dict) -> dict:
+        """Persist counters; returns the counters of every player to rewrite.
+
+        That is every player in `deltas` plus every dirty player this group
+        already has counters for: several groups write the same player_traits
+        column (clutch_make_rate), and re-finalizing all dirty players keeps the
+        last-writer-wins result identical to a full rebuild.
+
+        Runs inside the caller's transaction, so counters, folded games and the
+        caller's player_traits writes commit (or roll back) together.
+        """
+        conn = self.conn
+        if self.full:
+            conn.execute("DELETE FROM trait_accumulators WHERE group_name = ?", (self.group,))
+            conn.execute("DELETE FROM trait_folded_games WHERE group_name = ?", (self.group,))
+            merged = {pid: dict(s) for pid, s in deltas.items()}
+            conn.execute(
+                "INSERT OR IGNORE INTO trait_folded_games (group_name, game_id) "
+                "SELECT DISTINCT ?, game_id FROM plays WHERE game_id IS NOT NULL",
+                (self.group,),
+            )
+        else:
+            merged = self._load(list(set(deltas) | self.dirty_players()))
+            for pid, delta in deltas.items():
+                merged[pid] = merge_counts(merged.get(pid, {}), delta)
+            conn.executemany(
+                "INSERT OR IGNORE INTO trait_folded_games (group_name, game_id) VALUES (?, ?)",
+                [(self.group, g) for g in self.games],
+            )
+
+        changed = merged if self.full else deltas
+        conn.executemany(
+            """
+            INSERT INTO trait_accumulators (group_name, player_id, state_json) VALUES (?, ?, ?)
+            ON CONFLICT(group_name, player_id) DO UPDATE SET state_json = excluded.state_json
+            """,
+            [(self.group, pid, json.dumps(merged[pid], separators=(",", ":"))) for pid in changed],
+        )
+        return merged
+
+    def _load(self, player_ids: list[str]) -> dict:
+        out: dict = {}
+        for i in range(0, len(player_ids), 500):
+            chunk = player_ids[i : i + 500]
+            marks = ",".join("?" for _ in chunk)
+            rows = self.conn.execute(
+                f"SELECT player_id, state_json FROM trait_accumulators "
+                f"WHERE group_name = ? AND player_id IN ({marks})",
+                (self.group, *chunk),
+            )
+            for pid, raw in rows:
+                try:
+                    out[pid] = json.loads(raw) if raw else {}
+                except ValueError:
+                    out[pid] = {}
+        return out
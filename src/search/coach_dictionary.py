@@ -592,6 +592,21 @@ def _semantic_expand(query: str, top_k: int = 8, min_score: float = 0.48) -> set
         phrases.extend(items)
     phrases = list(dict.fromkeys(phrases))
 
+    # Fast path: phrase embeddings from the prebuilt constant bundle, query
+    # encoded by the shared search embedder (no per-process phrase encoding).
+    from src.search.constant_embeddings import lookup_many
+
+    phrase_matrix = lookup_many(phrases)
+    if phrase_matrix is not None:
+        import numpy as np
+
+        from src.search.semantic import get_embedder
+
+        q_vec = np.asarray(get_embedder().encode([query], normalize_embeddings=True)[0], dtype=np.float32)
+        scores = np.asarray(phrase_matrix) @ q_vec
+        top_idx = np.argsort(-scores)[: min(top_k, len(phrases))]
+        return {phrases[i] for i in top_idx if float(scores[i]) >= min_score}
+
     if _PHRASE_EMBEDS is None:
         model = SentenceTransformer("all-MiniLM-L6-v2")
         _PHRASE_EMBEDS = (model, model.encode(phrases, convert_to_tensor=True))
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from functools import lru_cache
+
+BUNDLE_VERSION = 1
+_REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+# Shipped next to position_model.json: a float32 matrix plus a JSON manifest.
+BUNDLE_NPY = os.path.join(_REPO_ROOT, "constant_embeddings.npy")
+BUNDLE_MANIFEST = os.path.join(_REPO_ROOT, "constant_embeddings.json")
+
+
+def constant_texts() -> dict[str, list[str]]:
+    """Every fixed string the search stack embeds, grouped by source.
+
+    Concept definitions are stored in the form encode_query() sees them
+    (after query normalization); coach phrases are stored raw.
+    """
+    from src.concepts import CONCEPT_DEFINITIONS
+    from src.search.coach_dictionary import PHRASES
+    from src.search.semantic import _normalize_query
+
+    phrases: list[str] = []
+    for items in PHRASES.values():
+        phrases.extend(items)
+    return {
+        "concepts": list(dict.fromkeys(_normalize_query(t) for t in CONCEPT_DEFINITIONS.values())),
+        "coach_phrases": list(dict.fromkeys(phrases)),
+    }
+
+
+def _texts_sha(texts: list[str]) -> str:
+    return hashlib.sha256("\n".join(texts).encode("utf-8")).hexdigest()
+
+
+def build_bundle(batch_size: int = 64) -> int:
+    """Encode every constant text once and write the versioned bundle. Returns row count."""
+    import numpy as np
+
+    from src.search.semantic import EMBED_MODEL_NAME, get_embedder
+
+    groups = constant_texts()
+    texts = list(dict.fromkeys(t for items in groups.values() for t in items if t))
+    model = get_embedder()
+    vecs = model.encode(texts, batch_size=batch_size, normalize_embeddings=True)
+    matrix = np.asarray(vecs, dtype=np.float32)
+
+    # Temp file + rename: a process loading the bundle never sees half a file.
+    tmp = f"{BUNDLE_NPY}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, matrix)
+    os.replace(tmp, BUNDLE_NPY)
+    manifest = {
+        "version": BUNDLE_VERSION,
+        "model": EMBED_MODEL_NAME,
+        "dim": int(matrix.shape[1]) if matrix.ndim == 2 else 0,
+        "texts_sha256": _texts_sha(texts),
+        "texts": texts,
+        "groups": {name: len(items) for name, items in groups.items()},
+    }
+    tmp = f"{BUNDLE_MANIFEST}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, BUNDLE_MANIFEST)
+    _load_bundle.cache_clear()
+    return len(texts)
+
+
+@lru_cache(maxsize=1)
+def ensure_bundle() -> bool:
+    """Build the bundle if it is missing, stale or lacks a current constant text.
+
+    Runs once per process (the dashboard calls it at startup), so a fresh
+    checkout pays the encoding cost once instead of on every process start.
+    Returns True if every constant text is served from the bundle.
+    """
+    texts = [t for items in constant_texts().values() for t in items if t]
+    if lookup_many(texts) is not None:
+        return True
+    try:
+        build_bundle()
+    except Exception as e:
+        print(f"⚠️ Could not build constant embeddings ({e}); encoding at runtime")
+        return False
+    return lookup_many(texts) is not None
+
+
+@lru_cache(maxsize=1)
+def _load_bundle():
+    """(text -> row index, matrix) or None if the bundle is missing or stale."""
+    try:
+        import numpy as np
+
+        from src.search.semantic import EMBED_MODEL_NAME
+
+        with open(BUNDLE_MANIFEST, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") != BUNDLE_VERSION or manifest.get("model") != EMBED_MODEL_NAME:
+            return None
+        texts = manifest.get("texts") or []
+        matrix = np.load(BUNDLE_NPY, mmap_mode="r")
+        if len(texts) != matrix.shape[0]:
+            return None
+        return {t: i for i, t in enumerate(texts)}, matrix
+    except Exception:
+        return None
+
+
+def lookup(text: str):
+    """Precomputed (normalized) embedding for a constant text, or None."""
+    bundle = _load_bundle()
+    if bundle is None:
+        return None
+    index, matrix = bundle
+    row = index.get(text)
+    return None if row is None else matrix[row]
+
+
+def lookup_many(texts: list[str]):
+    """Stacked embeddings for all texts, or None if any text is not in the bundle."""
+    bundle = _load_bundle()
+    if bundle is None:
+        return None
+    index, matrix = bundle
+    rows = [index.get(t) for t in texts]
+    if any(r is None for r in rows):
+        return None
+    return matrix[rows]
+
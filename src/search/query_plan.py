@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
+
+from src.search.semantic import (
+    _expand_synonyms_for_embedding,
+    _load_position_weights,
+    _normalize_query,
+    _tokenize,
+    expand_query_terms,
+)
+
+_NUMERIC_FILTER_RE = re.compile(
+    r"\b(over|under|above|below|at least|atleast|at most|atmost|more than|less than)\s+(\d+(?:\.\d+)?)%?\s*(3pt|3pt%|3pt\s*%|three|three point|three-point|ft|free throw|free-throw|fg|field goal|field-goal|shot)\b"
+)
+
+
+def infer_size_intents(q: str) -> dict:
+    """Extract size/physical development intents from the query."""
+    ql = (q or "").lower()
+
+    # explicit height tokens like 6'8, 6-8, 6 8, 7 footer
+    height_min = None
+    height_max = None
+    m = re.search(r"(\d)\s*['-]?\s*(\d{1,2})\s*(?:\"|in)?", ql)
+    if m:
+        ft = int(m.group(1))
+        inch = int(m.group(2))
+        h = ft * 12 + inch
+        height_min = h - 1
+        height_max = h + 2
+
+    if any(k in ql for k in ["tall", "long", "length", "rangy", "wingspan", "big wingspan"]):
+        height_min = max(height_min or 0, 77)  # ~6'5+
+
+    growth = any(k in ql for k in ["room to grow", "upside", "project", "raw", "high ceiling", "frame to add", "fill out"])
+
+    # position-relative cues
+    wants_big = any(k in ql for k in ["big man", "rim protector", "post", "paint", "center"])
+    wants_guard = any(k in ql for k in ["point guard", "pg", "guard", "ball handler"])
+    wants_forward = any(k in ql for k in ["forward", "sf", "pf", "wing", "3-and-d"])
+
+    # soft thresholds (applied only when query implies size)
+    if wants_big:
+        height_min = max(height_min or 0, 79)  # 6'7+
+    if wants_guard and any(k in ql for k in ["tall", "big", "long"]):
+        height_min = max(height_min or 0, 75)  # 6'3+
+    if wants_forward:
+        height_min = max(height_min or 0, 76)  # 6'4+
+
+    return {
+        "height_min": height_min,
+        "height_max": height_max,
+        "growth": growth,
+        "skinny": any(k in ql for k in ["skinny", "lean", "lanky", "thin"]),
+        "strong": any(k in ql for k in ["strong", "physical", "powerful", "burly", "thick"]),
+    }
+
+
+def infer_role_hints(q: str) -> set[str]:
+    """Extract role hints (guard/wing/big) with robust synonym coverage."""
+    ql = (q or "").lower()
+    hints: set[str] = set()
+
+    wing_terms = [
+        "forward", "sf", "small forward", "pf", "power forward", "wing", "3-and-d", "three and d", "combo forward"
+    ]
+    guard_terms = [
+        "guard", "pg", "point guard", "sg", "shooting guard", "combo guard", "lead guard"
+    ]
+    big_terms = [
+        "center", "big man", "rim protector", "post", "paint", "big", "five", "4/5", "4-5"
+    ]
+    if any(k in ql for k in wing_terms):
+        hints.add("wing")
+    if any(k in ql for k in guard_terms):
+        hints.add("guard")
+    if any(k in ql for k in big_terms):
+        hints.add("big")
+
+    # common abbreviations like 'c' as a token
+    toks = re.findall(r"[a-z0-9']+", ql)
+    if "c" in toks:
+        hints.add("big")
+    if "f" in toks and "g" not in toks:
+        hints.add("wing")
+    if "g" in toks and "f" not in toks:
+        hints.add("guard")
+
+    return hints
+
+
+def expand_query_synonyms(q: str) -> list[str]:
+    """Advanced synonym expansion to improve recall when semantic search under-fires."""
+    ql = (q or "").lower()
+    synonyms: list[str] = []
+
+    mapping = {
+        "shoot 3": ["three point", "3pt", "shot3", "spacing", "stretch"],
+        "can shoot": ["three point", "catch and shoot", "spot up"],
+        "rim protector": ["block", "paint", "anchor", "drop coverage"],
+        "room to grow": ["upside", "project", "frame", "fill out"],
+        "big": ["size", "physical", "strong"],
+        "tall": ["length", "long", "rangy"],
+        "clutch": ["late game", "pressure", "close game"],
+        "playmaker": ["passer", "creator", "ball handler"],
+    }
+    for k, vs in mapping.items():
+        if k in ql:
+            synonyms.extend(vs)
+    return synonyms
+
+
+@dataclass(frozen=True)
+class QueryPlan:
+    """Everything the search stack derives from a query string, computed once.
+
+    Each analysis is lazy, so callers that only need the cheap parts (e.g.
+    semantic_search) never pay for intent inference. Plans are shared across
+    sessions through get_query_plan; treat the returned collections as read-only.
+    """
+
+    query: str
+    alpha_semantic: float = 1.0
+    beta_size: float = 1.0
+
+    @cached_property
+    def lowered(self) -> str:
+        return (self.query or "").lower()
+
+    @cached_property
+    def normalized(self) -> str:
+        return _normalize_query(self.query)
+
+    @cached_property
+    def tokens(self) -> frozenset[str]:
+        return frozenset(_tokenize(self.query))
+
+    @cached_property
+    def logic(self) -> str:
+        q = self.lowered
+        if " or " in q:
+            return "or"
+        if " and " in q or " but " in q:
+            return "and"
+        return "single"
+
+    @cached_property
+    def parts(self) -> tuple[str, ...]:
+        q = self.lowered
+        if self.logic == "or":
+            return tuple(p.strip() for p in q.split(" or ") if p.strip())
+        if self.logic == "and":
+            return tuple(p.strip() for p in q.replace(" but ", " and ").split(" and ") if p.strip())
+        return (q,)
+
+    @cached_property
+    def numeric_filters(self) -> tuple[tuple[str, float, str], ...]:
+        return tuple((m.group(1), float(m.group(2)), m.group(3)) for m in _NUMERIC_FILTER_RE.finditer(self.lowered))
+
+    @cached_property
+    def intents(self) -> dict:
+        """bucket -> (IntentHit, matched phrase), merged across query parts."""
+        try:
+            from src.search.coach_dictionary import infer_intents_verbose
+
+            intents: dict = {}
+            for part in self.parts:
+                intents.update(infer_intents_verbose(part))
+            return intents
+        except Exception:
+            return {}
+
+    @cached_property
+    def matched_phrases(self) -> tuple[str, ...]:
+        return tuple(phrase for _, phrase in self.intents.values())
+
+    @cached_property
+    def role_hints(self) -> frozenset[str]:
+        return frozenset(infer_role_hints(self.query))
+
+    @cached_property
+    def size_intents(self) -> dict:
+        return infer_size_intents(self.query)
+
+    @cached_property
+    def embedding_synonyms(self) -> tuple[str, ...]:
+        return tuple(_expand_synonyms_for_embedding(self.query))
+
+    @cached_property
+    def synonyms(self) -> tuple[str, ...]:
+        """Recall-oriented expansions (coach terms + dashboard synonyms)."""
+        return tuple(expand_query_terms(self.query) or []) + tuple(expand_query_synonyms(self.query) or [])
+
+    @cached_property
+    def position_scores(self) -> dict[str, float]:
+        try:
+            from src.position_calibration import score_positions
+
+            return score_positions(self.query, alpha_semantic=self.alpha_semantic, beta_size=self.beta_size)
+        except Exception:
+            return {}
+
+    @cached_property
+    def top_position(self) -> tuple[str, float] | None:
+        """Top canonical position and its confidence relative to the best score."""
+        scores = self.position_scores
+        if not scores:
+            return None
+        canon, score = max(scores.items(), key=lambda kv: kv[1])
+        max_score = max(scores.values()) or 1.0
+        return canon, float(score) / float(max_score)
+
+
+@lru_cache(maxsize=256)
+def _cached_plan(query: str, alpha_semantic: float, beta_size: float) -> QueryPlan:
+    return QueryPlan(query=query, alpha_semantic=alpha_semantic, beta_size=beta_size)
+
+
+def get_query_plan(
+    query: str,
+    alpha_semantic: float | None = None,
+    beta_size: float | None = None,
+) -> QueryPlan:
+    """Return the shared QueryPlan for a query (and position-model weights)."""
+    if alpha_semantic is None or beta_size is None:
+        alpha, beta = _load_position_weights()
+        alpha_semantic = alpha if alpha_semantic is None else alpha_semantic
+        beta_size = beta if beta_size is None else beta_size
+    return _cached_plan(query or "", float(alpha_semantic), float(beta_size))
@@ -126,6 +126,12 @@ def encode_query(query: str) -> list[float]:
 
 @lru_cache(maxsize=512)
 def _encode_query_cached(query: str) -> list[float]:
+    # Constant texts (concepts, coach phrases) ship precomputed.
+    from src.search.constant_embeddings import lookup
+
+    vec = lookup(query)
+    if vec is not None:
+        return [float(x) for x in vec]
     model = get_embedder()
     vec = model.encode([query], normalize_embeddings=True)
     return vec[0].tolist()
@@ -389,30 +395,35 @@ def semantic_search(
     use_hyde: bool = False,
     active_concepts: list[str] | None = None,
     constraints: dict | None = None,
+    plan=None,
 ) -> list[str] | tuple[list[str], dict[str, dict]]:
     """Run semantic search with normalized embeddings + optional rerank blend.
 
+    Pass ``plan`` (a QueryPlan from src.search.query_plan) to reuse query
+    analysis already done by the caller; otherwise the shared plan is looked up.
+
     Returns a list of play_ids ranked best-first.
     """
-    from src.position_calibration import score_positions, topk
-    synonym_terms = _expand_synonyms_for_embedding(query)
+    from src.search.query_plan import get_query_plan
+
+    alpha, beta = _load_position_weights()
+    if alpha_override is not None:
+        alpha = float(alpha_override)
+    if beta_override is not None:
+        beta = float(beta_override)
+    if plan is None or (plan.query, plan.alpha_semantic, plan.beta_size) != (query, alpha, beta):
+        plan = get_query_plan(query, alpha, beta)
+
+    synonym_terms = list(plan.embedding_synonyms)
     expanded_query = build_expanded_query(query, list(extra_query_terms or []) + synonym_terms)
     requested_n = max(int(n_results), 1)
     fetch_n = min(max(requested_n * 4, requested_n), 150)
 
     where_filter = None
     try:
-        alpha, beta = _load_position_weights()
-        if alpha_override is not None:
-            alpha = float(alpha_override)
-        if beta_override is not None:
-            beta = float(beta_override)
-        scores = score_positions(query, alpha_semantic=alpha, beta_size=beta)
-        top = topk(scores, k=1)
+        top = plan.top_position
         if top:
-            canon, score = top[0]
-            max_score = max(scores.values()) or 1.0
-            conf = float(score) / float(max_score)
+            canon, conf = top
             if conf > 0.8:
                 if canon == "CENTER":
                     where_filter = {"position": {"$in": ["C", "F/C"]}}
@@ -639,7 +650,7 @@ def semantic_search(
             ranked = []
             breakdowns: dict[str, dict] = {}
             phrase_terms = ["point guards", "clutch"]
-            adj_boost = _adjective_boost(query)
+            adj_boost = _adjective_boost(plan.lowered)
             for (pid, doc, dist, meta, lexical), rerank_score in zip(rerank_pool, rerank_scores):
                 meta_tags = _parse_tags(meta)
                 tag_overlap = 0
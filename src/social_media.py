@@ -1,6 +1,7 @@
 import os
 import re
-import requests
+
+from src.http_session import get_session
 
 SERPER_ENDPOINTS = {
     "search": "https://google.serper.dev/search",
@@ -15,7 +16,7 @@ def serper_search(query: str, type: str = "search", num: int = 6) -> list[dict]:
         return []
     endpoint = SERPER_ENDPOINTS.get(type, SERPER_ENDPOINTS["search"])
     try:
-        resp = requests.post(
+        resp = get_session().post(
             endpoint,
             headers={"X-API-KEY": api_key, "Content-Type": "application/json"},
             json={"q": query, "num": num},
@@ -34,7 +35,7 @@ def _openai_chat(prompt: str) -> str | None:
     if not api_key:
         return None
     try:
-        resp = requests.post(
+        resp = get_session().post(
             "https://api.openai.com/v1/chat/completions",
             headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
             json={
@@ -0,0 +1,49 @@
+import sqlite3
+
+from src.ingestion import ledger
+from src.ingestion.db import ensure_schema
+from src.ingestion.pipeline import upsert_plays
+from src.ingestion.writer import BatchWriter
+
+
+def test_writer_batches_commits_across_games(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "w.db"))
+    ensure_schema(conn)
+    writer = BatchWriter(conn, batch_rows=25, max_interval_s=3600, chunk_size=7)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    for g in range(10):
+        events = [{"id": f"g{g}-e{i}", "description": "Layup"} for i in range(6)]
+        upsert_plays(conn, f"g{g}", events, writer=writer)
+        writer.end_unit()
+
+    # Commits land on game boundaries once 25 rows are pending: after games 5 and 10.
+    assert writer.commits == 2
+    assert writer.pending == 0
+    assert conn.execute("SELECT COUNT(*) FROM plays").fetchone()[0] == 60
+
+
+def test_writer_never_commits_part_of_a_unit(tmp_path):
+    db = str(tmp_path / "w.db")
+    conn = sqlite3.connect(db)
+    ensure_schema(conn)
+    events = [{"id": f"g1-e{i}", "description": "Layup"} for i in range(6)]
+    try:
+        with BatchWriter(conn, batch_rows=4, max_interval_s=0) as writer:
+            upsert_plays(conn, "g1", events, writer=writer)
+            raise KeyboardInterrupt  # crash before the game's ledger row / end_unit()
+    except KeyboardInterrupt:
+        pass
+
+    other = sqlite3.connect(db)
+    assert other.execute("SELECT COUNT(*) FROM plays").fetchone()[0] == 0
+    assert ledger.adopt_existing_events(other, ["g1"]) == 0
+
+
+def test_writer_context_flushes_pending(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "w.db"))
+    conn.execute("CREATE TABLE t (k INTEGER PRIMARY KEY)")
+    with BatchWriter(conn) as writer:
+        writer.add("INSERT INTO t VALUES (?)", ((i,) for i in range(100)))
+    other = sqlite3.connect(str(tmp_path / "w.db"))
+    assert other.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 100
@@ -0,0 +1,82 @@
+import sqlite3
+import threading
+
+from src.ingestion.dag import Stage, run_dag
+
+
+def test_dag_runs_in_parallel_skips_fresh_and_reruns_failures(tmp_path):
+    db = str(tmp_path / "dag.db")
+
+    def connect():
+        return sqlite3.connect(db)
+
+    conn = connect()
+    conn.execute("CREATE TABLE src (k INTEGER)")
+    conn.execute("INSERT INTO src VALUES (1)")
+    conn.commit()
+
+    calls = []
+    both_running = threading.Barrier(2, timeout=5)
+    fail = {"report": False}
+
+    def copy(ctx):
+        calls.append("copy")
+        c = connect()
+        c.execute("CREATE TABLE IF NOT EXISTS dst (k INTEGER)")
+        c.execute("DELETE FROM dst")
+        n = c.execute("INSERT INTO dst SELECT k FROM src").rowcount
+        c.commit()
+        return n
+
+    def side(name):
+        def fn(ctx):
+            calls.append(name)
+            both_running.wait()  # left and right must overlap
+            return {"rows": ctx["copy"]}
+        return fn
+
+    def report(ctx):
+        calls.append("report")
+        if fail["report"]:
+            raise RuntimeError("boom")
+        return 1
+
+    stages = [
+        Stage("copy", copy, inputs=("table:src",), outputs=("table:dst",)),
+        Stage("left", side("left"), inputs=("table:dst",), outputs=("table:left",)),
+        Stage("right", side("right"), inputs=("table:dst",)),
+        Stage("report", report, inputs=("table:left",)),
+    ]
+
+    first = run_dag(stages, db_connect=connect, log=None)
+    assert {m["status"] for m in first.values()} == {"ran"}
+    assert first["left"]["rows"] == 1
+    assert sorted(calls) == ["copy", "left", "report", "right"]
+
+    calls.clear()
+    second = run_dag(stages, db_connect=connect, log=None)
+    assert {m["status"] for m in second.values()} == {"skipped"}
+    assert calls == []
+
+    conn.execute("INSERT INTO src VALUES (2)")
+    conn.commit()
+    fail["report"] = True
+    both_running.reset()
+    third = run_dag(stages, db_connect=connect, log=None)
+    assert third["copy"]["rows"] == 2
+    assert third["report"]["status"] == "failed"
+    row = conn.execute("SELECT status, last_error FROM stage_runs WHERE stage = 'report'").fetchone()
+    assert row == ("failed", "RuntimeError: boom")
+
+    fail["report"] = False
+    calls.clear()
+    fourth = run_dag(stages, db_connect=connect, log=None)
+    assert fourth["report"]["status"] == "ran"  # failed stages never count as fresh
+    assert calls == ["report"]
+
+
+def test_default_traits_stage_waits_for_tags():
+    from src.ingestion.dag import _dependencies, default_stages
+
+    deps = _dependencies(default_stages())
+    assert "tags" in deps["traits"]
@@ -0,0 +1,184 @@
+import json
+import os
+import random
+import sqlite3
+
+import pytest
+
+from src.ingestion.db import ensure_schema
+from src.processing import (
+    derive_clutch,
+    derive_defensive_big,
+    derive_leadership,
+    derive_player_traits,
+    derive_resilience,
+    derive_undervalued,
+    trait_engine,
+)
+
+DESCRIPTIONS = [
+    "Jump Shot Make 2 Pts",
+    "Pick and Roll Ball Handler Miss 3 Pts",
+    "Drive to basket Layup Made assisted",
+    "Turnover bad pass",
+    "Offensive Rebound Putback Dunk made",
+    "Steal deflection",
+    "Block at the rim",
+    "Transition 3pt make",
+    "Handoff 3pt miss",
+]
+PLAYERS = [f"p{i}" for i in range(8)]
+GOLDEN = os.path.join(os.path.dirname(__file__), "fixtures", "player_traits_golden.json")
+
+
+def _plays_for(game_id: str, rng: random.Random) -> list[tuple]:
+    rows = []
+    for i in range(60):
+        rows.append(
+            (
+                f"{game_id}-{i}", game_id, rng.choice([1, 2, 3, 4]), rng.randint(0, 600),
+                rng.choice(DESCRIPTIONS), rng.choice(PLAYERS), rng.choice(PLAYERS + [None]),
+                rng.choice(PLAYERS + [None]), rng.choice(PLAYERS + [None]),
+                rng.randint(-6, 6), rng.randint(-6, 6), rng.randint(0, 1), rng.randint(0, 1),
+                rng.randint(0, 1), rng.randint(0, 1), rng.randint(0, 1), rng.randint(0, 1),
+                rng.randint(0, 1), rng.randint(40, 80), rng.randint(40, 80), rng.randint(0, 1),
+                rng.uniform(1, 20),
+            )
+        )
+    return rows
+
+
+def _insert(conn, rows):
+    conn.executemany(
+        """
+        INSERT INTO plays (play_id, game_id, period, clock_seconds, description, player_id,
+            assist_player_id, d_player_id, r_player_id, x_loc, y_loc, ato, short_clock, eob,
+            heave, press, zone, hard_double, home_score, away_score, is_home, duration)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        rows,
+    )
+    conn.commit()
+
+
+def _build_all(game_ids=None):
+    derive_player_traits.build_player_traits(game_ids)
+    derive_leadership.build_leadership_metrics(game_ids)
+    derive_resilience.build_resilience_metrics(game_ids)
+    derive_defensive_big.build_defensive_big_metrics(game_ids)
+    derive_clutch.build_clutch_metrics(game_ids)
+    derive_undervalued.build_undervalued_metrics(game_ids)
+
+
+def _snapshot(path):
+    conn = sqlite3.connect(path)
+    cur = conn.execute("SELECT * FROM player_traits ORDER BY player_id")
+    cols = [d[0] for d in cur.description]
+    rows = [dict(zip(cols, r, strict=True)) for r in cur.fetchall()]
+    conn.close()
+    return rows
+
+
+def _use_db(monkeypatch, path):
+    monkeypatch.setattr(derive_player_traits, "DB_PATH", path)
+    for mod in (derive_leadership, derive_resilience, derive_defensive_big, derive_clutch, derive_undervalued):
+        monkeypatch.setattr(mod, "db_path", lambda: path)
+
+
+def test_incremental_fold_matches_full_rebuild(tmp_path, monkeypatch):
+    rng = random.Random(7)
+    batches = {g: _plays_for(g, rng) for g in ("g1", "g2", "g3")}
+
+    inc = str(tmp_path / "inc.db")
+    conn = sqlite3.connect(inc)
+    ensure_schema(conn)
+    _insert(conn, batches["g1"] + batches["g2"])
+    _use_db(monkeypatch, inc)
+    _build_all()  # first run: full build seeds the counters
+    _insert(conn, batches["g3"])
+    _build_all(["g3"])
+    _build_all(["g3"])  # already folded: no-op
+    conn.close()
+
+    full = str(tmp_path / "full.db")
+    conn = sqlite3.connect(full)
+    ensure_schema(conn)
+    _insert(conn, batches["g1"] + batches["g2"] + batches["g3"])
+    conn.close()
+    _use_db(monkeypatch, full)
+    _build_all()
+
+    _assert_same(_snapshot(inc), _snapshot(full))
+
+
+def _assert_same(got, want):
+    assert len(got) == len(want) == len(PLAYERS)
+    for g, w in zip(got, want, strict=True):
+        for col, val in w.items():
+            if isinstance(val, float):
+                assert g[col] == pytest.approx(val), col
+            else:
+                assert g[col] == val, col
+
+
+def test_single_pass_matches_per_metric_golden(tmp_path):
+    # Golden rows were written by the per-metric derive_* builders that predate the
+    # trait engine, on exactly these plays (random.Random(11), games g1 and g2).
+    with open(GOLDEN, encoding="utf-8") as f:
+        golden = json.load(f)["rows"]
+
+    rng = random.Random(11)
+    plays = [r for g in ("g1", "g2") for r in _plays_for(g, rng)]
+    path = str(tmp_path / "single.db")
+    conn = sqlite3.connect(path)
+    ensure_schema(conn)
+    _insert(conn, plays)
+    conn.close()
+
+    out = trait_engine.run_trait_engine(db_file=path, verbose=False)
+    assert out["plays"] == len(plays)
+    assert set(trait_engine.registry()) <= set(out["timings"])
+
+    got = [{k: v for k, v in row.items() if k != "updated_at" and v is not None} for row in _snapshot(path)]
+    assert [set(r) for r in got] == [set(r) for r in golden]
+    _assert_same(got, golden)
+
+
+def test_failed_fold_is_caught_up_next_run(tmp_path, monkeypatch):
+    rng = random.Random(7)
+    batches = {g: _plays_for(g, rng) for g in ("g1", "g2", "g3", "g4")}
+
+    inc = str(tmp_path / "inc.db")
+    conn = sqlite3.connect(inc)
+    ensure_schema(conn)
+    _insert(conn, batches["g1"] + batches["g2"])
+    trait_engine.run_trait_engine(db_file=inc, verbose=False)
+
+    # g3's plays are committed but its fold fails part-way through.
+    _insert(conn, batches["g3"])
+    real_write = trait_engine._write_traits
+
+    def boom(*a, **kw):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(trait_engine, "_write_traits", boom)
+    with pytest.raises(RuntimeError):
+        trait_engine.run_trait_engine(incremental=True, db_file=inc, verbose=False)
+    monkeypatch.setattr(trait_engine, "_write_traits", real_write)
+    assert not conn.execute("SELECT 1 FROM trait_folded_games WHERE game_id = 'g3'").fetchone()
+
+    # The next incremental run folds the left-behind g3 along with the new g4.
+    _insert(conn, batches["g4"])
+    out = trait_engine.run_trait_engine(incremental=True, db_file=inc, verbose=False)
+    assert out["plays"] == len(batches["g3"]) + len(batches["g4"])
+    assert trait_engine.run_trait_engine(incremental=True, db_file=inc, verbose=False)["plays"] == 0
+    conn.close()
+
+    full = str(tmp_path / "full.db")
+    conn = sqlite3.connect(full)
+    ensure_schema(conn)
+    _insert(conn, [r for b in batches.values() for r in b])
+    conn.close()
+    trait_engine.run_trait_engine(db_file=full, verbose=False)
+
+    _assert_same(_snapshot(inc), _snapshot(full))
@@ -0,0 +1,71 @@
+import sqlite3
+
+from src.ingestion import ledger, pipeline
+from src.ingestion.concurrent_fetch import fetch_concurrently
+from src.ingestion.response_cache import ResponseCache
+
+
+class FakeClient:
+    def __init__(self, api_key=None, max_workers=1, fail=()):
+        self.fail = set(fail)
+        self.event_calls = []
+        self.last_error = None
+        self.cache = ResponseCache(mode="off")
+
+    def get_games(self, league_code, season_id, team_id=None, limit=20, skip=None):
+        if skip:
+            return []
+        return [{"id": f"g{i}", "status": "GameOver"} for i in range(4)]
+
+    def get_game_events(self, league_code, game_id, final=False):
+        self.event_calls.append(game_id)
+        if game_id in self.fail:
+            return None
+        return [{"id": f"{game_id}-e{i}", "description": "Jump Shot"} for i in range(3)]
+
+    def map(self, fn, items, max_workers=None):
+        return fetch_concurrently(fn, items, max_workers=1)
+
+    def collect_metrics(self):
+        pass
+
+
+def test_pipeline_resumes_from_ledger(tmp_path, monkeypatch):
+    db = str(tmp_path / "skout.db")
+    monkeypatch.setattr(pipeline, "connect_db", lambda: sqlite3.connect(db))
+    monkeypatch.setenv("SKOUT_METRICS_DIR", str(tmp_path / "metrics"))
+    # Keep trait derivation away from the real data/skout.db.
+    monkeypatch.setattr("src.processing.trait_engine.run_trait_engine", lambda *a, **kw: None)
+    plan = pipeline.PipelinePlan(league_code="ncaamb", season_id="s1", team_ids=[])
+
+    first = FakeClient(fail={"g2"})
+    monkeypatch.setattr(pipeline, "SynergyClient", lambda **kw: first)
+    out = pipeline.run_pipeline(plan, api_key="x")
+    assert out["inserted_plays"] == 9
+
+    conn = sqlite3.connect(db)
+    rows = dict(conn.execute("SELECT entity_id, status FROM ingest_ledger").fetchall())
+    assert rows == {"g0": "ok", "g1": "ok", "g2": "error", "g3": "ok"}
+    conn.close()
+
+    second = FakeClient()
+    monkeypatch.setattr(pipeline, "SynergyClient", lambda **kw: second)
+    out = pipeline.run_pipeline(plan, api_key="x")
+    assert second.event_calls == ["g2"]
+    assert out["skipped_games"] == 3
+
+    conn = sqlite3.connect(db)
+    assert conn.execute(
+        "SELECT status, attempts FROM ingest_ledger WHERE entity_id = 'g2'"
+    ).fetchone() == ("ok", 2)
+    conn.close()
+
+
+def test_adopt_existing_events():
+    conn = sqlite3.connect(":memory:")
+    from src.ingestion.db import ensure_schema
+
+    ensure_schema(conn)
+    conn.execute("INSERT INTO plays (play_id, game_id) VALUES ('p1', 'old')")
+    assert ledger.adopt_existing_events(conn, ["old", "new"]) == 1
+    assert ledger.completed(conn, ledger.EVENTS_ENDPOINT) == {"old"}
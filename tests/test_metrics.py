@@ -0,0 +1,41 @@
+import sqlite3
+
+from src.ingestion.metrics import Metrics, endpoint_kind, table_of
+from src.ingestion.writer import BatchWriter
+
+
+def test_prometheus_text_and_summary():
+    m = Metrics()
+    m.inc("synergy_requests_total", endpoint="events", status=200)
+    m.inc("synergy_requests_total", endpoint="events", status=429)
+    m.inc("synergy_requests_total", endpoint="events", status=200)
+    for v in (0.004, 0.2, 60.0):
+        m.observe("synergy_request_duration_seconds", v, buckets=(0.01, 1.0), endpoint="events")
+
+    text = m.prometheus_text()
+    assert "# TYPE synergy_requests_total counter" in text
+    assert 'synergy_requests_total{endpoint="events",status="200"} 2' in text
+    assert 'synergy_request_duration_seconds_bucket{endpoint="events",le="0.01"} 1' in text
+    assert 'synergy_request_duration_seconds_bucket{endpoint="events",le="1.0"} 2' in text
+    assert 'synergy_request_duration_seconds_bucket{endpoint="events",le="+Inf"} 3' in text
+    assert 'synergy_request_duration_seconds_count{endpoint="events"} 3' in text
+
+    assert m.value("synergy_requests_total", endpoint="events") == 3
+    assert m.summary()["synergy_requests_total"] == {"events:200": 2.0, "events:429": 1.0}
+
+
+def test_writer_counts_rows_per_table():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE plays (play_id TEXT PRIMARY KEY)")
+    m = Metrics()
+    with BatchWriter(conn, metrics=m) as writer:
+        writer.add("INSERT INTO plays (play_id) VALUES (?)", [("a",), ("b",)])
+    assert m.value("ingest_rows_total", table="plays") == 2
+    assert m.value("ingest_commits_total") == 1
+
+
+def test_labels():
+    assert endpoint_kind("/ncaamb/games/g1/events") == "events"
+    assert endpoint_kind("/ncaamb/seasons/s1/events/reports/playerplaytypestats") == "playtype_stats"
+    assert table_of("\n    INSERT INTO ingest_ledger\n (a) VALUES (?)") == "ingest_ledger"
+    assert table_of("UPDATE players SET x = ?") == "players"
@@ -0,0 +1,42 @@
+import time
+
+from src.ingestion.pagination import iter_pages
+
+
+def test_prefetches_next_page_without_extra_requests():
+    items = list(range(23))
+    requested = []
+
+    def fetch(skip, take):
+        requested.append(skip)
+        return {"data": items[skip : skip + take]}
+
+    pages = []
+    for page in iter_pages(fetch, take=10):
+        # Page N+1 was already requested while page N is being consumed.
+        if len(page) == 10:
+            for _ in range(200):
+                if len(requested) > len(pages) + 1:
+                    break
+                time.sleep(0.005)
+            assert len(requested) == len(pages) + 2
+        pages.append(page)
+
+    assert [len(p) for p in pages] == [10, 10, 3]
+    assert requested == [0, 10, 20]  # the short page ends paging: no speculative 4th call
+
+
+def test_max_pages_and_early_stop():
+    calls = []
+
+    def fetch(skip, take):
+        calls.append(skip)
+        return [skip] * take
+
+    assert len(list(iter_pages(fetch, take=5, max_pages=3))) == 3
+    assert calls == [0, 5, 10]
+
+    calls.clear()
+    for _ in iter_pages(fetch, take=5, prefetch=False):
+        break
+    assert calls == [0]
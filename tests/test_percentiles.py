@@ -0,0 +1,63 @@
+import sqlite3
+
+from src import percentiles
+from src.ingestion.db import ensure_schema
+from src.position_calibration import calculate_percentile
+
+
+def _seed(conn):
+    rows = []
+    for i in range(40):
+        rows.append((f"g{i}", "PG", 70 + (i % 8), 170 + i, f"s{i}"))
+        rows.append((f"c{i}", "C", 80 + (i % 6), 230 + i, f"s{i}"))
+        rows.append((f"sg{i}", "SG", 76 + (i % 8), 190 + i, f"s{i}"))
+    rows += [(f"sf{i}", "SF", 78, 210, f"s{i}") for i in range(15)]
+    rows += [(f"pf{i}", "PF", 80 + (i % 2), 225, f"s{i}") for i in range(10)]
+    conn.executemany(
+        "INSERT INTO players (player_id, position, height_in, weight_lb, full_name) VALUES (?, ?, ?, ?, ?)",
+        rows,
+    )
+    conn.executemany(
+        "INSERT INTO player_season_stats (player_id, season_id, ppg) VALUES (?, ?, ?)",
+        [(f"g{i}", "2025", float(i)) for i in range(40)] + [("g0", "2024", 99.0)],
+    )
+
+
+def test_percentile_tables_lookup(tmp_path, monkeypatch):
+    conn = sqlite3.connect(":memory:")
+    ensure_schema(conn)
+    _seed(conn)
+    path = tmp_path / "percentile_tables.json"
+    monkeypatch.setattr(percentiles, "TABLES_PATH", str(path))
+
+    assert percentiles.rebuild_percentile_tables(conn) > 0
+    tables = percentiles.load_percentile_tables()
+    assert tables["CENTER"]["height_in"] == sorted(tables["CENTER"]["height_in"])
+
+    # Latest season only: g0's 2024 outlier is not in the ppg table.
+    assert max(tables["GUARD"]["ppg"]) == 39.0
+    assert calculate_percentile(20.0, "PG", metric="ppg") == 52
+    assert calculate_percentile(85, "C", metric="h") == 99
+    assert calculate_percentile(80, "C", metric="h") == 17
+
+
+def test_percentiles_rank_against_specific_position(tmp_path, monkeypatch):
+    conn = sqlite3.connect(":memory:")
+    ensure_schema(conn)
+    _seed(conn)
+    monkeypatch.setattr(percentiles, "TABLES_PATH", str(tmp_path / "percentile_tables.json"))
+    percentiles.rebuild_percentile_tables(conn)
+
+    # 77in is the tallest point guard but mid-pack among all guards.
+    assert calculate_percentile(77, "PG", metric="h") == 99
+    assert calculate_percentile(77, "SG", metric="h") == 25
+    assert calculate_percentile(77, "G", metric="h") == 62
+    assert percentiles.position_median("PG", "height_in") == 74
+    # 10 power forwards is too small a table: fall back to all 25 forwards.
+    assert calculate_percentile(79, "PF", metric="h") == 60
+
+
+def test_percentile_falls_back_to_priors_without_tables(tmp_path, monkeypatch):
+    monkeypatch.setattr(percentiles, "TABLES_PATH", str(tmp_path / "missing.json"))
+    assert calculate_percentile(82.5, "C", metric="h") == 50
+    assert calculate_percentile(20.0, "C", metric="ppg") == 0
@@ -0,0 +1,46 @@
+import sqlite3
+
+from src.ingestion.db import ensure_schema
+from src.ingestion.pipeline import upsert_games, upsert_players, upsert_plays
+
+
+def test_reingest_preserves_columns_and_skips_unchanged_rows():
+    conn = sqlite3.connect(":memory:")
+    ensure_schema(conn)
+    games = [{"id": "g1", "status": "Final", "homeScore": 70, "awayScore": 65}]
+    players = [{"id": "p1", "nameFirst": "A", "nameLast": "B", "position": "G", "heightInches": 75}]
+    events = [{"id": "e1", "description": "Jump Shot", "clock": 30, "gameQuarter": 1}]
+
+    upsert_games(conn, "s1", games)
+    upsert_players(conn, "t1", players)
+    upsert_plays(conn, "g1", events)
+    conn.execute("UPDATE games SET video_path = 'film.mp4'")
+    conn.execute("UPDATE players SET high_school = 'Central'")
+    conn.execute("UPDATE plays SET tags = 'jumper'")
+    conn.commit()
+
+    before = conn.total_changes
+    upsert_games(conn, "s1", games)
+    upsert_players(conn, "t1", players)
+    upsert_plays(conn, "g1", events)
+    assert conn.total_changes == before
+
+    upsert_games(conn, "s1", [dict(games[0], homeScore=71)])
+    upsert_players(conn, "t1", [{"id": "p1", "nameFirst": "A", "nameLast": "B"}])
+    assert conn.execute("SELECT home_score, video_path FROM games").fetchone() == (71, "film.mp4")
+    assert conn.execute("SELECT height_in, high_school FROM players").fetchone() == (75.0, "Central")
+    assert conn.execute("SELECT tags FROM plays").fetchone() == ("jumper",)
+
+
+def test_play_rows_match_event_rows():
+    from src.ingestion.pipeline import _event_row, play_rows
+
+    events = [
+        {"id": "e1", "description": "Pick and Roll Ball Handler Make 3 Pts", "clock": 2, "gameQuarter": 2,
+         "pickAndRoll": True, "transition": True, "person": {"id": "p1", "nameFirst": "A", "nameLast": "B"},
+         "assist": {"id": "p2"}, "offense": {"id": "t1", "abbr": "T1"}, "isHome": True},
+        {"id": "e2", "description": None, "clock": "0:04", "gameQuarter": "2", "assist": "p3",
+         "player": {"id": "p4", "name": "Solo"}, "dPlayer": {"id": "p5"}, "defense": {"name": "Other"}},
+        {"id": "e3", "description": "Turnover Steal", "clock": -3, "transition": True, "heave": 1},
+    ]
+    assert play_rows("g1", events) == [_event_row("g1", e) for e in events]
@@ -0,0 +1,43 @@
+import sqlite3
+
+from src.ingestion import ledger
+from src.ingestion.db import ensure_schema
+from src.ingestion.pipeline import PipelinePlan
+from src.ingestion.planner import PlanningClient, estimate_seconds, plan_pipeline
+from src.ingestion.response_cache import ResponseCache
+
+
+def test_plan_counts_uncached_requests_and_new_entities(tmp_path):
+    client = PlanningClient(cache_root=str(tmp_path))
+    cache = ResponseCache(root=str(tmp_path), mode="readwrite")
+    scope = client.cache_scope
+    games = [{"id": f"g{i}", "status": "GameOver"} for i in range(4)] + [{"id": "g9", "status": "Scheduled"}]
+    cache.put("/ncaamb/games", {"seasonId": "s1", "take": 100, "skip": 0, "teamId": "t1"}, {"data": games}, scope=scope)
+    cache.put("/ncaamb/teams/t1/players", None, {"data": [{"data": {"id": "p1"}}, {"data": {"id": "p2"}}]}, scope=scope)
+    cache.put("/ncaamb/games/g3/events", None, [{"id": "e"}], scope=scope)  # fetched before, never expires
+
+    conn = sqlite3.connect(":memory:")
+    ensure_schema(conn)
+    conn.executemany("INSERT INTO games (game_id, season_id) VALUES (?, 's1')", [("g0",), ("g1",)])
+    conn.execute("INSERT INTO plays (play_id, game_id) VALUES ('x', 'g0')")
+    conn.execute("INSERT INTO players (player_id) VALUES ('p1')")
+    ledger.record(conn, ledger.EVENTS_ENDPOINT, "g1", ledger.STATUS_OK)
+
+    plan = PipelinePlan(league_code="ncaamb", season_id="s1", team_ids=["t1"])
+    out = plan_pipeline(plan, client=client, conn=conn, rate=2.0)
+
+    # g2 needs its events fetched; g3's are cached; schedule/players pages are fresh.
+    assert out["requests"] == {"events": 1, "total": 1}
+    assert out["cached"] == {"schedule": 1, "players": 1, "events": 1}
+    assert out["games"] == {"scheduled": 4, "new": 2, "present": 2}
+    assert out["events"]["games_pending"] == 2
+    assert out["events"]["plays_new_estimate"] == 2
+    assert out["players"] == {"seen": 2, "new": 1, "present": 1}
+    assert out["rate"]["source"] == "override"
+    assert out["wall_time_s"] > 0
+
+
+def test_estimate_seconds_ramps_then_holds():
+    assert estimate_seconds(10, start_rate=2.0, ceiling=2.0, increase=0.5) == 5.0
+    ramped = estimate_seconds(10, start_rate=1.0, ceiling=2.0, increase=0.5)
+    assert 5.0 < ramped < 10.0
@@ -0,0 +1,98 @@
+import random
+import sqlite3
+
+from src.ingestion.db import ensure_schema
+from src.ingestion.pipeline import upsert_plays
+from src.processing.play_tagger import (
+    TAG_IDS,
+    TAGS,
+    mask_tags,
+    stored_tags,
+    tag_mask,
+    tag_matrix,
+    tag_play,
+    tag_plays,
+)
+
+
+def _steals_by(conn, player_id):
+    rows = conn.execute(
+        """
+        SELECT p.play_id FROM play_tags t JOIN plays p USING (play_id)
+        WHERE t.tag_id = ? AND p.player_id = ? ORDER BY p.play_id
+        """,
+        (TAG_IDS["steal"], player_id),
+    )
+    return [r[0] for r in rows]
+
+
+def test_mask_round_trip():
+    for desc in ["Turnover steal by guard", "Offensive Rebound Putback Dunk made", ""]:
+        tags = tag_play(desc, 2)
+        assert mask_tags(tag_mask(tags)) == frozenset(tags)
+        assert stored_tags(None, desc, 2) == stored_tags(tag_mask(tags), "ignored") == frozenset(tags)
+
+
+def test_tags_stored_at_ingest_and_follow_description():
+    conn = sqlite3.connect(":memory:")
+    ensure_schema(conn)
+    events = [
+        {"id": "e1", "description": "Turnover steal", "person": {"id": "p1"}},
+        {"id": "e2", "description": "Jump Shot Make 2 Pts", "person": {"id": "p1"}},
+        {"id": "e3", "description": "Turnover steal", "person": {"id": "p2"}},
+    ]
+    upsert_plays(conn, "g1", events)
+    assert _steals_by(conn, "p1") == ["e1"]
+    assert conn.execute("SELECT tags FROM plays WHERE play_id = 'e2'").fetchone()[0] == "jumpshot, made, score"
+
+    upsert_plays(conn, "g1", [dict(events[0], description="Turnover bad pass")])
+    assert _steals_by(conn, "p1") == []
+    conn.execute("DELETE FROM plays WHERE play_id = 'e3'")
+    assert conn.execute("SELECT COUNT(*) FROM play_tags WHERE play_id = 'e3'").fetchone()[0] == 0
+
+
+def test_tag_plays_matches_tag_play():
+    fragments = [
+        "Pick and Roll", "Ball Handler", "Isolation", "Post-Up", "Drive to basket", "Cut",
+        "Pull-Up", "Jump Shot", "3pt", "Dunk", "Layup", "Make 2 Pts", "Miss 3 Pts", "made",
+        "Assisted", "Free Throw", "Turnover", "Steal", "Offensive Rebound", "Rebound",
+        "Foul", "Charge", "Block", "Deflection", "Loose Ball", "Transition", "Handoff",
+        "Non Possession", "Shot Clock Violation", "kick out",
+    ]
+    rng = random.Random(3)
+    descriptions = [" ".join(rng.sample(fragments, rng.randint(1, 4))) for _ in range(2000)]
+    descriptions += [None, ""]
+    clocks = [rng.choice([None, 0, 1, 2, 5, 6, 300, "0:04", "1:00", "2", "x"]) for _ in descriptions]
+
+    masks = tag_plays(descriptions, clocks)
+    for desc, clock, mask in zip(descriptions, clocks, masks, strict=True):
+        assert mask_tags(int(mask)) == frozenset(tag_play(desc, clock)), (desc, clock)
+
+    no_clock = tag_plays(descriptions)
+    assert [mask_tags(int(m)) for m in no_clock] == [frozenset(tag_play(d)) for d in descriptions]
+    matrix = tag_matrix(masks)
+    assert matrix.shape == (len(descriptions), len(TAGS))
+    assert (matrix[:, TAG_IDS["steal"]] == [("steal" in tag_play(d)) for d in descriptions]).all()
+
+
+def test_apply_tags_backfills_in_batches(tmp_path, monkeypatch):
+    from src.processing import apply_tags as backfill
+
+    db = str(tmp_path / "skout.db")
+    monkeypatch.setenv("SKOUT_DB_PATH", db)
+    monkeypatch.setattr(backfill, "BATCH", 2)
+    conn = sqlite3.connect(db)
+    ensure_schema(conn)
+    conn.executemany(
+        "INSERT INTO plays (play_id, game_id, description, clock_seconds) VALUES (?, 'g1', ?, 30)",
+        [(f"e{i}", "Turnover steal" if i % 2 else "Jump Shot Make 2 Pts") for i in range(5)],
+    )
+    conn.execute("UPDATE plays SET tag_mask = 0 WHERE play_id = 'e4'")  # already tagged: left alone
+    conn.commit()
+
+    assert backfill.apply_tags() == 4
+    masks = dict(conn.execute("SELECT play_id, tag_mask FROM plays"))
+    assert masks["e4"] == 0
+    assert mask_tags(masks["e1"]) == frozenset(tag_play("Turnover steal", 30))
+    assert mask_tags(masks["e2"]) == frozenset(tag_play("Jump Shot Make 2 Pts", 30))
+    assert conn.execute("SELECT COUNT(*) FROM play_tags WHERE tag_id = ?", (TAG_IDS["steal"],)).fetchone()[0] == 2
@@ -0,0 +1,90 @@
+import sqlite3
+
+from src.ingestion import ledger
+from src.ingestion.ingest_play_videos import VIDEO_ENDPOINT, PlayVideoIngester
+
+
+class FakeCollection:
+    """In-memory stand-in for the slice of the Chroma collection API the ingester uses."""
+
+    def __init__(self, ids=()):
+        self.records = {pid: (None, {}) for pid in ids}
+
+    def get(self, limit=None, offset=0, include=()):
+        ids = list(self.records)[offset:]
+        if limit is not None:
+            ids = ids[:limit]
+        out = {"ids": ids}
+        if "metadatas" in include:
+            out["metadatas"] = [self.records[i][1] for i in ids]
+        return out
+
+    def upsert(self, ids, documents, metadatas):
+        for i, doc, meta in zip(ids, documents, metadatas, strict=True):
+            self.records[i] = (doc, meta)
+
+
+class FakeClient:
+    """Answers /plays/<id>/video from a dict: a list of videos, 404, or 500."""
+
+    def __init__(self, answers):
+        self.answers = answers
+        self.requested = []
+        self.last_status_code = None
+        self.last_error = None
+
+    def _get(self, endpoint, params=None):
+        play_id = endpoint.split("/")[-2]
+        self.requested.append(play_id)
+        answer = self.answers.get(play_id, 404)
+        if isinstance(answer, int):
+            self.last_status_code = answer
+            self.last_error = f"HTTP {answer}"
+            return None
+        self.last_status_code = 200
+        self.last_error = None
+        return {"data": [{"data": v} for v in answer]}
+
+    def map(self, fn, items, max_workers=None):
+        for item in items:
+            yield item, fn(item)
+
+
+def test_rerun_fetches_only_new_and_failed_plays(tmp_path, monkeypatch):
+    db = tmp_path / "skout.db"
+    monkeypatch.setenv("SKOUT_DB_PATH", str(db))
+    plays = FakeCollection(["p1", "p2", "p3", "p4"])
+    videos = FakeCollection()
+    client = FakeClient(
+        {
+            "p1": [{"id": "v1", "url": "u1"}],
+            "p2": [],
+            "p3": 404,
+            "p4": 500,
+        }
+    )
+
+    ingester = PlayVideoIngester(client=client, play_collection=plays, video_collection=videos)
+    assert ingester.ingest_all(batch_size=2) == 1
+    assert sorted(client.requested) == ["p1", "p2", "p3", "p4"]
+    assert videos.records["v1"][1]["play_id"] == "p1"
+
+    conn = sqlite3.connect(db)
+    assert ledger.completed(conn, VIDEO_ENDPOINT) == {"p1", "p2", "p3"}
+    conn.close()
+
+    # second run: p4 recovered, p5 is new; p1-p3 are not requested again
+    plays.records["p5"] = (None, {})
+    client.answers.update({"p4": [{"id": "v4"}], "p5": [{"id": "v5"}]})
+    client.requested.clear()
+    assert ingester.ingest_all(batch_size=2) == 2
+    assert sorted(client.requested) == ["p4", "p5"]
+    assert set(videos.records) == {"v1", "v4", "v5"}
+
+    conn = sqlite3.connect(db)
+    assert ledger.completed(conn, VIDEO_ENDPOINT) == {"p1", "p2", "p3", "p4", "p5"}
+    conn.close()
+
+    client.requested.clear()
+    assert ingester.ingest_all() == 0
+    assert client.requested == []
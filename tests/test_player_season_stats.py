@@ -0,0 +1,77 @@
+import sqlite3
+
+from src import percentiles
+from src.ingestion import ingest_player_season_stats as ipss
+from src.ingestion.concurrent_fetch import fetch_concurrently
+from src.ingestion.db import ensure_schema
+
+
+class FakeClient:
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.calls = []
+        self.last_error = None
+
+    def get_player_playtype_stats(self, league_code, season_id, play_type, team_id=None, skip=None, take=512):
+        self.calls.append((team_id, play_type, skip))
+        if (team_id, play_type) in self.fail:
+            return None
+        if skip or play_type not in ("Iso", "SpotUp"):
+            return {"data": []}
+        players = {"t1": ["p1", "p2"], "t2": ["p3"]}[team_id]
+        return {
+            "data": [
+                {"player": {"id": pid}, "stats": {"gp": 1, "possessions": 10, "fgMade": 3, "fgAttempt": 6,
+                                                  "fgPercentEffective": 0.55, "ftMade": 1, "ftAttempt": 2}}
+                for pid in players
+            ]
+        }
+
+    def map(self, fn, items, max_workers=None):
+        return fetch_concurrently(fn, items, max_workers=max_workers or 4)
+
+
+def _db():
+    conn = sqlite3.connect(":memory:")
+    ensure_schema(conn)
+    conn.executemany(
+        "INSERT INTO players (player_id, team_id) VALUES (?, ?)",
+        [("p1", "t1"), ("p2", "t1"), ("p3", "t2")],
+    )
+    conn.commit()
+    return conn
+
+
+def test_concurrent_refresh_aggregates_and_resumes(tmp_path, monkeypatch):
+    # The refresh rebuilds the percentile tables; keep them off data/.
+    tables = tmp_path / "percentile_tables.json"
+    monkeypatch.setattr(percentiles, "TABLES_PATH", str(tables))
+    conn = _db()
+    first = FakeClient(fail={("t2", "SpotUp")})
+    assert ipss.ingest_player_season_stats(season_id="s1", client=first, conn=conn) == 3
+    assert len(first.calls) == 2 * len(ipss.PLAY_TYPES)
+
+    row = conn.execute(
+        "SELECT team_id, gp, possessions, fg_made, fg_attempt, fg_percent, fg_percent_effective, ft_percent "
+        "FROM player_season_stats WHERE player_id = 'p1'"
+    ).fetchone()
+    assert row == ("t1", 2, 20, 6, 12, 0.5, round(1.1 / len(ipss.PLAY_TYPES), 4), 0.5)
+    assert tables.exists()
+
+    # Only the failed report is fetched again, and p3 picks up its SpotUp rows.
+    second = FakeClient()
+    assert ipss.ingest_player_season_stats(season_id="s1", client=second, conn=conn) == 3
+    assert second.calls == [("t2", "SpotUp", 0)]
+    assert conn.execute("SELECT possessions FROM player_season_stats WHERE player_id = 'p3'").fetchone() == (20,)
+
+
+def test_no_attempts_leaves_effective_null():
+    import pandas as pd
+
+    frame = pd.DataFrame(
+        [{"player_id": "p", "season_id": "s", "team_id": "t", "play_type": "Iso",
+          **{c: 0 for c in ipss.PLAYTYPE_STATS}}]
+    )
+    out = ipss.aggregate_season_stats(frame)
+    assert out.loc[0, "fg_percent"] == 0.0
+    assert pd.isna(out.loc[0, "fg_percent_effective"])
@@ -0,0 +1,50 @@
+from src.position_calibration import (
+    TERM_GROUPS,
+    calibrate_group_size_evidence,
+    extract_base_terms,
+    extract_group_hits,
+    normalize_text,
+)
+
+
+def _reference_hits(text):
+    t = normalize_text(text)
+    hits = {}
+    for gid, g in TERM_GROUPS.items():
+        count = sum(1 for pat in g["patterns"] if pat.search(t))
+        if count:
+            hits[gid] = count
+    return hits
+
+
+def test_group_hits_match_per_pattern_search():
+    texts = [
+        "Big man who can play the 5 and post player on the block",
+        "big-guard, two guard, the 2",
+        "stretch 4 pick-and-pop roller",
+        "Shot blocking rim protector and anchor",
+        "perimeter forward swingman wing",
+        "",
+    ]
+    for text in texts:
+        assert extract_group_hits(text) == _reference_hits(text)
+
+
+def test_base_terms_phrases_first():
+    assert extract_base_terms("Combo guard / point guard") == [
+        "point guard",
+        "combo guard",
+        "combo",
+        "guard",
+        "point",
+    ]
+
+
+def test_group_size_evidence_counts_hits_once_per_sample():
+    samples = [
+        {"true_position": "CENTER", "height_in": 83.0, "weight_lb": 250.0, "text": "big man rim protector"},
+        {"true_position": "POWER_FORWARD", "height_in": 80.0, "weight_lb": 230.0, "text": "post player"},
+    ] * 3
+    stats = calibrate_group_size_evidence(samples, min_hits=3)
+    assert stats["BIG_GENERAL"]["n"] == 6
+    assert stats["RIM_PROTECTION"]["n"] == 3
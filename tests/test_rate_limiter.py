@@ -0,0 +1,65 @@
+import time
+
+import pytest
+
+from src.ingestion.concurrent_fetch import fetch_concurrently
+from src.ingestion.rate_limiter import AdaptiveTokenBucket, get_policy, parse_retry_after
+from src.ingestion.response_cache import ResponseCache
+from src.ingestion.synergy_client import SynergyClient
+
+
+def test_bucket_aimd_and_global_pause():
+    bucket = AdaptiveTokenBucket(rate=2.0, min_rate=0.5, max_rate=3.0, increase=0.5, decrease=0.5)
+    bucket.on_success()
+    assert bucket.rate == 2.5
+    bucket.on_success()
+    bucket.on_success()
+    assert bucket.rate == 3.0  # capped
+
+    pause = bucket.on_throttle(0.2)
+    assert pause == 0.2
+    assert bucket.rate == 1.5
+
+    t0 = time.monotonic()
+    bucket.acquire()
+    assert time.monotonic() - t0 >= 0.19
+
+
+def test_burst_of_429s_cuts_rate_once():
+    bucket = AdaptiveTokenBucket(rate=4.0, min_rate=0.1, max_rate=4.0, decrease=0.5)
+    for _ in range(6):  # every in-flight worker sees the same burst
+        bucket.on_throttle(0.05)
+    assert bucket.rate == 2.0
+    assert bucket.throttle_count == 6
+
+    time.sleep(0.55)  # past the pause and one interval (1 / 2.0 s) of the cut
+    bucket.on_throttle(0.0)
+    assert bucket.rate == 1.0
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("garbage") is None
+
+
+def test_fetch_concurrently_returns_every_item():
+    out = dict(fetch_concurrently(lambda x: x * 2, range(50), max_workers=4, max_in_flight=3))
+    assert out == {i: i * 2 for i in range(50)}
+
+
+def test_rate_policy_shapes_client(monkeypatch):
+    monkeypatch.delenv("SYNERGY_RATE_POLICY", raising=False)
+    monkeypatch.delenv("SYNERGY_MAX_RPS", raising=False)
+    client = SynergyClient(api_key="x", cache=ResponseCache(mode="off"), policy="conservative")
+    assert client.max_workers == 1
+    assert client.bucket.max_rate == 0.5
+
+    assert get_policy().name == "adaptive"
+    monkeypatch.setenv("SYNERGY_MAX_RPS", "2")
+    assert get_policy("adaptive").max_rate == 2.0
+    assert get_policy("burst").max_rate == 8.0  # the env knob only ever tuned the adaptive default
+    monkeypatch.setenv("SYNERGY_RATE_POLICY", "burst")
+    assert SynergyClient(api_key="x", cache=ResponseCache(mode="off"), max_workers=2).max_workers == 2
+    with pytest.raises(ValueError):
+        get_policy("reckless")
@@ -0,0 +1,59 @@
+import time
+
+from src.ingestion import response_cache
+from src.ingestion.response_cache import FOREVER, ResponseCache, cache_key, cache_scope, is_missing
+from src.ingestion.synergy_client import SynergyClient
+
+
+def test_key_ignores_param_order():
+    assert cache_key("/ncaamb/games", {"a": 1, "b": 2}) == cache_key("/ncaamb/games", {"b": 2, "a": 1})
+    assert cache_key("/ncaamb/games", {"a": 1}) != cache_key("/ncaamb/games", {"a": 2})
+
+
+def test_ttl_expiry_and_forever(tmp_path, monkeypatch):
+    cache = ResponseCache(root=str(tmp_path), mode="readwrite")
+    cache.put("/ncaamb/games/g1/events", None, [{"id": 1}])
+    assert cache.get("/ncaamb/games/g1/events") == [{"id": 1}]
+
+    later = time.time() + 365 * response_cache.DAY
+    monkeypatch.setattr(response_cache.time, "time", lambda: later)
+    assert is_missing(cache.get("/ncaamb/games/g1/events"))
+    assert cache.get("/ncaamb/games/g1/events", ttl=FOREVER) == [{"id": 1}]
+
+
+def test_client_replay_serves_cache_without_network(tmp_path, monkeypatch):
+    monkeypatch.delenv("SYNERGY_API_KEY", raising=False)
+    client = SynergyClient(cache=ResponseCache(root=str(tmp_path), mode="replay"))
+    ResponseCache(root=str(tmp_path), mode="readwrite").put(
+        "/ncaamb/seasons", None, {"data": [{"id": "s1"}]}, scope=client.cache_scope
+    )
+
+    assert client.get_seasons() == {"data": [{"id": "s1"}]}
+    assert client.get_teams("ncaamb", "s1") is None
+    assert client.last_error.startswith("replay")
+
+
+def test_scope_separates_deployments_and_keys(tmp_path, monkeypatch):
+    monkeypatch.delenv("SYNERGY_CACHE_SCOPE", raising=False)
+    prod = cache_scope("https://api.example.com/", "prod-key")
+    assert prod == cache_scope("https://api.example.com", "prod-key")
+    assert "prod-key" not in prod
+    assert cache_scope("https://api.example.com", "trial-key") != prod
+    assert cache_scope("http://127.0.0.1:8765", "prod-key") != prod
+
+    cache = ResponseCache(root=str(tmp_path), mode="readwrite")
+    cache.put("/ncaamb/seasons", None, {"data": [{"id": "standin"}]}, scope=cache_scope("http://127.0.0.1:8765", "x"))
+    assert is_missing(cache.get("/ncaamb/seasons", scope=prod))
+
+    prod_client = SynergyClient(api_key="prod-key", base_url="https://api.example.com", cache=cache)
+    assert prod_client.cache_scope == prod
+
+
+def test_empty_events_are_not_cached(tmp_path):
+    cache = ResponseCache(root=str(tmp_path), mode="readwrite")
+    cache.put("/ncaamb/games/g1/events", None, {"data": []})
+    cache.put("/ncaamb/games/g2/events", None, {"data": [{"id": "e"}]})
+    cache.put("/ncaamb/games", {"seasonId": "s1"}, {"data": []})
+    assert not cache.has("/ncaamb/games/g1/events", ttl=FOREVER)
+    assert cache.has("/ncaamb/games/g2/events", ttl=FOREVER)
+    assert cache.has("/ncaamb/games", {"seasonId": "s1"})
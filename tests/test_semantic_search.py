@@ -137,3 +137,82 @@ def test_semantic_search_required_tags_fallback_to_partial(monkeypatch):
         required_tags=["rim_finish", "drive"],
     )
     assert "p1" in results and "p2" in results
+
+
+def test_query_plan_is_shared_and_reused(monkeypatch):
+    from src.search.query_plan import get_query_plan
+
+    plan = get_query_plan("tall wing who can shoot 3", 1.0, 1.0)
+    assert get_query_plan("tall wing who can shoot 3", 1.0, 1.0) is plan
+    assert "wing" in plan.role_hints
+    assert plan.size_intents["height_min"] == 77
+    assert "three point" in plan.synonyms
+
+    monkeypatch.setattr("src.search.semantic.get_cross_encoder", lambda: None)
+    monkeypatch.setattr("src.search.semantic.encode_query", lambda q: [0.1, 0.2, 0.3])
+    semantic_search(DummyCollection(), query=plan.query, n_results=2, plan=plan, alpha_override=1.0, beta_override=1.0)
+    assert "top_position" in plan.__dict__
+
+
+def test_constant_texts_use_precomputed_bundle(tmp_path, monkeypatch):
+    import numpy as np
+
+    from src.concepts import CONCEPT_DEFINITIONS
+    from src.search import constant_embeddings, semantic
+
+    class FakeEmbedder:
+        def encode(self, texts, **kwargs):
+            return np.asarray([[float(len(t)), 1.0, 0.0] for t in texts])
+
+    monkeypatch.setattr(constant_embeddings, "BUNDLE_NPY", str(tmp_path / "c.npy"))
+    monkeypatch.setattr(constant_embeddings, "BUNDLE_MANIFEST", str(tmp_path / "c.json"))
+    monkeypatch.setattr("src.search.semantic.get_embedder", lambda: FakeEmbedder())
+    assert constant_embeddings.build_bundle() > 0
+
+    def boom():
+        raise AssertionError("model used for constant text")
+
+    monkeypatch.setattr("src.search.semantic.get_embedder", boom)
+    semantic._encode_query_cached.cache_clear()
+    concept = CONCEPT_DEFINITIONS["SHOOTING"]
+    vec = semantic.encode_query(concept)
+    assert vec[0] == float(len(semantic._normalize_query(concept)))
+    constant_embeddings._load_bundle.cache_clear()
+    semantic._encode_query_cached.cache_clear()
+
+
+def test_ensure_bundle_builds_missing_or_stale_bundle(tmp_path, monkeypatch):
+    import numpy as np
+
+    from src.search import constant_embeddings
+
+    calls = []
+
+    class FakeEmbedder:
+        def encode(self, texts, **kwargs):
+            calls.append(len(texts))
+            return np.asarray([[float(len(t)), 1.0] for t in texts])
+
+    monkeypatch.setattr(constant_embeddings, "BUNDLE_NPY", str(tmp_path / "c.npy"))
+    monkeypatch.setattr(constant_embeddings, "BUNDLE_MANIFEST", str(tmp_path / "c.json"))
+    monkeypatch.setattr("src.search.semantic.get_embedder", lambda: FakeEmbedder())
+    constant_embeddings._load_bundle.cache_clear()
+    try:
+        constant_embeddings.ensure_bundle.cache_clear()
+        assert constant_embeddings.ensure_bundle()
+        assert len(calls) == 1
+
+        constant_embeddings.ensure_bundle.cache_clear()
+        assert constant_embeddings.ensure_bundle()
+        assert len(calls) == 1  # current bundle: nothing re-encoded
+
+        texts = constant_embeddings.constant_texts()
+        texts["coach_phrases"].append("brand new phrase")
+        monkeypatch.setattr(constant_embeddings, "constant_texts", lambda: texts)
+        constant_embeddings.ensure_bundle.cache_clear()
+        assert constant_embeddings.ensure_bundle()
+        assert len(calls) == 2
+        assert constant_embeddings.lookup("brand new phrase") is not None
+    finally:
+        constant_embeddings.ensure_bundle.cache_clear()
+        constant_embeddings._load_bundle.cache_clear()
@@ -0,0 +1,115 @@
+import sqlite3
+
+from src.ingestion import ledger, pipeline
+from src.ingestion.rate_limiter import AdaptiveTokenBucket
+from src.ingestion.response_cache import ResponseCache
+from src.ingestion.synergy_client import SynergyClient
+from src.ingestion.synergy_standin import Faults, GeneratedLeague, RecordedResponses, SynergyStandin
+
+
+def fast_bucket():
+    return AdaptiveTokenBucket(rate=500.0, min_rate=1.0, max_rate=1000.0, increase=1.0, capacity=50)
+
+
+def client_for(standin, **kw):
+    return SynergyClient(
+        api_key="x", base_url=standin.base_url, bucket=fast_bucket(), cache=ResponseCache(mode="off"), **kw
+    )
+
+
+def test_client_retries_through_injected_429s():
+    league = GeneratedLeague(teams=4, rounds=2, events_per_game=20)
+    with SynergyStandin(league, Faults(p429=0.3, retry_after=0, seed=1)) as standin:
+        client = client_for(standin, max_workers=4)
+        games = list(pipeline.iter_games(client, "ncaamb", "s2024", None, take=3))
+        assert [g["id"] for g in games] == [g["id"] for g in league.games["s2024"]]
+
+        results = dict(client.get_game_events_many("ncaamb", [g["id"] for g in games]))
+        assert all(len(payload["data"]) == 20 for payload in results.values())
+        assert client.get_team_players("ncaamb", "missing") is None
+        assert client.last_status_code == 404
+
+        stats = standin.stats()
+    assert client.bucket.throttle_count > 0
+    assert sum(n for k, n in stats["status"].items() if k.endswith(":429")) == client.bucket.throttle_count
+
+
+def test_recorded_responses_are_served_by_endpoint_and_params(tmp_path):
+    cache = ResponseCache(root=str(tmp_path), mode="readwrite")
+    cache.put("/ncaamb/games", {"seasonId": "s1", "take": 20}, {"data": [{"data": {"id": "g1"}}]}, scope="prod|k")
+    with SynergyStandin(RecordedResponses(str(tmp_path), scope="prod|k")) as standin:
+        client = client_for(standin)
+        assert client.get_games("ncaamb", "s1") == {"data": [{"data": {"id": "g1"}}]}
+        assert client.get_games("ncaamb", "s2") is None
+
+
+def test_run_pipeline_end_to_end(tmp_path, monkeypatch):
+    db = str(tmp_path / "skout.db")
+    monkeypatch.setattr(pipeline, "connect_db", lambda: sqlite3.connect(db))
+    monkeypatch.setattr("src.processing.trait_engine.run_trait_engine", lambda *a, **kw: None)
+    monkeypatch.setenv("SYNERGY_CACHE", "off")
+    monkeypatch.setenv("SKOUT_METRICS_DIR", str(tmp_path / "metrics"))
+
+    league = GeneratedLeague(teams=4, rounds=2, events_per_game=30)
+    with SynergyStandin(league, Faults(latency=0.01, p429=0.2, retry_after=0.05, seed=3)) as standin:
+        monkeypatch.setenv("SYNERGY_BASE_URL", standin.base_url)
+        monkeypatch.setattr(pipeline, "SynergyClient", lambda **kw: SynergyClient(bucket=fast_bucket(), **kw))
+        plan = pipeline.PipelinePlan(league_code="ncaamb", season_id="s2024", team_ids=[])
+        out = pipeline.run_pipeline(plan, api_key="x")
+
+    n_games = len(league.games["s2024"])
+    assert out["inserted_games"] == n_games
+    assert out["inserted_plays"] == 30 * n_games
+    conn = sqlite3.connect(db)
+    assert len(ledger.completed(conn, ledger.EVENTS_ENDPOINT)) == n_games
+    conn.close()
+
+    m = out["metrics"]
+    throttled = m["counters"]["synergy_requests_total"].get("events:429", 0)
+    assert m["counters"]["synergy_requests_total"]["events:200"] == n_games
+    assert m["throttled"] == throttled + m["counters"]["synergy_requests_total"].get("schedule:429", 0)
+    assert (m["sleep_s"]["throttle"] > 0) == (m["throttled"] > 0)
+    assert m["counters"]["ingest_rows_total"]["plays"] == 30 * n_games
+    assert m["bytes"] > 0 and m["commit_s"] > 0
+    text = (tmp_path / "metrics" / "run_pipeline.prom").read_text()
+    assert f'synergy_requests_total{{endpoint="events",status="200"}} {n_games}' in text
+
+
+def test_empty_final_events_reach_the_network_again(tmp_path):
+    league = GeneratedLeague(teams=2, rounds=1, events_per_game=0)
+    game_id = league.games["s2024"][0]["id"]
+    with SynergyStandin(league) as standin:
+        client = client_for(standin)
+        client.cache = ResponseCache(root=str(tmp_path), mode="readwrite")
+        for _ in range(2):
+            assert client.get_game_events("ncaamb", game_id, final=True) == {"data": []}
+        stats = standin.stats()
+    assert stats["requests"]["events"] == 2
+
+
+def test_run_pipeline_retries_traits_after_failure(tmp_path, monkeypatch):
+    db = str(tmp_path / "skout.db")
+    monkeypatch.setattr(pipeline, "connect_db", lambda: sqlite3.connect(db))
+    monkeypatch.setenv("SYNERGY_CACHE", "off")
+    monkeypatch.setenv("SKOUT_METRICS_DIR", str(tmp_path / "metrics"))
+    calls = []
+
+    def trait_engine(*a, **kw):
+        calls.append(kw)
+        if len(calls) == 1:
+            raise RuntimeError("fold failed")
+        return {"plays": 0, "players": 0, "timings": {}}
+
+    monkeypatch.setattr("src.processing.trait_engine.run_trait_engine", trait_engine)
+    league = GeneratedLeague(teams=2, rounds=1, events_per_game=5)
+    with SynergyStandin(league) as standin:
+        monkeypatch.setenv("SYNERGY_BASE_URL", standin.base_url)
+        monkeypatch.setattr(pipeline, "SynergyClient", lambda **kw: SynergyClient(bucket=fast_bucket(), **kw))
+        plan = pipeline.PipelinePlan(league_code="ncaamb", season_id="s2024", team_ids=[])
+        first = pipeline.run_pipeline(plan, api_key="x")
+        second = pipeline.run_pipeline(plan, api_key="x")
+
+    assert first["inserted_plays"] > 0 and first["traits_error"] == "RuntimeError: fold failed"
+    # Nothing new was ingested, but the unfolded games still get their fold.
+    assert second["inserted_plays"] == 0 and second["traits_error"] is None
+    assert calls == [{"incremental": True}, {"incremental": True}]
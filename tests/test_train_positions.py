@@ -0,0 +1,58 @@
+import csv
+import random
+
+import pytest
+
+import train_positions
+from src import position_calibration as pc
+
+
+@pytest.fixture
+def restore_calibration():
+    priors = {k: dict(v) for k, v in pc.POSITION_SIZE_PRIORS.items()}
+    evidence = {gid: g.get("size_evidence") for gid, g in pc.TERM_GROUPS.items()}
+    yield
+    pc.apply_position_priors(priors)
+    pc.apply_group_size_updates(evidence)
+
+
+def _write_samples(path, n=90):
+    rng = random.Random(5)
+    kinds = [
+        ("PG", 74, 185, "floor general, point guard who runs pick and roll"),
+        ("SG", 77, 200, "two guard, catch and shoot wing"),
+        ("SF", 79, 215, "perimeter forward swingman wing"),
+        ("PF", 81, 235, "stretch 4 pick-and-pop, post player"),
+        ("C", 84, 255, "big man rim protector, shot blocking anchor"),
+    ]
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["true_position", "height_in", "weight_lb", "text"])
+        for i in range(n):
+            pos, h, wt, text = kinds[i % len(kinds)]
+            height = "" if i % 11 == 0 else f"{h + rng.uniform(-2, 2):.1f}"
+            w.writerow([pos, height, f"{wt + rng.uniform(-15, 15):.0f}", text])
+
+
+def test_iter_sample_chunks_streams_same_samples_as_load(tmp_path):
+    path = tmp_path / "samples.csv"
+    _write_samples(path)
+    chunks = list(train_positions.iter_sample_chunks(str(path), chunk_size=25))
+    assert [len(c) for c in chunks] == [25, 25, 25, 15]
+    assert [s for c in chunks for s in c] == train_positions.load_samples(str(path))
+
+
+def test_train_parallel_matches_serial(tmp_path, restore_calibration):
+    path = tmp_path / "samples.csv"
+    _write_samples(path)
+
+    samples = train_positions.load_samples(str(path))
+    serial = pc.calibrate_all(samples, min_group_hits=3)
+    positions = sorted({s["true_position"] for s in samples})
+    serial["weights"] = pc.learn_global_weights_logreg(samples, candidate_positions=positions)
+
+    parallel = train_positions.train_parallel(str(path), min_group_hits=3, workers=2, chunk_size=20)
+
+    assert serial["group_size_updates"]
+    for key in ("priors", "group_size_updates", "weights"):
+        assert parallel[key] == serial[key]
@@ -1,7 +1,20 @@
 import argparse
 import csv
+import os
+import time
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ProcessPoolExecutor, wait
 
-from src.position_calibration import calibrate_all, export_model_bundle, learn_global_weights_logreg
+from src.position_calibration import (
+    apply_group_size_updates,
+    apply_position_priors,
+    calibrate_all,
+    calibrate_group_size_evidence,
+    calibrate_position_priors,
+    export_model_bundle,
+    fit_global_weights,
+    learn_global_weights_logreg,
+    sample_weight_features,
+)
 
 POSITION_MAP = {
     "G": "GUARD",
@@ -16,34 +29,163 @@ POSITION_MAP = {
 }
 
 
+def _row_to_sample(row: dict) -> dict:
+    raw_pos = (row.get("true_position") or "").strip()
+    pos = POSITION_MAP.get(raw_pos, raw_pos)
+    return {
+        "true_position": pos,
+        "height_in": float(row.get("height_in") or 0.0) if row.get("height_in") else None,
+        "weight_lb": float(row.get("weight_lb") or 0.0) if row.get("weight_lb") else None,
+        "text": row.get("text") or "",
+    }
+
+
 def load_samples(path: str):
     samples = []
     with open(path, "r", encoding="utf-8") as f:
         reader = csv.DictReader(f)
         for row in reader:
-            raw_pos = (row.get("true_position") or "").strip()
-            pos = POSITION_MAP.get(raw_pos, raw_pos)
-            samples.append(
-                {
-                    "true_position": pos,
-                    "height_in": float(row.get("height_in") or 0.0) if row.get("height_in") else None,
-                    "weight_lb": float(row.get("weight_lb") or 0.0) if row.get("weight_lb") else None,
-                    "text": row.get("text") or "",
-                }
-            )
+            samples.append(_row_to_sample(row))
     return samples
 
 
+def iter_sample_chunks(path: str, chunk_size: int = 5000):
+    """Yield lists of samples, reading the CSV `chunk_size` rows at a time."""
+    import pandas as pd
+
+    try:
+        reader = pd.read_csv(path, dtype=str, keep_default_na=False, chunksize=chunk_size)
+    except pd.errors.EmptyDataError:
+        return
+    with reader:
+        for df in reader:
+            if len(df):
+                yield [_row_to_sample(row) for row in df.to_dict("records")]
+
+
+# ----------------------------
+# Parallel training
+# ----------------------------
+
+def _init_worker(priors: dict, group_updates: dict) -> None:
+    # Workers score against the calibrated priors, not the module defaults.
+    apply_position_priors(priors)
+    apply_group_size_updates(group_updates)
+
+
+def _chunk_features(chunk: list, pos_list: list):
+    import numpy as np
+
+    X = []
+    y = []
+    for s in chunk:
+        rows, labels = sample_weight_features(s, pos_list)
+        X.extend(rows)
+        y.extend(labels)
+    return (
+        np.asarray(X, dtype=np.float64).reshape(-1, 2),
+        np.asarray(y, dtype=np.int8),
+        len(chunk),
+    )
+
+
+def train_parallel(path: str, min_group_hits: int = 40, workers: int = 0, chunk_size: int = 5000) -> dict:
+    """Calibrate and fit weights with per-sample features spread over a process pool."""
+    import numpy as np
+
+    workers = workers or (os.cpu_count() or 1)
+    timings = {}
+
+    t0 = time.perf_counter()
+    samples = [s for chunk in iter_sample_chunks(path, chunk_size=chunk_size) for s in chunk]
+    timings["load"] = time.perf_counter() - t0
+    print(f"Loaded {len(samples)} samples ({timings['load']:.2f}s)")
+
+    t0 = time.perf_counter()
+    priors = calibrate_position_priors(samples)
+    apply_position_priors(priors)
+    group_updates = calibrate_group_size_evidence(samples, min_hits=min_group_hits)
+    apply_group_size_updates(group_updates)
+    timings["calibrate"] = time.perf_counter() - t0
+    print(f"Calibrated priors and {len(group_updates)} term groups ({timings['calibrate']:.2f}s)")
+
+    # Calibration needs every sample at once; feature building doesn't, so the
+    # CSV is streamed again and at most 2 chunks per worker are held in flight.
+    pos_list = sorted({s["true_position"] for s in samples if s.get("true_position")})
+    n_samples = len(samples)
+    del samples
+
+    t0 = time.perf_counter()
+    X_parts = {}
+    y_parts = {}
+    done_samples = 0
+    max_in_flight = 2 * workers
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(priors, group_updates),
+    ) as pool:
+        futures = {}
+
+        def collect(return_when):
+            nonlocal done_samples
+            done, _ = wait(futures, return_when=return_when)
+            for fut in done:
+                i = futures.pop(fut)
+                X_parts[i], y_parts[i], n = fut.result()
+                done_samples += n
+                elapsed = time.perf_counter() - t0
+                rate = done_samples / elapsed if elapsed > 0 else 0.0
+                print(f"  features: chunk {len(X_parts)} | {done_samples}/{n_samples} samples | {rate:,.0f} samples/s")
+
+        for i, chunk in enumerate(iter_sample_chunks(path, chunk_size=chunk_size)):
+            futures[pool.submit(_chunk_features, chunk, pos_list)] = i
+            if len(futures) >= max_in_flight:
+                collect(FIRST_COMPLETED)
+        if futures:
+            collect(ALL_COMPLETED)
+    X_parts = [X_parts[i] for i in sorted(X_parts)]
+    y_parts = [y_parts[i] for i in sorted(y_parts)]
+    X = np.vstack(X_parts) if X_parts else np.empty((0, 2))
+    y = np.concatenate(y_parts) if y_parts else np.empty((0,), dtype=np.int8)
+    timings["features"] = time.perf_counter() - t0
+    print(f"Built X={X.shape} with {workers} workers ({timings['features']:.2f}s)")
+
+    t0 = time.perf_counter()
+    weights = fit_global_weights(X, y)
+    timings["fit"] = time.perf_counter() - t0
+    print(f"Fit global weights ({timings['fit']:.2f}s)")
+    print("Timing: " + ", ".join(f"{k}={v:.2f}s" for k, v in timings.items()))
+
+    return {
+        "priors": priors,
+        "group_size_updates": group_updates,
+        "weights": weights,
+        "timings": timings,
+    }
+
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--data", default="data/calibration_samples.csv")
     parser.add_argument("--min-group-hits", type=int, default=40)
+    parser.add_argument("--workers", type=int, default=None, help="parallel mode: process count (0 = all cores)")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="parallel mode: CSV rows per chunk")
     args = parser.parse_args()
 
-    samples = load_samples(args.data)
-    cal = calibrate_all(samples, min_group_hits=args.min_group_hits)
-    pos_candidates = sorted({s["true_position"] for s in samples if s.get("true_position")})
-    weights = learn_global_weights_logreg(samples, candidate_positions=pos_candidates)
+    if args.workers is not None:
+        cal = train_parallel(
+            args.data,
+            min_group_hits=args.min_group_hits,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+        )
+        weights = cal["weights"]
+    else:
+        samples = load_samples(args.data)
+        cal = calibrate_all(samples, min_group_hits=args.min_group_hits)
+        pos_candidates = sorted({s["true_position"] for s in samples if s.get("true_position")})
+        weights = learn_global_weights_logreg(samples, candidate_positions=pos_candidates)
     export_model_bundle(
         "position_model.json",
         cal["priors"],